@@ -7,9 +7,9 @@ from typing import Union, Optional
 
 from storage_evaluation_system_zzj.action.action import Actions
 from storage_evaluation_system_zzj.client.ssh_client import SSHClient, LinuxClient, WindowsClient
-from storage_evaluation_system_zzj.exception import SESError
+from storage_evaluation_system_zzj.exception import AgentUnavailable, SESError
 from storage_evaluation_system_zzj.logger import logger
-from storage_evaluation_system_zzj.util import IostatData
+from storage_evaluation_system_zzj.util import IostatData, IoLoad
 
 
 class HostAction(Actions):
@@ -179,6 +179,53 @@ class HostAction(Actions):
                           mb_wrtn_ps=round(mb_wrtn_avg, ndigit))
 
 
+    def sample_io_load(self, interval: int) -> IoLoad:
+        """采样主机块设备IO负载
+
+        Args:
+            interval: 采样时长（秒）
+
+        Returns: 采样时长内所有设备的读写带宽之和（MB/s）与平均队列深度之和
+        """
+        raise NotImplementedError
+
+    @staticmethod
+    def parse_iostat_extended(output: str) -> Optional[IoLoad]:
+        """解析 ``iostat -d -x -k`` 输出，取最后一次报告（第一次报告为开机以来的平均值）
+
+        兼容新旧版本sysstat的列名（aqu-sz/avgqu-sz），忽略loop、ram设备
+        """
+        reports = []
+        for line in output.splitlines():
+            columns = line.replace(",", ".").split()
+            if not columns:
+                continue
+            if columns[0].lower().startswith("device"):
+                reports.append((columns, []))
+            elif reports and len(columns) == len(reports[-1][0]):
+                reports[-1][1].append(columns)
+        if not reports:
+            return None
+
+        header, rows = reports[-1]
+        queue_col = "aqu-sz" if "aqu-sz" in header else "avgqu-sz"
+        try:
+            indexes = [header.index(c) for c in ("rkB/s", "wkB/s", queue_col)]
+        except ValueError:
+            return None
+        kbps = queue = 0
+        for row in rows:
+            if row[0].startswith(("loop", "ram")):
+                continue
+            try:
+                rkb, wkb, qu = (float(row[i]) for i in indexes)
+            except ValueError:
+                continue
+            kbps += rkb + wkb
+            queue += qu
+        return IoLoad(mbps=round(kbps / 1024, 3), queue=round(queue, 3))
+
+
 class LinuxAction(HostAction):
     client: LinuxClient
     client_type = LinuxClient
@@ -297,8 +344,7 @@ class LinuxAction(HostAction):
             remote_path: 客户端上的文件夹绝对路径
             file_name: 文件名称
         """
-        res = self.client.exec_command("find %s -name %s -type f" % (remote_path, file_name))
-        res = res.stdout.split("\n")[0]
+        res = self.find_file(remote_path, file_name)
         return "/".join(res.split('/')[:-1])
 
     def find_file(self, remote_path, file_name):
@@ -308,8 +354,11 @@ class LinuxAction(HostAction):
             remote_path: 客户端上的文件夹绝对路径
             file_name: 文件名称
         """
-        res = self.client.exec_command("find %s -name %s -type f" % (remote_path, file_name))
-        return res.stdout.split("\n")[0]
+        # 流式读取，找到第一个结果后即关闭通道并结束find
+        with self.client.exec_stream("find %s -name %s -type f" % (remote_path, file_name)) as stream:
+            for line in stream:
+                return line
+        return ""
 
     def get_memory_size(self) -> int:
         return int(self.client.exec_command("free -b -t | grep -i total: | awk '{print $2}'").stdout)
@@ -325,6 +374,12 @@ class LinuxAction(HostAction):
             target: 目标字符串
         """
 
+        # 代理按普通字符串匹配，含正则元字符时使用grep
+        if not re.search(r"[.*\[\]^$\\]", target):
+            try:
+                return self.client.agent_call("file_contains", path=path, target=target)
+            except AgentUnavailable:
+                pass
         resp = self.client.exec_command(f"grep '{target}' {path}")
         return 0 == resp.status_code
 
@@ -343,6 +398,10 @@ class LinuxAction(HostAction):
             path: 文件路径
             trim: 是否移除空行
         """
+        try:
+            return self.client.agent_call("get_last_line", path=path, trim=trim)
+        except AgentUnavailable:
+            pass
         if trim:
             cmd = f"awk 'NF' '{path}' | tail -n 1"
         else:
@@ -355,6 +414,10 @@ class LinuxAction(HostAction):
         Args:
             path: 文件路径
         """
+        try:
+            return self.client.agent_call("get_file_lc", path=path)
+        except AgentUnavailable:
+            pass
         return int(self.client.exec_command(f"grep -cv ^$ {path}").stdout.strip())
 
     def get_sys_temp_dir(self):
@@ -403,6 +466,15 @@ class LinuxAction(HostAction):
             count = math.ceil(elapsed / interval)
         return self.client.run_cmd_background(f"iostat -m -d {interval} {count}", input_file)
 
+    def sample_io_load(self, interval: int) -> IoLoad:
+        response = self.client.exec_command(f"iostat -d -x -k {interval} 2", timeout=interval + 60, verbose=False)
+        if response.status_code != 0:
+            raise SESError(f"Running iostat failed: {response.stderr}")
+        load = self.parse_iostat_extended(response.stdout)
+        if load is None:
+            raise SESError("Parsing iostat output failed")
+        return load
+
 
 class WindowsAction(HostAction):
     client: WindowsClient
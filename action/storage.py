@@ -10,7 +10,7 @@ from inputimeout import inputimeout
 from storage_evaluation_system_zzj import constants, util
 from storage_evaluation_system_zzj.constants import ClientTarget, TimeFormat, CacheDataKey
 from storage_evaluation_system_zzj.parameter import DefaultParameter
-from storage_evaluation_system_zzj.util import wait_for, WaitResult, manual
+from storage_evaluation_system_zzj.util import wait_for, WaitResult, manual, IoLoad
 
 
 class StorageAction:
@@ -55,6 +55,10 @@ class StorageAction:
         """存储系统容量（TB）"""
         raise NotImplementedError
 
+    def get_io_load(self) -> IoLoad:
+        """存储系统当前IO负载（带宽MB/s、队列深度），用于用例间静默检测。未实现时仅依据客户端iostat判断"""
+        raise NotImplementedError
+
     def handle_manual_action(self, *args, **kwargs):
         """手动执行。用户完成/放弃手动操作后，输入字符串表明动作结束。"""
         kwargs.update(logger_obj=self.logger)
@@ -4,9 +4,9 @@ from dataclasses import fields
 from datetime import datetime
 import datetime as dt
 from enum import Enum
-from itertools import groupby
-from operator import itemgetter
+import glob
 import os.path
+import random
 import re
 import socket
 from statistics import mean
@@ -15,11 +15,17 @@ import traceback
 import math
 from typing import List, Optional, Union, Dict, Callable
 
+import numpy as np
 import pandas as pd
 
 from storage_evaluation_system_zzj import constants
 from storage_evaluation_system_zzj.action.host import LinuxAction, WindowsAction, HostAction
+from storage_evaluation_system_zzj.action import vdbench_log
 from storage_evaluation_system_zzj.action.io_tool import IOTool
+from storage_evaluation_system_zzj.action.vdbench_dataset import DatasetManifest, DatasetPlan
+from storage_evaluation_system_zzj.action.vdbench_log import FlatfileParser, Histogram, HistogramParser, \
+    IntervalStore, SteadyState, SteadyStateDetector, VdbenchLogFollower, MS_PER_DAY, ms2tod
+from storage_evaluation_system_zzj.client.client import ClientGroup
 from storage_evaluation_system_zzj.client.ssh_client import SSHClient, LinuxClient, WindowsClient
 from storage_evaluation_system_zzj.constants import ClientTarget, CaseCategory, CacheDataKey
 from storage_evaluation_system_zzj.exception import SESError, CaseFailedError
@@ -54,7 +60,8 @@ class VdbenchIO(IOTool):
         self.executable = None  # 可执行文件，windows为vdbench.bat，linux为vdbench
         self._executable_path = None  # 可执行文件完成路径
         self.anchor_paths = None
-        self.format_status = None  # 预埋标志
+        self.manifest: Optional[DatasetManifest] = None  # 当前配置的数据集清单
+        self.dataset_plan: Optional[DatasetPlan] = None  # 与已有数据集的比对结果
         self.pid = None  # 正式执行pid，不包含预埋
         self.elapsed = constants.VDBENCH_ELAPSED
         self.resource_dir = get_resource_path(constants.IO_MODEL_PARAM_PATH)
@@ -67,6 +74,12 @@ class VdbenchIO(IOTool):
         self.iostat_data: Dict[HostAction, dict] = {}
         self.to_print_data_structure = True
         self.root_output_dir = self.output_dir
+        # logfile.html跟踪器 {日志路径: VdbenchLogFollower}
+        self._log_followers: Dict[str, VdbenchLogFollower] = {}
+        # 已因性能稳定提前结束
+        self.steady_stopped = False
+        # 并行用例组中的lane编号：使用独立的数据集目录与vdbench端口，不重新挂载、不清理缓存
+        self.parallel_lane = self.case.parallel_lane
 
     @property
     def executable_path(self):
@@ -166,10 +179,7 @@ class VdbenchIO(IOTool):
         :param dir_depth: 构造目录深度，默认为1
         :return:
         """
-        self.set_output_dir()
-        self.output_dir = self.host.join_path(self.output_dir, "test")
-        self.anchor_paths = anchor_paths
-        self.executable_path = f"{vdbench_dir}{self.sep}{self.executable}"
+        self._init_run(vdbench_dir, anchor_paths, "test")
         config_file = self.prepare(vdbench_dir,
                                    config_template_file,
                                    anchor_paths,
@@ -184,8 +194,10 @@ class VdbenchIO(IOTool):
 
         cmd = f"{self.executable_path} -f {config_file} -o {self.output_dir} -w {constants.VDBENCH_WARMUP}"
         if self.is_perf_case:
-            self.client_drop_caches()
-            self.client_mount()
+            # 并行执行时重新挂载、清理缓存会影响其他用例的读写
+            if self.parallel_lane is None:
+                self.client_drop_caches()
+                self.client_mount()
             self.start_iostat()
 
         self.pid = self._run_vdbench_cmd(config_file, self.output_dir, f"-w {constants.VDBENCH_WARMUP}")
@@ -193,22 +205,59 @@ class VdbenchIO(IOTool):
             return False
 
         if wait:
-            return self.wait_for_complete(timeout=timeout)
+            custom_func = None
+            if constants.STEADY_EARLY_STOP and self.is_perf_case:
+                custom_func = self.check_steady_stop
+            return self.wait_for_complete(timeout=timeout, custom_func=custom_func, custom_func_parameter={})
         else:
             self.logger.debug(f"Vdbench will be running in background (pid={self.pid})")
 
+    def stage_dataset(self, vdbench_dir: str, config_template_file: str, anchor_paths: dict, fsd_group_number: int,
+                      fsd_width: int, multiple: int, threads_config: int = None, format_status="restart",
+                      fwdrate="max", dir_depth: int = 1) -> str:
+        """
+        只准备数据集（清理与数据预制），不执行正式读写。参数与 `run` 一致
+
+        数据集清单保存后，之后以相同参数执行 `run` 时比对一致，跳过数据预制
+        :return: 数据集指纹
+        """
+        self._init_run(vdbench_dir, anchor_paths, "stage")
+        self.prepare(vdbench_dir,
+                     config_template_file,
+                     anchor_paths,
+                     fsd_width,
+                     fsd_group_number,
+                     threads_config,
+                     multiple,
+                     None,
+                     format_status,
+                     fwdrate,
+                     dir_depth)
+        return self.manifest.digest
+
+    def _init_run(self, vdbench_dir: str, anchor_paths: dict, dirname: str):
+        self.set_output_dir()
+        self.output_dir = self.host.join_path(self.output_dir, dirname)
+        self.anchor_paths = anchor_paths
+        self.executable_path = f"{vdbench_dir}{self.sep}{self.executable}"
+
     def start_iostat(self):
         """所有主机启动iostat"""
         self.logger.debug(f"Starting iostat")
         elapsed = self.elapsed + 60
-        for client in self.anchor_paths.keys():
+
+        def start(client):
             host = self.host.__class__(self.case, client=client)
             host.mkdir(self.output_dir)
             rstr = time.time_ns()
             log_path = self.client.join_path(self.output_dir, f"{self.case.cid}_iostat_{rstr}.log")
             pid = host.start_iostat(log_path, interval=constants.IOSTAT_INTERVAL, elapsed=elapsed)
-            self.iostat_data[host] = dict(log_path=log_path, pid=pid, data=None)
             self.logger.debug(f"[{client.role}] iostat started, pid={pid}, log={log_path}")
+            return host, log_path, pid
+
+        for result in self.anchor_clients.run_all(start, raise_error=True):
+            host, log_path, pid = result.value
+            self.iostat_data[host] = dict(log_path=log_path, pid=pid, data=None)
         self.logger.debug(f"iostat started")
 
     def stop(self, wait=True, force_kill=True):
@@ -245,10 +294,42 @@ class VdbenchIO(IOTool):
                 self.logger.debug(f"Collecting iostat data error: {traceback.format_exc()}")
 
     def clean_slaves(self):
-        """清理slave中的所有vdbench进程"""
+        """清理slave中的vdbench进程。并行执行时只清理使用本lane端口的进程"""
         self.logger.debug("Clean slave process")
-        for client in self.anchor_paths.keys():
-            client.kill_process(keywords="vdbench.jar")
+        keywords = ["vdbench.jar"]
+        if self.parallel_lane is not None:
+            keywords.append(f"-p {self.port}")
+        self.anchor_clients.run_all(lambda client: client.kill_process(keywords=keywords), raise_error=True)
+
+    @property
+    def port(self) -> int:
+        """vdbench主从通信端口"""
+        return constants.VDBENCH_PORT + (self.parallel_lane or 0)
+
+    @property
+    def anchor_root(self) -> str:
+        """数据集根目录：anchor_path，并行执行时为其下本lane的子目录"""
+        anchor_path = self.host.get_env_parameter("anchor_path")
+        if self.parallel_lane is None:
+            return anchor_path
+        return self.host.join_path(anchor_path, f"{constants.PARALLEL_ANCHOR_DIR}{self.parallel_lane}")
+
+    def timeline(self) -> Optional[dict]:
+        """ 正式读写阶段的OPS、时延时间序列，用于并行用例的合并时间线图
+
+        Returns: {"time": 时间, "rate": OPS, "resp": 时延}，无数据时为None
+        """
+        store = self.log_store()
+        start = store.stage_start_row(self.get_stage_keyword(VdbenchState.RD))
+        if start is None or start >= len(store):
+            return None
+        tod = np.asarray(store.tod)[start:]
+        # 跨天时间戳按递增处理
+        tod = tod + np.concatenate(([0], np.cumsum(np.diff(tod) < 0))) * MS_PER_DAY
+        today = datetime.combine(datetime.now().date(), dt.time())
+        return dict(time=[today + dt.timedelta(milliseconds=int(t)) for t in tod],
+                    rate=list(store.rate[start:]),
+                    resp=list(store.resp[start:]))
 
     def handle_iostat_data(self):
         """处理iostat数据"""
@@ -257,10 +338,18 @@ class VdbenchIO(IOTool):
         os.makedirs(local_dir, exist_ok=True)
         # 取回所有主机的日志，解析数据
         host_data_dict = {f.name: [] for f in fields(IostatData)}
-        for host, info in self.iostat_data.items():
+        hosts = {host.client: host for host in self.iostat_data.keys()}
+
+        def collect(client):
+            host = hosts[client]
+            info = self.iostat_data[host]
+            local_path = os.path.join(local_dir, client.role + "_iostat.log")
+            return host.collect_iostat_data(info["pid"], info["log_path"], local_path)
+
+        results = ClientGroup(hosts.keys()).run_all(collect, raise_error=True)
+        for host, result in zip(hosts.values(), results):
             client_role = host.client.role
-            local_path = os.path.join(local_dir, client_role + "_iostat.log")
-            data = host.collect_iostat_data(info["pid"], info["log_path"], local_path)
+            data = result.value
             if not data:
                 self.logger.debug(f"Collecting iostat data failed on client: {client_role}({host.client.ip})")
                 continue
@@ -353,7 +442,7 @@ class VdbenchIO(IOTool):
         elif self.status == VdbenchState.FORMAT:
             if self.is_stage_start(VdbenchState.RD):
                 to_print = True
-                self.create_tag_file()
+                self.write_manifest()
                 self.status = VdbenchState.RD
         elif self.is_stage_start(VdbenchState.FORMAT):
             # format在前期已经完成，不再打印format状态
@@ -404,9 +493,13 @@ class VdbenchIO(IOTool):
 
     def get_last_log_time(self) -> datetime:
         """获取vdbench最后的在线时间"""
-        last_line = self.host.get_last_line(self.get_output_file_path("flatfile.html"))
-        ts = last_line.split()[0]
-        return self._reporter.ts2datetime(ts)
+        store = self.log_store()
+        if len(store):
+            ts = vdbench_log.ms2tod(store.tod[-1])
+        else:
+            last_line = self.host.get_last_line(self.get_output_file_path("flatfile.html"))
+            ts = last_line.split()[0]
+        return self.reporter.ts2datetime(ts)
 
     def wait_for_stage_start(self, stage=VdbenchState.RD, timeout=None, interval=10, delay=None) -> bool:
         """ 等待vdbench启动、并达到预期阶段
@@ -515,15 +608,21 @@ class VdbenchIO(IOTool):
         if not self.clean:
             return config_file
 
-        clean_dir = self.host.join_path(self.case.output_dir, "clean")
-        self.host.mkdir(clean_dir)
-        clean_file = self.host.join_path(clean_dir, "clean.txt")
-        self.host.copy(config_file, clean_file)
-        self.host.replace_content(clean_file, "format=\(.*\)", "format=clean")
-        # 执行清除程序
-        self.logger.debug("Do clean")
-        clean_pid = self._run_vdbench_cmd(clean_file, clean_dir)
-        self.wait_for_complete(pid=clean_pid, update_status=False, output_dir=clean_dir)
+        if self.dataset_plan.incremental:
+            # 部分数据集可复用：只删除参数变化的anchor，之后以restart方式补齐
+            self.logger.debug(f"Do incremental clean: {self.dataset_plan.changed}")
+            self.remove_anchors(self.dataset_plan.changed)
+        else:
+            clean_dir = self.host.join_path(self.case.output_dir, "clean")
+            self.host.mkdir(clean_dir)
+            clean_file = self.host.join_path(clean_dir, "clean.txt")
+            self.host.copy(config_file, clean_file)
+            self.host.replace_content(clean_file, "format=\(.*\)", "format=clean")
+            # 执行清除程序
+            self.logger.debug("Do clean")
+            clean_pid = self._run_vdbench_cmd(clean_file, clean_dir)
+            self.wait_for_complete(pid=clean_pid, update_status=False, output_dir=clean_dir)
+        self.remove_anchors(self.dataset_plan.stale)
 
         # 执行预埋程序
         self.status = VdbenchState.FORMAT
@@ -535,6 +634,8 @@ class VdbenchIO(IOTool):
         self.host.replace_content(prepare_file,
                                   "elapsed=\(.*\)",
                                   f"elapsed={constants.VDBENCH_ELAPSED_PRE}")
+        if self.dataset_plan.incremental:
+            self.host.replace_content(prepare_file, "format=[a-z]*", "format=restart")
         prepare_pid = self._run_vdbench_cmd(prepare_file, prepare_dir)
         timeout = constants.VDBENCH_EXEC_TIMEOUT
 
@@ -546,7 +647,7 @@ class VdbenchIO(IOTool):
                                         custom_func_parameter=dict(output_dir=prepare_dir),
                                         output_dir=prepare_dir)
         if result == WaitResult.OK:
-            self.create_tag_file()
+            self.write_manifest()
             self.status = VdbenchState.DONE_FORMAT
             self.logger.info(self.get_status_message())
         elif result == WaitResult.TIMEOUT and not self.is_stage_start(VdbenchState.RD, prepare_dir):
@@ -572,6 +673,11 @@ class VdbenchIO(IOTool):
         self.host.insert_text_to_file(config_file,
                                       f"data_errors=1,create_anchors=yes,messagescan=no,monitor={self.get_mon_file()}")
 
+        # 2.0.1 自定义时延分布桶（毫秒）
+        if constants.VDBENCH_HISTOGRAM_BUCKETS:
+            buckets = ",".join(str(b) for b in constants.VDBENCH_HISTOGRAM_BUCKETS)
+            self.host.insert_text_to_file(config_file, f"histogram=(default,{buckets})")
+
         # 2.1 配置脚本线程数：大文件io与小文件io不同最优线程
         self.host.replace_content(config_file, "$vdbench_dir", vdbench_dir.replace("/", "\/"))
         self.host.replace_content(config_file, "$format", format_status)
@@ -586,10 +692,12 @@ class VdbenchIO(IOTool):
         client_thread = math.ceil(int(threads_config) / multiple_thread) * multiple_thread
 
         # 3. 生成配置文件的挂载路径
-        self.create_vdbench_config(anchor_paths, config_file, client_thread, fsd_width, fsd_group_number, dir_depth)
+        self.create_vdbench_config(anchor_paths, config_file, client_thread, fsd_width, fsd_group_number, dir_depth,
+                                   self.case.hd_numbers)
         return config_file
 
-    def create_vdbench_config(self, mount_paths, config_file, client_thread, fsd_width, fsd_group_number, dir_depth):
+    def create_vdbench_config(self, mount_paths, config_file, client_thread, fsd_width, fsd_group_number, dir_depth,
+                              hd_numbers: dict = None):
         hd_line, fsd_line, fwd_line = "", "", ""
 
         with open(config_file, 'r') as file:
@@ -598,7 +706,7 @@ class VdbenchIO(IOTool):
         number = 0
         clients = []
         for i, (host_client, paths) in enumerate(mount_paths.items()):
-            for j in range(host_client.hd_number):
+            for j in range((hd_numbers or {}).get(host_client, 1)):
                 clients.append([host_client, paths[0]])
                 hd_line += f"hd=hd{number},system={host_client.ip}\n"
                 number += 1
@@ -612,7 +720,7 @@ class VdbenchIO(IOTool):
             fsd = fsd.replace('$depth', f'{constants.VDBENCH_DEPTH}')
             for i in range(fsd_group_number):
                 fsd_number = index * fsd_group_number + i
-                anchor_path = self.host.get_env_parameter("anchor_path")
+                anchor_path = self.anchor_root
                 for j in range(dir_depth):
                     anchor_path = self.host.join_path(anchor_path, f"dir{fsd_number}")
                 fsd_line += f"fsd=fsd{fsd_number},anchor={anchor_path}{fsd}\n"
@@ -659,64 +767,118 @@ class VdbenchIO(IOTool):
         self.host.replace_content(config_file, "$thread", thread)
 
         # 判断是否需要清理环境
-        self.format_status = f"{fsd_group_number}&{fsd_width}"
-        self.is_clean(self.format_status)
+        self.manifest = DatasetManifest.from_config(config_file)
+        self.is_clean(self.manifest)
 
         return config_file
 
-    def create_tag_file(self):
-        anchor_path = self.client.parameters.get("anchor_path")
-        tag_path = self.client.join_path(anchor_path, "tag")
-        self.client.exec_command(f"echo '{self.format_status}' > {tag_path}")
+    @property
+    def manifest_path(self) -> str:
+        return self.client.join_path(self.anchor_root, constants.VDBENCH_MANIFEST_FILE)
+
+    def write_manifest(self):
+        """数据预制完成后，在anchor根目录保存数据集清单"""
+        os.makedirs(self.case.output_dir, exist_ok=True)
+        local_path = os.path.join(self.case.output_dir, constants.VDBENCH_MANIFEST_FILE)
+        with open(local_path, "w") as file:
+            file.write(self.manifest.dumps())
+        try:
+            self.client.put(local_path, self.manifest_path)
+        except Exception:
+            self.logger.debug(traceback.format_exc())
+            self.logger.warning(f"Saving dataset manifest failed: {self.manifest_path}")
 
-    def is_clean(self, new_tag):
-        anchor_path = self.client.parameters.get("anchor_path")
-        tag_path = self.client.join_path(anchor_path, "tag")
+    def read_manifest(self) -> Optional[DatasetManifest]:
+        """读取anchor根目录下已有的数据集清单，不存在或无效时返回None"""
+        anchor_path = self.host.get_env_parameter("anchor_path")
         try:
-            tag = self.client.exec_command(f"cat {tag_path}", timeout=30).stdout
+            resp = self.client.exec_command(f"cat {self.manifest_path}", timeout=30)
         except socket.timeout:
             raise CaseFailedError(f"mount-point {anchor_path} may be disconnected, please check")
+        if resp.status_code != 0:
+            return None
+        return DatasetManifest.loads(resp.stdout)
 
-        if new_tag == tag:
-            self.clean = False
+    def is_clean(self, manifest: DatasetManifest):
+        """ 与已有数据集清单比对，判断是否需要预埋数据
+
+        参数一致的anchor再抽样检查目录结构，抽样检查不通过时全部重新预埋
+        """
+        plan = manifest.compare(self.read_manifest())
+        if plan.matched and not self.verify_anchors(manifest, plan.matched):
+            plan = manifest.compare(None)
+        self.dataset_plan = plan
+        self.clean = plan.need_format
+        self.logger.debug(f"Dataset {manifest.digest}: {len(plan.matched)} fsd(s) reusable, "
+                          f"{len(plan.changed)} fsd(s) to format, {len(plan.stale)} stale")
+
+    def verify_anchors(self, manifest: DatasetManifest, anchors: List[str]) -> bool:
+        """ 抽样检查anchor下的数据集结构
+
+        检查vdbench控制文件、第一层最后一个目录与第一个末级目录是否存在
+        """
+        samples = random.sample(anchors, min(len(anchors), constants.VDBENCH_MANIFEST_SAMPLES))
+        for anchor in samples:
+            paths = [(self.client.join_path(anchor, "vdb_control.file"), False)]
+            layout = manifest.layout(anchor)
+            if layout:
+                depth, width = layout
+                paths.append((self.client.join_path(anchor, f"vdb.1_{width}.dir"), True))
+                paths.append((self.client.join_path(anchor, *[f"vdb.{i}_1.dir" for i in range(1, depth + 1)]), True))
+            for path, is_dir in paths:
+                if not self.client.exists(path, is_dir=is_dir):
+                    self.logger.debug(f"Dataset verification failed, {path} not exists")
+                    return False
+        return True
+
+    def remove_anchors(self, anchors: List[str]):
+        """删除anchor下的数据集。文件数量可能很多，不设超时"""
+        for anchor in anchors:
+            self.logger.debug(f"Remove dataset: {anchor}")
+            self.client.remove(anchor, timeout=-1)
+
+    @property
+    def anchor_clients(self) -> ClientGroup:
+        """参与读写的所有主机"""
+        return ClientGroup(self.anchor_paths.keys())
 
     def client_drop_caches(self):
         self.logger.debug("drop cache")
-        for client in self.anchor_paths.keys():
-            res = client.drop_caches()
-            if not res:
-                self.logger.error(f"{client.ip} drop caches fail")
+        for result in self.anchor_clients.run_all(lambda client: client.drop_caches()):
+            if not result.ok or not result.value:
+                self.logger.error(f"{result.client.ip} drop caches fail")
         self.logger.debug("Done drop cache")
 
     def client_mount(self):
         self.logger.debug("umount and mount")
-        for client in self.anchor_paths.keys():
-            umount_cmd = client.get_parameter("umount_command")
-            try:
-                res_umount = client.exec_command(umount_cmd)
-                if res_umount.status_code != 0:
-                    raise RuntimeError
-            except Exception:
-                raise CaseFailedError(f"{client.ip} umount failed. Command: {umount_cmd}")
-
-            mount_cmd = client.get_parameter("mount_command")
-            try:
-                res_mount = client.exec_command(mount_cmd)
-                if res_mount.status_code != 0:
-                    raise RuntimeError
-            except Exception:
-                raise CaseFailedError(f"{client.ip} mount failed. Command: {mount_cmd}")
-
+        self.anchor_clients.run_all(self._remount, raise_error=True)
         self.logger.debug("Done unmount and mount")
 
-    def find_bottom_data(self, *args, **kwargs) -> list:
-        raise NotImplementedError
+    @staticmethod
+    def _remount(client: SSHClient):
+        """单个主机重新挂载"""
+        umount_cmd = client.get_parameter("umount_command")
+        try:
+            res_umount = client.exec_command(umount_cmd)
+            if res_umount.status_code != 0:
+                raise RuntimeError
+        except Exception:
+            raise CaseFailedError(f"{client.ip} umount failed. Command: {umount_cmd}")
 
-    def parse_zero(self, matched_lines: List[str], continuous=None) -> list:
-        """ 解析有归零情况的日志行，返回归零时间或详细归零数据
+        mount_cmd = client.get_parameter("mount_command")
+        try:
+            res_mount = client.exec_command(mount_cmd)
+            if res_mount.status_code != 0:
+                raise RuntimeError
+        except Exception:
+            raise CaseFailedError(f"{client.ip} mount failed. Command: {mount_cmd}")
+
+    def parse_zero(self, store: IntervalStore, start: int = 0, continuous=None) -> list:
+        """ 查找区间数据中的归零情况，返回归零时间或详细归零数据
 
         Args:
-            matched_lines: 有归零情况的数据行
+            store: 区间数据存储
+            start: 开始检查的数据行号
             continuous: 为None时，不检查持续归零情况。为整数N时，检查(至少)连续N秒都处于归零状态的情况
 
         Returns:
@@ -724,54 +886,27 @@ class VdbenchIO(IOTool):
             - 有归零情况，且continuous=None
                 返回归零的所有时间点（List[str]）。例：['16:36:49.007', '16:36:52.006']
             - 有归零情况，且continuous=<int>N
-                返回至少连续N秒都归零的数据（List[dict]）。排序规则：1.持续时长倒序 > 2.开始序号正序
+                返回至少连续N秒都归零的数据（List[dict]），按开始时间排序
                 例：  [
                         {
-                            "归零开始时间": '16:36:49.007',
-                            "归零结束时间": '16:36:52.006',
+                            "跌零开始时间": '16:36:49.007',
+                            "跌零结束时间": '16:36:52.006',
                             "持续时长": 3
                         }
                 ]
                 注意：此功能要求vdbench执行配置中的日志输出间隔为1秒（interval=1)
         """
-        matched_lines = [_ for _ in matched_lines if "0" in _]
-        if not matched_lines:
-            return []
-
         if continuous is None:
-            result = [line.split(maxsplit=1)[0] for line in matched_lines]
+            result = [vdbench_log.ms2tod(store.tod[row]) for row in store.find_zero_rows(start)]
         else:
-            line_dict = {}
-            result = []
-            for line in matched_lines:
-                try:
-                    time_str, lineno, _ = line.split(maxsplit=2)
-                except ValueError:
-                    continue
-                if lineno.isdigit():
-                    line_dict[int(lineno)] = time_str
-
-            # 按前后序号差值分组 => 连号的为一组
-            for _, g in groupby(enumerate(line_dict), lambda x: x[0] - x[1]):  # g：连续数据组（要求interval=1）
-                group = [(k, line_dict.get(k)) for k in map(itemgetter(1), g)]  # k：序号
-                if len(group) == 1:
-                    continue
-                start_lineno, start_time = group[0]
-                _, end_time = group[-1]
-                start = datetime.strptime(start_time, "%H:%M:%S.%f")
-                end = datetime.strptime(end_time, "%H:%M:%S.%f")
-                duration = (end - start).seconds
-                if continuous <= duration:
-                    result.append(
-                        {
-                            "跌零开始时间": start_time,
-                            "跌零结束时间": end_time,
-                            "持续时长": duration
-                        }
-                    )
-            if result:
-                df = pd.DataFrame(result, index=None)
-                result = df.to_dict("records")
+            result = [
+                {
+                    "跌零开始时间": vdbench_log.ms2tod(store.tod[start_row]),
+                    "跌零结束时间": vdbench_log.ms2tod(store.tod[end_row]),
+                    "持续时长": int(duration)
+                }
+                for start_row, end_row, duration in zip(*store.find_zero_runs(start, continuous))
+            ]
         self.logger.debug(f"Vdbench zero-io-data：{result}")
         return result
 
@@ -797,12 +932,27 @@ class VdbenchIO(IOTool):
         if not setup_success:
             raise RuntimeError(f"Waiting for vdbench to reach stage {stage} error")
 
-    def is_stage_start(self, stage: VdbenchState, output_dir=None):
-        """ 日志是否可以查询到io数据。此函数应由各主机子类实现 """
-        raise NotImplementedError
+    def log_store(self, output_dir=None) -> IntervalStore:
+        """ 读取logfile.html新增内容，返回该输出目录最新的区间数据存储
+
+        每个输出目录（预埋、正式执行）各自跟踪，日志只在新增时读取、每行只解析一次
+        """
+        path = self.get_logfile_html(output_dir)
+        follower = self._log_followers.get(path)
+        if not follower:
+            follower = self._log_followers[path] = VdbenchLogFollower(self.client, path)
+        return follower.update()
+
+    def is_stage_start(self, stage: VdbenchState, output_dir=None) -> bool:
+        """ 检查vdbench是否已开始输出io数据
+
+        Args:
+            stage：阶段（rd/format），根据阶段对应关键字向后获取io数据
+        """
+        return self.log_store(output_dir).is_stage_start(self.get_stage_keyword(stage))
 
-    def rate_cols(self, *args, **kwargs) -> List[int]:
-        """ 获取需校验的指标索引列表。此函数应由各主机封装实现
+    def rate_cols(self, output_dir=None) -> List[int]:
+        """ 获取需校验的指标索引列表
 
         ************************************ summary.html示例  ***************************************
 
@@ -819,19 +969,120 @@ class VdbenchIO(IOTool):
         Returns:
             需校验的指标索引列表。例：[2,7,9,15,17,19,21,23,25]
         """
-        pass
+        rate_cols = self.log_store(output_dir).rate_cols
+        if not rate_cols:
+            raise RuntimeError("Parsing vdbench logfile rate-cols-index failed")
+        self.logger.debug(f"rate cols to check：{rate_cols}")
+        return rate_cols
+
+    def find_bottom_data(self, continuous=None, wait_args: dict = None, **kwargs) -> list:
+        """检查vdbench日志性能数据归零情况
+
+        Args:
+            continuous: 为None时，不检查持续归零情况。为整数N时，检查连续N秒都处于归零状态的情况
+            wait_args: 包含contain_format=True时，从数据预制阶段开始检查
+            kwargs: 见 ``_verify_io_data``
+
+        Returns:
+            参见 ``VdbenchIO.parse_zero``
+        """
+        stage = VdbenchState.RD
+        if wait_args and wait_args.get("contain_format"):
+            stage = VdbenchState.FORMAT
+        store = self.log_store()
+        start = store.stage_start_row(self.get_stage_keyword(stage))
+        if start is None:
+            return []
+        return self.parse_zero(store, start, continuous=continuous)
+
+    def steady_state(self) -> Optional[SteadyState]:
+        """正式读写阶段的稳定区间，未启用稳态检测、非性能用例或未达到稳态时返回None"""
+        if not constants.STEADY_STATE_ENABLED or not self.is_perf_case:
+            return None
+        store = self.log_store()
+        start = store.stage_start_row(self.get_stage_keyword(VdbenchState.RD))
+        if start is None:
+            return None
+        return SteadyStateDetector().detect(store, start)
+
+    def check_steady_stop(self):
+        """稳定区间足够长且平均OPS置信区间足够窄时，安全停止vdbench（提前结束正式读写）"""
+        if self.status != VdbenchState.RD or self.steady_stopped:
+            return
+        steady = self.steady_state()
+        if not steady or steady.duration < constants.STEADY_MIN_DURATION:
+            return
+        if steady.ci is None or steady.ci > constants.STEADY_CI_TARGET:
+            return
+        self.logger.info(f"File I/O performance is steady for {steady.duration}s "
+                         f"(ops={steady.rate:.2f}, ci=±{steady.ci:.2%}), stopping early")
+        self.host.create_file(self.get_mon_file(), content="end_vdbench")
+        self.steady_stopped = True
+
+    def probe(self, elapsed: int, steady_time: int, interval=10, **kwargs) -> dict:
+        """ 短时探测：后台运行vdbench，稳定区间达到steady_time（秒）或运行结束后停止，返回平均性能
+
+        数据集与已有清单一致时跳过预埋，多次探测只在首次预埋数据
+
+        Args:
+            elapsed: 最长读写时长（秒）
+            steady_time: 稳定区间时长（秒）
+            interval: 检查稳定区间的间隔时间（秒）
+            **kwargs: `run` 的其他参数
+
+        Returns: {"ops", "bw", "resp", "tail_resp", "steady"}
+        """
+        self.run(elapsed=elapsed, wait=False, **kwargs)
+        if not self.wait_for_stage_start():
+            raise CaseFailedError("Probing failed: file I/O not started")
+
+        steady = None
+        while self.is_running():
+            steady = self.steady_state()
+            if steady and steady.duration >= steady_time:
+                break
+            time.sleep(interval)
+        self.stop(wait=True)
+
+        tail_resp = self.get_tail_resp()
+        return dict(ops=round(self.get_avg_ops(), 3),
+                    bw=round(self.get_avg_bw(), 3),
+                    resp=round(self.get_avg_resp(), 3),
+                    tail_resp=None if tail_resp is None else round(tail_resp, 3),
+                    steady=steady is not None)
+
+    def get_tail_resp(self, percentile=constants.SLO_TAIL_PERCENTILE) -> Optional[float]:
+        """ 尾部时延（毫秒）：vdbench时延分布（histogram，除warmup外的全部请求）的分位数，未解析到时延分布时返回None
+
+        不使用各区间平均时延的分位数，其远低于请求级别的尾部时延
+        """
+        hist = self.reporter.latency_histograms().get("total")
+        return hist.percentile(percentile) if hist is not None else None
 
     def get_avg_resp(self) -> float:
         """获取IO平均时延（毫秒）"""
-        raise NotImplementedError
+        return self._get_avg_value(vdbench_log.COL_RESP)
 
     def get_avg_bw(self) -> float:
         """获取IO平均带宽（MBPS）"""
-        raise NotImplementedError
+        return self._get_avg_value(vdbench_log.COL_MBPS)
 
     def get_avg_ops(self) -> float:
         """获取IO平均OPS（OPS）"""
-        raise NotImplementedError
+        return self._get_avg_value(vdbench_log.COL_RATE)
+
+    def _get_avg_value(self, index):
+        """ 稳定区间的平均值；未检测到稳定区间时，取最后一个avg汇总行中指定列的值（索引同数据行：[0]=时间，[1]=avg标签）"""
+        steady = self.steady_state()
+        if steady:
+            return {vdbench_log.COL_RATE: steady.rate,
+                    vdbench_log.COL_RESP: steady.resp,
+                    vdbench_log.COL_MBPS: steady.mbps}[index]
+        avg = self.log_store().last_avg
+        if not avg:
+            raise RuntimeError("Parse vdbench avg data failed")
+        _, _, values = avg
+        return values[index - 2]
 
     def handle_benchmark(self):
         """性能基线用例执行完成后，保存基线、处理功耗"""
@@ -843,7 +1094,11 @@ class VdbenchIO(IOTool):
     def _run_vdbench_cmd(self, config_file , output_dir, param_str=None):
         """执行vdbench，并返回可用于kill的进程id"""
 
+        # 同一输出目录重新执行时日志会被重新创建
+        self._log_followers.pop(self.get_logfile_html(output_dir), None)
         cmd = f"{self.executable_path} -f {config_file} -o {output_dir} "
+        if self.parallel_lane is not None:
+            cmd += f"-p {self.port} "
         if param_str:
             cmd += param_str
         self.host.client.run_cmd_background(cmd, interact=False) # 不使用交互式，避免响应被异常截断
@@ -900,10 +1155,19 @@ class LinuxVdbenchIO(VdbenchIO):
             pid = self.pid
         logfile = self.get_logfile_html(output_dir)
 
-        if self.host.file_contains(logfile, "Vdbench execution completed successfully"):
+        # 主机代理可用时，两项检查一次往返完成
+        completed, running = self.client.agent_batch([
+            ("file_contains", dict(path=logfile, target="Vdbench execution completed successfully")),
+            ("is_pid_exists", dict(pid=pid)),
+        ]) or (None, None)
+        if not isinstance(completed, bool):
+            completed = self.host.file_contains(logfile, "Vdbench execution completed successfully")
+        if completed:
             return True
 
-        if self.host.is_pid_exists(pid):
+        if not isinstance(running, bool):
+            running = self.host.is_pid_exists(pid)
+        if running:
             return None  # 执行中
         else:
             self.logger.debug(f"Vdbench process(pid={pid}) terminated abnormally")
@@ -915,110 +1179,6 @@ class LinuxVdbenchIO(VdbenchIO):
             self.case.fail(f"检测到文件数据一致性校验失败")
             self.logger.warning(f"Detected file data validation error, check log for details: {self.errorlog_html}")
 
-    def find_bottom_data(self, continuous=None, **kwargs) -> list:
-        """检查vdbench日志性能数据归零情况
-
-        Args:
-            continuous: 为None时，不检查持续归零情况。为整数N时，检查连续N秒都处于归零状态的情况
-            kwargs: 见 ``_verify_io_data``
-
-        Returns:
-            参见 ``VdbenchIO.parse_zero``
-        """
-
-        # 截取正式读写数据并保存
-        trim_log = f"{self.output_dir}/trim_log.txt"
-        keyword = self.get_stage_keyword(VdbenchState.RD)
-        self.client.exec_command(
-            f"sed -n '/{keyword}/,$p' {self.logfile_html} | sed -n '/[Ii]nterval/,$p' > {trim_log}")
-
-        # 获取需要校验的指标索引列表
-        cols_to_check = self.rate_cols(trim_log)
-        matched = self.get_matched_lines(trim_log, cols_to_check)
-        return self.parse_zero(matched, continuous=continuous)
-
-    def get_matched_lines(self, trim_log, cols_to_check: List[int]):
-        """获取有归零情况的日志行
-
-        Args:
-            trim_log: 截取后的summary.html路径。内容从vdbench执行的第一行正式数据开始，即："Jan 01, 2022 ..Interval.."
-            cols_to_check: 日志文件中需校验的指标索引，如：[2, 7, 9...]
-        """
-
-        # 由于后续awk命令中$0为整行，指标索引需往后推一位
-        sum_col = "+".join([f"${c + 1}" for c in cols_to_check])
-        max_col = cols_to_check[-1] + 2
-
-        # awk筛选条件：1、该行列数=最大列数 2、是有效数据行 3、校验列值总和为0
-        cmd = f"awk '{{sum={sum_col}; if (NF == {max_col} && $0 !~ /rate/ && sum == 0) {{print $0}}}}' {trim_log}"
-        matched = self.client.exec_command(cmd).stdout.strip()
-        if matched:
-            return matched.splitlines()
-        else:
-            self.logger.debug("vdbench: io-bottom not detected")
-            return []
-
-    def rate_cols(self, trim_log) -> List[int]:
-        """  获取summary.html中需校验的指标索引列表。详细说明参见 ``VdbenchIO._cols_to_check()``
-
-        Args:
-            trim_log: 截取后的logfile.html路径。内容从vdbench执行的第一行正式数据开始，即："Jan 01, 2022 ..Interval.."
-        """
-        # 查询rate行
-        cmd = f'rate_line=(`grep rate {trim_log} | head -1`);'
-        # 将rate行以空格分隔为列表，获取并以逗号分隔打印所有"rate"字符串的索引
-        cmd += 'for i in "${!rate_line[@]}"; do [[  "${rate_line[$i]}" = "rate"  ]] && printf $i, ; done;echo'
-        stdout = self.client.exec_command(cmd).stdout.strip()
-        index_match = None
-        if stdout:
-            index_match = re.findall(r".*\d+,+", stdout)
-
-        if not index_match:
-            raise RuntimeError("Parsing vdbench logfile rate-cols-index failed")
-
-        # +2说明：[0]=时间，[1]=序号，[2]=实际数据列开始
-        rate_index_list = sorted([int(c) + 2 for c in index_match[0].strip(",").split(",") if c.isnumeric()])
-        self.logger.debug(f"rate cols to check：{rate_index_list}")
-        return rate_index_list
-
-    def is_stage_start(self, stage: VdbenchState, output_dir=None) -> bool:
-        """ 检查vdbench是否已开始输出io数据
-
-        Args:
-            stage：阶段（rd/format），根据阶段对应关键字向后获取io数据
-        """
-        # 开始读写/数据预制的日志行数
-        path = self.get_logfile_html(output_dir)
-        keyword = self.get_stage_keyword(stage)
-        lineno = self.client.exec_command(f"grep -n '{keyword}' '{path}' | cut -d: -f1 | head -n1").stdout.strip()
-        if not lineno:
-            return False
-
-        # 从第lineno起以时间戳匹配IO数据行
-        lineno = int(lineno) + 1
-        cmd = f"grep -q '[0-9][0-9]:[0-9][0-9]:[0-9][0-9]' <(tail -n +{lineno} '{path}') && echo True"
-        output = self.client.exec_command(cmd).stdout.strip()
-        return output == "True"
-
-    def get_avg_resp(self) -> float:
-        """获取IO平均时延（毫秒）"""
-        return self._get_avg_value(4)
-
-    def get_avg_ops(self) -> float:
-        return self._get_avg_value(3)
-
-    def get_avg_bw(self) -> float:
-        """获取平均带宽（mb/s）"""
-        return self._get_avg_value(14)
-
-    def _get_avg_value(self, index):
-        resp = self.client.exec_command(f"tac {self.logfile_html} | grep -m 1 avg | awk '{{print ${index}}}'")
-        result = resp.stdout.strip()
-        if result:
-            return float(result)
-        else:
-            raise RuntimeError("Parse vdbench avg data failed")
-
 
 class WindowsVdbenchIO(VdbenchIO):
     client_type = WindowsClient
@@ -1054,132 +1214,6 @@ class WindowsVdbenchIO(VdbenchIO):
         resp = self.client.exec_command(cmd)
         return resp.stdout.strip() != ""
 
-    def get_matched_lines(self, trim_log, cols_to_check: list, log=True) -> list:
-        """  获取有归零情况的日志行
-
-        Args:
-            trim_log: 截取后的summary.html路径。内容从vdbench执行的第一行正式数据开始，即："Jan 01, 2022 ..Interval.."
-            cols_to_check: 日志文件中需校验的指标索引
-            log: 是否保存归零数据日志（若有）
-        """
-        cmd = """
-        $trim_log='%(trim_log)s';
-        $check_cols=%(check_cols)s;
-        echo "zero lines are below";
-        ForEach($line in Get-Content $trim_log){   
-            if (!($line -like '*rate*') -And !($line -like '*Interval*') -And $line ){        
-                $curline_arr = $line -split '\s+';
-                if ($curline_arr.Length -gt $check_cols[-1]){
-                    $zr_line = $true;
-                    :outer ForEach( $ind in $check_cols){
-                        if ( ![decimal]$curline_arr[$ind] -eq 0.0 ){
-                            $zr_line = $false;
-                            break :outer
-                        }             
-                    }
-                    if ($zr_line){ echo $line }
-                }
-            }
-        } """
-        check_cols = ",".join([str(r) for r in cols_to_check])
-        cmd = re.sub(r"\s{4,}", " ", cmd)
-        cmd = cmd % dict(trim_log=trim_log, check_cols=check_cols)
-        stdout = self.client.run_cmd(cmd).stdout.strip()
-        result = []
-        if stdout:
-            real_output = stdout.split("zero lines are below")[-1]
-            if real_output.strip():
-                head = self.client.run_cmd(f"Get-Content $trim_log -encoding UTF8 | Select-Object -First 2",
-                                           is_print=False)
-                result = real_output.splitlines()
-
-        return result
-
-    def find_bottom_data(self, continuous=None, wait_for_start=False,
-                         wait_args: dict = None, log=True, **kwargs) -> list:
-        """ 检查vdbench日志logfile_html中数据归零情况
-
-        若有归零情况，所有归零行将保存到 用例目录/logs/vdbench_return_zero_{当前时间}_{用例名称}.txt中
-
-        Args:
-            continuous: 为None时，不检查持续归零情况。为整数N时，检查连续N秒都处于归零状态的情况
-            wait_for_start: 等待vdbench正式开始执行(数据预制完成、且已开始输出日志)。
-                               默认不等待，若此时日志尚未就绪将报错
-            wait_args: ``VdbenchIO.wait_for_setup()`` 的参数
-            log: 是否保存归零数据日志（若有）
-
-        Returns:
-            参见 ``VdbenchIO.parse_zero()``
-        """
-
-        # 截取正式读写数据并保存
-        keyword = "elapsed="
-        if wait_args and wait_args.get("contain_format"):
-            keyword = "RD=format"
-        trim_log = f"{self.output_dir}\\trim_log.txt"
-        cmd = f'$lineno = ((Select-String -Pattern "{keyword}" -Path {self.logfile_html}).LineNumber)[0]; ' \
-              f'Get-Content {self.logfile_html} | Select-Object -Skip $lineno ' \
-              f'| Where-Object {{$_}} | Set-Content {trim_log} -encoding utf8'
-        self.client.exec_command(cmd)
-
-        # 获取需要校验的指标索引列表
-        cols_to_check = self.rate_cols(trim_log)
-        # 获取归零数据并保存日志
-        matched = self.get_matched_lines(trim_log, cols_to_check, log=log)
-        return self.parse_zero(matched, continuous=continuous)
-
-    def rate_cols(self, trim_log) -> List[int]:
-        """获取summary.html中需校验的指标索引列表
-
-        详细说明参见 ``VdbenchIO._cols_to_check()``
-
-        Args:
-            trim_log: 截取后的summary.html路径。
-                内容从vdbench执行的第一行正式数据开始，即："Jan 01, 2022 ..Interval.."
-        """
-        cmd = """
-        $trim_log='%(trim_log)s';
-        $header=(Select-String -Pattern 'rate' -Path $trim_log | Select-Object -First 1 -ExpandProperty Line).Trim();
-        $header=$header -split '\s+';
-        $check_cols = @();
-        ForEach ($i in (0..($header.Count - 1))){
-            if ($header[$i] -eq 'rate'){
-                $check_cols += $i
-            }
-        }
-        echo result<$check_cols>
-        """
-        result = self.client.run_cmd(cmd % dict(trim_log=trim_log)).stdout.strip()
-        check_cols = re.findall(r".*result<(?!\$)(.*)>.*", result)
-        check_cols = [col for col in check_cols if col != '']
-        if not check_cols:
-            raise RuntimeError(f"vdbench summary file rate cols index parsing failed")
-
-        # +2说明：[0]=时间，[1]=序号，[2]=实际数据列开始
-        check_cols = sorted([int(i) + 2 for i in check_cols[0].split()])
-        self.logger.debug(f"vdbench rate cols：{check_cols}")
-        return check_cols
-
-    def is_stage_start(self, stage, output_dir=None):
-        """ 日志是否可以查询到读写数据
-
-        Args:
-            stage：阶段（rd/format），根据阶段对应关键字向后获取io数据
-        """
-
-        # 开始数据预制/操作的日志行数
-        path = self.logfile_html
-        keyword = self.get_stage_keyword(stage)
-        cmd = f'Select-String -Path "{path}" -Pattern "{keyword}" | Select-Object -ExpandProperty LineNumber -First 1'
-        lineno = self.client.exec_command(cmd).stdout.strip()
-        if not lineno:
-            return False
-
-        # 从第lineno起以时间戳匹配IO数据行
-        cmd = f'Get-Content "{path}" | Select-Object -Skip {lineno} | Select-String -Pattern "\d+:\d+:\d+" -Quiet'
-        output = self.client.exec_command(cmd).stdout.strip()
-        return output == "True"
-
 
 class VdbenchReporter:
     FLAT_CSV = "flat.csv"
@@ -1194,6 +1228,8 @@ class VdbenchReporter:
             raise SESError("Please make sure VdbenchIO.run has been called")
 
         self.output_dir = vdbench.output_dir
+        # 稳定区间（生成csv时检测）
+        self.steady_state: Optional[SteadyState] = None
         # 基本绘图子图信息
         self.labels = [
             {"name": "Rate", "ylabel": "ops"},
@@ -1201,6 +1237,13 @@ class VdbenchReporter:
             {"name": "resp", "ylabel": "ms"},
         ]
 
+    def __getstate__(self):
+        """用于在报告渲染进程中执行绘图、表格方法，不传递vdbench和主机连接"""
+        state = self.__dict__.copy()
+        state.pop("vdbench", None)
+        state.pop("client", None)
+        return state
+
     @property
     def get_csv_file(self):
         return f"{self.output_dir}/{self.FLAT_CSV}"
@@ -1221,22 +1264,24 @@ class VdbenchReporter:
         return value
 
     def generate_timestamp_xaix(self, df) -> List[datetime]:
-        x = []
-        last_item = None
-        for item in reversed(df["tod"].values.tolist()):
-            x.append(self.ts2datetime(item, last_item))
-            last_item = item
-        return x[::-1]
+        """ tod列转换为时间对象列表
+
+        最后一行为当天，由后向前每出现一次时间回退（tod大于后一行）即跨天，日期减一天
+        """
+        tod = pd.to_timedelta(df["tod"].astype(str)).to_numpy()
+        if not len(tod):
+            return []
+        rollover = (tod[:-1] > tod[1:]).astype(np.int64)
+        days = np.append(np.cumsum(rollover[::-1])[::-1], 0)
+        base = pd.Timestamp(self.today.date())
+        x = base + pd.to_timedelta(tod) - pd.to_timedelta(days, unit="D")
+        return list(x.to_pydatetime())
 
     @staticmethod
     def del_format_data(df, reset_index=True):
-        run_types = df["Run"].values.tolist()
-        for i, v in enumerate(run_types):
-            if "format" not in v:
-                continue
-            df = df.drop(index=i)
+        df = df[~df["Run"].astype(str).str.contains("format", regex=False)]
         if reset_index:
-            df.reset_index(drop=True, inplace=True)
+            df = df.reset_index(drop=True)
         return df
 
     def get_y_cols(self) -> list:
@@ -1250,8 +1295,13 @@ class VdbenchReporter:
     def make_common_report_section(self):
         """创建默认报告"""
         remote_csv, remote_avg_csv = self.create_csv_file()
-        return ReportUtil.build_perf_test_html_object(remote_csv, remote_avg_csv,
-                                                      self.create_common_chart, self.create_common_avg_table)
+        steady_records = self.steady_state.to_records() if self.steady_state else None
+        return self.vdbench.case.suite.report.render(ReportUtil.build_perf_test_html_object,
+                                                     remote_csv, remote_avg_csv,
+                                                     self.create_common_chart, self.create_common_avg_table,
+                                                     steady_records=steady_records,
+                                                     latency_records=self.latency_records(self.latency_percentiles()),
+                                                     latency_heatmap=self.latency_heatmap())
 
     def make_indicator(self) -> tuple:
         bw = self.vdbench.get_avg_bw()
@@ -1266,12 +1316,6 @@ class VdbenchReporter:
         cols = ["tod", "Run", "Interval"]
         cols.extend(self.get_y_cols())
 
-        cols_str = " ".join(cols)
-        cmd = f"{self.exec_path} parseflat -i {remote_path} -c {cols_str} -o {remote_csv}"
-        resp = self.client.exec_command(cmd)
-        if resp.status_code != 0:
-            self.notice_report_parsing_error()
-
         avg_cols = ["tod", "Run", "Interval"]
         labels = copy.deepcopy(self.get_y_cols())
         for op in self._get_configured_operations():
@@ -1279,23 +1323,17 @@ class VdbenchReporter:
             labels.append(f"{_op}_rate")
             if op in ["read", "write"]:
                 labels.append(f"MB_{op}")
-            try:
-                labels.append(f"{_op}_resp")
-            except:
-                print("zzj error:1")
+            labels.append(f"{_op}_resp")
         avg_cols.extend(labels)
 
-        avg_cols_str = " ".join(avg_cols)
-        cmd = f"{self.exec_path} parseflat -i {remote_path} -c {avg_cols_str} -o {remote_avg_csv} -a"
-        resp = self.client.exec_command(cmd)
-        if resp.status_code != 0:
+        # 一次解析同时生成区间数据（去除warmup时间）与平均值数据。检测到稳定区间时，以稳定区间开始位置作为warmup结束
+        self.steady_state = self.vdbench.steady_state()
+        skip = self.steady_state.start_row if self.steady_state else constants.VDBENCH_WARMUP
+        try:
+            FlatfileParser(remote_path).to_csv(cols, remote_csv, avg_cols, remote_avg_csv, skip=skip)
+        except (OSError, ValueError) as e:
+            self.vdbench.logger.debug(f"Parse vdbench flatfile failed: {e!r}")
             self.notice_report_parsing_error()
-
-        # 去除warmup时间
-        df = pd.read_csv(remote_csv)
-        warm_up = constants.VDBENCH_WARMUP
-        df = df[warm_up:]
-        df.to_csv(remote_csv, index=False)
         return remote_csv, remote_avg_csv
 
     def notice_report_parsing_error(self):
@@ -1353,16 +1391,110 @@ class VdbenchReporter:
         return TitledContent("I/O跌零", zero_info).to_soup(), duration, times
 
     def handle_benchmark(self):
-        """保存性能数据。必须在csv文件生成之后"""
-        csv_path = self.client.join_path(self.output_dir, self.AVG_CSV)
-        if os.path.exists(csv_path):
-            raw_avg_csv = pd.read_csv(csv_path)
-            self.vdbench.case.cache_runtime_data(CacheDataKey.AVG_BANDWIDTH_BENCHMARK,
-                                                 raw_avg_csv["MB/sec"].iloc[0])
-            self.vdbench.case.cache_runtime_data(CacheDataKey.AVG_OPS_BENCHMARK,
-                                                 raw_avg_csv["Rate"].iloc[0])
+        """保存性能数据，与用例报告中的OPS、带宽指标一致（稳定区间的平均值）"""
+        try:
+            bandwidth = self.vdbench.get_avg_bw()
+            ops = self.vdbench.get_avg_ops()
+        except RuntimeError as e:
+            self.vdbench.case.logger.debug(f"handle benchmark failed: {e}")
+            return
+        self.vdbench.case.cache_runtime_data(CacheDataKey.AVG_BANDWIDTH_BENCHMARK, bandwidth)
+        self.vdbench.case.cache_runtime_data(CacheDataKey.AVG_OPS_BENCHMARK, ops)
+
+    def latency_histograms(self) -> Dict[str, Histogram]:
+        """ 各operation及全部请求（total）的时延分布
+
+        histogram.html中同一operation（或全部请求）的分布以最后出现的为准（即最后一个rd）；
+        各fwd的分布文件（fwd*.histogram.html）按fwd的operation合并。解析失败时返回空字典
+        """
+        result = {}
+        try:
+            path = self.client.join_path(self.output_dir, "histogram.html")
+            if os.path.exists(path):
+                for title, hist in HistogramParser(path).parse():
+                    result[HistogramParser.operation(title) or "total"] = hist
+
+            fwd_operations = self._get_fwd_operations()
+            fwd_result = {}
+            for path in glob.glob(self.client.join_path(self.output_dir, "fwd*.histogram.html")):
+                op = fwd_operations.get(os.path.basename(path).split(".")[0])
+                blocks = HistogramParser(path).parse()
+                if op and blocks:
+                    hist = blocks[-1][1]
+                    fwd_result[op] = fwd_result[op].merge(hist) if op in fwd_result else hist
+            for op, hist in fwd_result.items():
+                result.setdefault(op, hist)
+        except (OSError, ValueError) as e:
+            self.vdbench.logger.debug(f"Parse vdbench histogram failed: {e!r}")
+            return {}
+
+        if "total" not in result and result:
+            total = Histogram()
+            for hist in result.values():
+                total = total.merge(hist)
+            result["total"] = total
+        return result
+
+    def latency_percentiles(self) -> Dict[str, dict]:
+        """各operation的请求数与时延分位数 {operation: {"count": 请求数, 50: P50, ...}}，全部请求为total"""
+        result = {}
+        for op, hist in self.latency_histograms().items():
+            values = {p: hist.percentile(p) for p in constants.LATENCY_PERCENTILES}
+            result[op] = {"count": hist.total, **values}
+        return result
+
+    @staticmethod
+    def latency_records(percentiles: Dict[str, dict]) -> Optional[List[dict]]:
+        """时延分位数表格数据，全部请求在前"""
+        if not percentiles:
+            return None
+        records = []
+        for op in sorted(percentiles, key=lambda k: (k != "total", k)):
+            record = {"操作": "全部" if op == "total" else op, "请求数": percentiles[op]["count"]}
+            for p in constants.LATENCY_PERCENTILES:
+                value = percentiles[op][p]
+                record[f"P{p:g}(ms)"] = "-" if value is None else round(value, 3)
+            records.append(record)
+        return records
+
+    def latency_heatmap(self) -> Optional[dict]:
+        """ 时延热力图数据：正式读写阶段按constants.LATENCY_HEATMAP_WINDOW秒分段，统计各段内区间时延落在各桶的比例
+
+        桶边界为constants.VDBENCH_HISTOGRAM_BUCKETS，未配置时按区间时延范围等比划分。IO归零的区间不计入
+
+        Returns: {"times": 各段开始时间, "edges": 桶边界（毫秒）, "matrix": [桶][段]比例}，无数据时为None
+        """
+        store = self.vdbench.log_store()
+        start = store.stage_start_row(VdbenchIO.get_stage_keyword(VdbenchState.RD))
+        if start is None or start >= len(store):
+            return None
+        tod = np.asarray(store.tod)[start:]
+        rate = np.asarray(store.rate)[start:]
+        resp = np.asarray(store.resp)[start:][rate > 0]
+        seconds = (((tod - tod[0]) % MS_PER_DAY) / 1000)[rate > 0]
+        if not resp.size:
+            return None
+
+        if constants.VDBENCH_HISTOGRAM_BUCKETS:
+            edges = np.asarray(sorted(constants.VDBENCH_HISTOGRAM_BUCKETS), dtype=float)
         else:
-            self.vdbench.case.logger.debug(f"handle benchmark failed, file not exist: {csv_path}")
+            low = max(float(resp.min()), 0.001)
+            edges = np.geomspace(low, max(float(resp.max()), low * 2), 21)
+        window = constants.LATENCY_HEATMAP_WINDOW
+        time_edges = np.arange(0, seconds[-1] + window + 1, window)
+        matrix, _, _ = np.histogram2d(seconds, np.clip(resp, edges[0], edges[-1]), bins=[time_edges, edges])
+        matrix = matrix / np.maximum(matrix.sum(axis=1, keepdims=True), 1)
+        times = [ms2tod((int(tod[0]) + int(t) * 1000) % MS_PER_DAY)[:8] for t in time_edges[:-1]]
+        return dict(times=times, edges=edges.tolist(), matrix=matrix.T.tolist())
+
+    def _get_fwd_operations(self) -> Dict[str, str]:
+        """fwd名称与operation的对应关系"""
+        parmscan_file = self.client.join_path(self.output_dir, "parmscan.html")
+        if not os.path.exists(parmscan_file):
+            return {}
+        with open(parmscan_file, mode="r") as f:
+            content = f.read()
+        return dict(re.findall(r"fwd=(\w+)\S*?,operations?=\(?(\w+)", content))
 
     def _get_configured_operations(self) -> List[str]:
         """匹配执行的operation(s)参数"""
@@ -0,0 +1,140 @@
+# -*- coding: UTF-8 -*-
+import hashlib
+import json
+import re
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+# 数据集清单版本，结构变化时递增，旧版本清单视为不匹配
+MANIFEST_VERSION = 1
+
+HD_PATTERN = re.compile(r"^hd=(?!default\b)[^,\s]+,.*?\bsystem=([^,\s]+)")
+FSD_PATTERN = re.compile(r"^fsd=(?!default\b)[^,\s]+,anchor=([^,\s]+)(.*)$")
+
+
+@dataclass
+class DatasetPlan:
+    """ 数据集比对结果
+
+    matched: 与已有数据一致、无需预埋的anchor
+    changed: 需要（重新）预埋的anchor
+    stale: 已有清单中存在、当前配置不再使用的anchor
+    """
+    matched: List[str] = field(default_factory=list)
+    changed: List[str] = field(default_factory=list)
+    stale: List[str] = field(default_factory=list)
+
+    @property
+    def need_format(self) -> bool:
+        return bool(self.changed)
+
+    @property
+    def incremental(self) -> bool:
+        """部分anchor已有数据，只需预埋其余部分"""
+        return bool(self.matched) and bool(self.changed)
+
+
+class DatasetManifest:
+    """ vdbench数据集清单
+
+    由配置文件中的hd、fsd定义生成：每个fsd（以anchor区分）的参数（目录深度、宽度、文件数、文件大小分布等）
+    与参与读写的主机集合计算指纹。清单保存在anchor根目录下，用例开始前与已有清单比对，判断是否需要预埋数据
+    """
+
+    def __init__(self, hosts: List[str], fsds: Dict[str, str]):
+        """
+        Args:
+            hosts: 参与读写的主机
+            fsds: {anchor: fsd参数}
+        """
+        self.hosts = sorted(set(hosts))
+        self.fsds = fsds
+        self.fingerprints = {anchor: self._fingerprint(params) for anchor, params in fsds.items()}
+
+    @classmethod
+    def from_config(cls, config_file: str) -> "DatasetManifest":
+        """解析vdbench配置文件"""
+        hosts, fsds = [], {}
+        default = ""
+        with open(config_file, "r") as file:
+            for line in file:
+                line = line.strip()
+                if line.startswith("fsd=default"):
+                    default = line[len("fsd=default"):]
+                    continue
+                match = HD_PATTERN.match(line)
+                if match:
+                    hosts.append(match.group(1))
+                    continue
+                match = FSD_PATTERN.match(line)
+                if match:
+                    fsds[match.group(1)] = default + match.group(2)
+        return cls(hosts, fsds)
+
+    @classmethod
+    def loads(cls, content: str) -> Optional["DatasetManifest"]:
+        """由清单文件内容生成，内容无效或版本不一致时返回None"""
+        try:
+            data = json.loads(content)
+            if data.get("version") != MANIFEST_VERSION:
+                return None
+            manifest = cls(data["hosts"], {anchor: fsd["params"] for anchor, fsd in data["fsds"].items()})
+        except (ValueError, KeyError, TypeError, AttributeError):
+            return None
+        # 清单中记录的指纹与参数不一致，说明清单被修改
+        if any(manifest.fingerprints[anchor] != fsd.get("fingerprint") for anchor, fsd in data["fsds"].items()):
+            return None
+        return manifest
+
+    def dumps(self) -> str:
+        fsds = {anchor: dict(params=params, fingerprint=self.fingerprints[anchor]) for anchor, params in
+                self.fsds.items()}
+        return json.dumps(dict(version=MANIFEST_VERSION, digest=self.digest, hosts=self.hosts, fsds=fsds), indent=2)
+
+    @property
+    def digest(self) -> str:
+        """整个数据集的指纹"""
+        content = "\n".join(f"{anchor}={fp}" for anchor, fp in sorted(self.fingerprints.items()))
+        return hashlib.sha256(content.encode()).hexdigest()[:16]
+
+    def _fingerprint(self, params: str) -> str:
+        content = json.dumps(dict(hosts=self.hosts, params=self._normalize(params)), sort_keys=True)
+        return hashlib.sha256(content.encode()).hexdigest()[:16]
+
+    @staticmethod
+    def _normalize(params: str) -> Dict[str, str]:
+        """fsd参数转换为{参数名: 值}，同名参数以后出现的为准（与vdbench一致）"""
+        result = {}
+        for item in re.findall(r"(\w+)=(\([^)]*\)|[^,]*)", params):
+            result[item[0].lower()] = item[1].replace(" ", "")
+        return result
+
+    def layout(self, anchor: str) -> Optional[tuple]:
+        """anchor下的目录结构 (depth, width)，参数非数字时返回None"""
+        params = self._normalize(self.fsds[anchor])
+        depth, width = params.get("depth", ""), params.get("width", "")
+        if not depth.isdigit() or not width.isdigit():
+            return None
+        return int(depth), int(width)
+
+    def compare(self, old: Optional["DatasetManifest"]) -> DatasetPlan:
+        """与已有清单比对"""
+        plan = DatasetPlan()
+        old_fps = old.fingerprints if old else {}
+        for anchor, fp in self.fingerprints.items():
+            if old_fps.get(anchor) == fp:
+                plan.matched.append(anchor)
+            else:
+                plan.changed.append(anchor)
+        # 与当前anchor相同或互为上下级目录的旧anchor不能删除
+        plan.stale = [anchor for anchor in old_fps
+                      if not any(self._is_nested(anchor, a) for a in self.fingerprints)]
+        return plan
+
+    @staticmethod
+    def _is_nested(path: str, other: str) -> bool:
+        """两个路径相同或互为上下级目录（按完整路径层级比较，/mnt/dir1与/mnt/dir10不相关）"""
+        path, other = path.rstrip("/\\"), other.rstrip("/\\")
+        if path == other:
+            return True
+        return any(a.startswith(b + sep) for a, b in ((path, other), (other, path)) for sep in ("/", "\\"))
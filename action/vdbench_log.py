@@ -0,0 +1,500 @@
+# -*- coding: UTF-8 -*-
+import csv
+import math
+from dataclasses import dataclass
+import re
+import threading
+from array import array
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from scipy import stats
+
+from storage_evaluation_system_zzj import constants
+from storage_evaluation_system_zzj.logger import logger
+
+# 数据行时间戳（时:分:秒.毫秒）
+TOD_PATTERN = re.compile(r"^(\d{2}):(\d{2}):(\d{2})(?:\.(\d{1,6}))?$")
+# 任意位置的时间戳，用于判断阶段是否已开始输出数据
+TIME_SEARCH_PATTERN = re.compile(r"\d\d:\d\d:\d\d")
+# 阶段关键字，与 ``VdbenchIO.get_stage_keyword`` 一致
+STAGE_KEYWORDS = ("RD=format", "elapsed=")
+
+# 数据行固定列索引（[0]=时间，[1]=序号）
+COL_RATE = 2
+COL_RESP = 3
+COL_MBPS = 13
+MS_PER_DAY = 24 * 60 * 60 * 1000
+
+
+def tod2ms(value: str) -> Optional[int]:
+    """vdbench时间戳转换为当天毫秒数，非时间戳返回None"""
+    match = TOD_PATTERN.match(value)
+    if not match:
+        return None
+    hour, minute, second, fraction = match.groups()
+    ms = int((fraction or "0").ljust(3, "0")[:3])
+    return ((int(hour) * 60 + int(minute)) * 60 + int(second)) * 1000 + ms
+
+
+def ms2tod(value: int) -> str:
+    """当天毫秒数转换为vdbench时间戳。例：60609007 => '16:50:09.007'"""
+    seconds, ms = divmod(int(value), 1000)
+    minutes, second = divmod(seconds, 60)
+    hour, minute = divmod(minutes, 60)
+    return f"{hour:02d}:{minute:02d}:{second:02d}.{ms:03d}"
+
+
+class IntervalStore:
+    """ vdbench区间数据的列式存储
+
+    logfile.html中的每个区间数据行只解析一次，按列保存在紧凑数组中：
+        tod: 时间戳（当天毫秒数）
+        interval: 区间序号
+        rate/resp/mbps: ReqstdOps的rate、resp，以及mb/sec total
+        rate_sum: 所有rate列之和（为0即IO归零）
+        op_rates: 各rate列的值 {列索引: 数组}
+
+    同时记录阶段关键字出现的位置与avg汇总行，阶段、平均值、归零查询均直接由内存数据得出
+    """
+
+    def __init__(self, keywords=STAGE_KEYWORDS):
+        self.tod = array("l")
+        self.interval = array("l")
+        self.rate = array("d")
+        self.resp = array("d")
+        self.mbps = array("d")
+        self.rate_sum = array("d")
+        self.op_rates: Dict[int, array] = {}
+        # 当前表头（"rate resp total sys ..." 行）及其中rate列的数据行索引
+        self.header: List[str] = []
+        self.rate_cols: List[int] = []
+        # avg汇总行：[(时间戳毫秒数, 标签, 数值列表)]
+        self.avg_rows: List[Tuple[int, str, List[float]]] = []
+        self.keywords = keywords
+        # 关键字首次出现时已有的数据行数
+        self.stage_rows: Dict[str, int] = {}
+        # 关键字之后是否已出现带时间戳的行
+        self.stage_started: Dict[str, bool] = {}
+
+    def __len__(self):
+        return len(self.tod)
+
+    @property
+    def last_avg(self) -> Optional[Tuple[int, str, List[float]]]:
+        return self.avg_rows[-1] if self.avg_rows else None
+
+    def feed(self, line: str):
+        """解析一行日志"""
+        for keyword in self.stage_rows:
+            if not self.stage_started[keyword] and TIME_SEARCH_PATTERN.search(line):
+                self.stage_started[keyword] = True
+        for keyword in self.keywords:
+            if keyword not in self.stage_rows and keyword in line:
+                self.stage_rows[keyword] = len(self.tod)
+                self.stage_started[keyword] = False
+
+        tokens = line.split()
+        if len(tokens) < 2:
+            return
+        # 兼容日志行带输出时间前缀的格式
+        if TOD_PATTERN.match(tokens[0]) and (tokens[1] == "rate" or TOD_PATTERN.match(tokens[1])):
+            tokens = tokens[1:]
+
+        if tokens[0] == "rate":
+            if tokens != self.header:
+                self.header = tokens
+                # +2说明：[0]=时间，[1]=序号，[2]=实际数据列开始
+                self.rate_cols = [i + 2 for i, token in enumerate(tokens) if token == "rate"]
+            return
+
+        if not self.header or len(tokens) != len(self.header) + 2:
+            return
+        tod = tod2ms(tokens[0])
+        if tod is None:
+            return
+        try:
+            values = [float(v) for v in tokens[2:]]
+        except ValueError:
+            return
+
+        label = tokens[1]
+        if label.isdigit():
+            self._append(tod, int(label), values)
+        elif label.startswith("avg"):
+            self.avg_rows.append((tod, label, values))
+
+    def _append(self, tod: int, interval: int, values: List[float]):
+        row = len(self.tod)
+        self.tod.append(tod)
+        self.interval.append(interval)
+        self.rate.append(values[COL_RATE - 2])
+        self.resp.append(values[COL_RESP - 2])
+        self.mbps.append(values[COL_MBPS - 2] if len(values) > COL_MBPS - 2 else 0.0)
+        rate_sum = 0.0
+        for col in self.rate_cols:
+            value = values[col - 2]
+            rate_sum += value
+            column = self.op_rates.get(col)
+            if column is None:
+                # 表头变化后新出现的列，之前的行补0
+                column = self.op_rates[col] = array("d", bytes(8 * row))
+            column.append(value)
+        for col, column in self.op_rates.items():
+            if len(column) == row:
+                column.append(0.0)
+        self.rate_sum.append(rate_sum)
+
+    def is_stage_start(self, keyword: str) -> bool:
+        """关键字已出现，且其后已输出带时间戳的数据"""
+        return self.stage_started.get(keyword, False)
+
+    def stage_start_row(self, keyword: str) -> Optional[int]:
+        """关键字之后第一个数据行的行号，关键字未出现时返回None"""
+        return self.stage_rows.get(keyword)
+
+    def find_zero_rows(self, start: int = 0) -> np.ndarray:
+        """第start行之后IO归零（所有rate列之和为0）的行号"""
+        rate_sum = np.asarray(self.rate_sum)[start:]
+        return np.flatnonzero(rate_sum == 0) + start
+
+    def find_zero_runs(self, start: int = 0, continuous: int = 0) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """ 第start行之后连续归零（区间序号连续、至少2个区间）且持续至少continuous秒的数据段
+
+        Returns: (各段开始行号, 各段结束行号, 各段持续时长（秒）)
+        """
+        rows = self.find_zero_rows(start)
+        if len(rows) < 2:
+            empty = np.array([], dtype=np.int64)
+            return empty, empty, empty
+        # 区间序号不连续处即为分段位置
+        breaks = np.flatnonzero(np.diff(np.asarray(self.interval)[rows]) != 1) + 1
+        first = np.concatenate(([0], breaks))
+        last = np.concatenate((breaks, [len(rows)])) - 1
+        grouped = last > first
+        start_rows, end_rows = rows[first[grouped]], rows[last[grouped]]
+        # 跨天时时间戳回绕
+        tod = np.asarray(self.tod, dtype=np.int64)
+        durations = ((tod[end_rows] - tod[start_rows]) % MS_PER_DAY) // 1000
+        matched = durations >= continuous
+        return start_rows[matched], end_rows[matched], durations[matched]
+
+
+@dataclass
+class SteadyState:
+    """ 稳定区间
+
+    start_row/end_row: 区间开始行号（含）、结束行号（不含），与 ``IntervalStore`` 行号一致
+    rate/resp/mbps: 区间内平均OPS、平均时延（按OPS加权，与vdbench一致）、平均带宽
+    rate_cov/resp_cov: 首个稳定窗口的OPS、时延变异系数
+    ci: 平均OPS的95%置信区间半宽与平均值之比，样本不足时为None
+    """
+    start_row: int
+    end_row: int
+    start_tod: int
+    end_tod: int
+    rate: float
+    resp: float
+    mbps: float
+    rate_cov: float
+    resp_cov: float
+    ci: Optional[float]
+
+    @property
+    def duration(self) -> int:
+        """区间时长（秒）"""
+        return ((self.end_tod - self.start_tod) % MS_PER_DAY) // 1000
+
+    def to_records(self) -> List[dict]:
+        return [{
+            "开始时间": ms2tod(self.start_tod),
+            "结束时间": ms2tod(self.end_tod),
+            "持续时长(s)": self.duration,
+            "OPS": round(self.rate, 3),
+            "MB/sec": round(self.mbps, 3),
+            "时延(ms)": round(self.resp, 3),
+            "OPS变异系数": round(self.rate_cov, 4),
+            "时延变异系数": round(self.resp_cov, 4),
+            "OPS置信区间(95%)": "-" if self.ci is None else f"±{self.ci:.2%}",
+        }]
+
+
+class SteadyStateDetector:
+    """ 性能稳态检测
+
+    以滑动窗口计算OPS与时延的变异系数（标准差/平均值），第一个两者均不超过阈值的窗口起点即为预热结束位置，
+    此后至最后一行为稳定区间。稳定区间的平均OPS以批均值法估计置信区间，用于判断是否已可提前结束
+    """
+
+    def __init__(self, window: int = None, max_rate_cov: float = None, max_resp_cov: float = None,
+                 batches: int = None):
+        self.window = window or constants.STEADY_WINDOW
+        self.max_rate_cov = max_rate_cov or constants.STEADY_MAX_RATE_COV
+        self.max_resp_cov = max_resp_cov or constants.STEADY_MAX_RESP_COV
+        self.batches = batches or constants.STEADY_BATCHES
+
+    def detect(self, store: IntervalStore, start: int = 0) -> Optional[SteadyState]:
+        """ 检测第start行之后的稳定区间
+
+        Returns: 稳定区间，未达到稳态时返回None
+        """
+        rate = np.asarray(store.rate)[start:]
+        resp = np.asarray(store.resp)[start:]
+        if len(rate) < self.window:
+            return None
+        rate_cov = self.rolling_cov(rate, self.window)
+        resp_cov = self.rolling_cov(resp, self.window)
+        steady = np.flatnonzero((rate_cov <= self.max_rate_cov) & (resp_cov <= self.max_resp_cov))
+        if not len(steady):
+            return None
+
+        first = int(steady[0])
+        rate, resp = rate[first:], resp[first:]
+        mbps = np.asarray(store.mbps)[start + first:]
+        tod = store.tod
+        total = rate.sum()
+        return SteadyState(start_row=start + first,
+                           end_row=len(store),
+                           start_tod=tod[start + first],
+                           end_tod=tod[-1],
+                           rate=float(rate.mean()),
+                           resp=float((rate * resp).sum() / total) if total else float(resp.mean()),
+                           mbps=float(mbps.mean()),
+                           rate_cov=float(rate_cov[first]),
+                           resp_cov=float(resp_cov[first]),
+                           ci=self.relative_ci(rate))
+
+    @staticmethod
+    def rolling_cov(values: np.ndarray, window: int) -> np.ndarray:
+        """各窗口（以起点为索引）的变异系数，平均值为0的窗口为inf"""
+        cumsum = np.concatenate(([0.0], np.cumsum(values)))
+        cumsum_sq = np.concatenate(([0.0], np.cumsum(values * values)))
+        mean = (cumsum[window:] - cumsum[:-window]) / window
+        var = np.maximum((cumsum_sq[window:] - cumsum_sq[:-window]) / window - mean * mean, 0)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            cov = np.sqrt(var) / mean
+        return np.where(mean > 0, cov, np.inf)
+
+    def relative_ci(self, values: np.ndarray, confidence=0.95) -> Optional[float]:
+        """批均值法估计平均值的置信区间半宽（相对平均值），可消除区间数据自相关的影响"""
+        if len(values) < self.batches * 2 or not values.mean():
+            return None
+        means = np.array([batch.mean() for batch in np.array_split(values, self.batches)])
+        t = stats.t.ppf((1 + confidence) / 2, self.batches - 1)
+        return float(t * means.std(ddof=1) / np.sqrt(self.batches) / values.mean())
+
+
+class VdbenchLogFollower:
+    """ 按字节偏移量跟踪vdbench日志文件
+
+    每次更新只读取上次位置之后新增的内容，完整的行交由 ``IntervalStore`` 解析，不完整的末行保留到下次更新。
+    文件被截断或重新创建（开头内容变化）时，丢弃已有数据并从头解析
+    """
+    HEAD_SIZE = 256
+    # 单次最多读取的字节数，避免首次读取大文件时占用过多内存
+    READ_SIZE = 16 * 1024 * 1024
+
+    def __init__(self, client, path: str, keywords=STAGE_KEYWORDS):
+        self.client = client
+        self.path = path
+        self.keywords = keywords
+        self.store = IntervalStore(keywords)
+        self.offset = 0
+        self._head = b""
+        self._pending = b""
+        self._lock = threading.Lock()
+
+    def reset(self):
+        self.store = IntervalStore(self.keywords)
+        self.offset = 0
+        self._head = b""
+        self._pending = b""
+
+    def update(self) -> IntervalStore:
+        """读取并解析新增内容，返回最新的数据存储。文件不存在时返回空存储"""
+        with self._lock:
+            while True:
+                try:
+                    size, head, data = self.client.read_from(self.path, self.offset, max_bytes=self.READ_SIZE,
+                                                             head_size=self.HEAD_SIZE)
+                except FileNotFoundError:
+                    return self.store
+                if size < self.offset or head[:len(self._head)] != self._head:
+                    logger.debug(f"Vdbench log {self.path} has been recreated, parsing from the beginning")
+                    self.reset()
+                    continue
+                if len(head) > len(self._head):
+                    self._head = head
+                if data:
+                    self.offset += len(data)
+                    self._feed(data)
+                if len(data) < self.READ_SIZE:
+                    return self.store
+
+    def _feed(self, data: bytes):
+        lines = (self._pending + data).split(b"\n")
+        self._pending = lines.pop()
+        for line in lines:
+            self.store.feed(line.decode("utf-8", errors="replace"))
+
+
+class FlatfileParser:
+    """ vdbench flatfile.html解析（替代 ``vdbench parseflat``，无需启动JVM）
+
+    flatfile.html以列名行（首列为tod）开头，之后每行为一个区间的数据，Interval列以avg开头的为平均值行。
+    一次读取同时得到区间数据与平均值数据，列名不区分大小写，输出列名与请求的列名一致
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def parse(self, cols: List[str], avg_cols: List[str], skip: int = 0) -> Tuple[List[list], List[list]]:
+        """ 解析flatfile.html
+
+        Args:
+            cols: 区间数据的输出列
+            avg_cols: 平均值数据的输出列
+            skip: 区间数据需去除的开头行数（warmup）
+
+        Raises:
+            ValueError: 文件中没有列名行，或缺少请求的列
+
+        Returns: (区间数据行, 平均值数据行)，均不含列名行
+        """
+        rows, avg_rows = [], []
+        header = None
+        col_index = avg_index = None
+        interval_pos = None
+        with open(self.path, mode="r", errors="replace") as file:
+            for line in file:
+                tokens = line.split()
+                if not tokens or tokens[0].startswith(("*", "<")):
+                    continue
+                if tokens[0].lower() == "tod":
+                    header = [t.lower() for t in tokens]
+                    col_index = self._index(header, cols)
+                    avg_index = self._index(header, avg_cols)
+                    interval_pos = header.index("interval") if "interval" in header else None
+                    continue
+                if header is None or len(tokens) != len(header):
+                    continue
+                if interval_pos is not None and tokens[interval_pos].lower().startswith("avg"):
+                    avg_rows.append([tokens[i] for i in avg_index])
+                elif skip > 0:
+                    skip -= 1
+                else:
+                    rows.append([tokens[i] for i in col_index])
+        if header is None:
+            raise ValueError(f"No column header found in {self.path}")
+        return rows, avg_rows
+
+    def to_csv(self, cols: List[str], csv_file: str, avg_cols: List[str], avg_csv_file: str, skip: int = 0):
+        """解析并写入区间数据、平均值数据csv文件"""
+        rows, avg_rows = self.parse(cols, avg_cols, skip)
+        for path, header, data in ((csv_file, cols, rows), (avg_csv_file, avg_cols, avg_rows)):
+            with open(path, mode="w", newline="") as file:
+                writer = csv.writer(file)
+                writer.writerow(header)
+                writer.writerows(data)
+
+    def _index(self, header: List[str], cols: List[str]) -> List[int]:
+        missing = [c for c in cols if c.lower() not in header]
+        if missing:
+            raise ValueError(f"Columns {missing} not found in {self.path}")
+        return [header.index(c.lower()) for c in cols]
+
+
+# 时延分布桶行：桶下限、上限（最后一个桶为max）、次数，之后的列（百分比等）忽略。例：
+#     0.020 <    0.040          12    0.0001    0.0001
+HISTOGRAM_BUCKET_PATTERN = re.compile(r"^\s*(\d+(?:\.\d+)?)\s*(?:<=?|-|to)?\s*(\d+(?:\.\d+)?|max)\s*:?\s+(\d+)(?:\s|$)",
+                                      re.IGNORECASE)
+HISTOGRAM_OPERATIONS = ("read", "write", "create", "open", "close", "delete", "mkdir", "rmdir", "getattr",
+                        "setattr", "access", "copy", "move")
+
+
+class Histogram:
+    """ 时延分布
+
+    lows/highs: 各桶下限、上限（毫秒），最后一个桶上限为inf
+    counts: 各桶次数
+    """
+
+    def __init__(self):
+        self.lows = array("d")
+        self.highs = array("d")
+        self.counts = array("q")
+
+    def __len__(self):
+        return len(self.counts)
+
+    @property
+    def total(self) -> int:
+        return sum(self.counts)
+
+    def add(self, low: float, high: float, count: int):
+        self.lows.append(low)
+        self.highs.append(high)
+        self.counts.append(count)
+
+    def merge(self, other: "Histogram") -> "Histogram":
+        """合并另一个分布（桶边界不同时按下限对齐），返回新的分布"""
+        result = Histogram()
+        buckets = {}
+        for hist in (self, other):
+            for low, high, count in zip(hist.lows, hist.highs, hist.counts):
+                old = buckets.get(low)
+                buckets[low] = (max(high, old[0]), old[1] + count) if old else (high, count)
+        for low in sorted(buckets):
+            result.add(low, *buckets[low])
+        return result
+
+    def percentile(self, p: float) -> Optional[float]:
+        """ 分位数（毫秒），在所在桶内线性插值；最后一个桶无上限，取其下限。无数据时返回None"""
+        counts = np.asarray(self.counts, dtype=float)
+        total = counts.sum()
+        if not total:
+            return None
+        cum = np.cumsum(counts)
+        target = total * p / 100
+        i = min(int(np.searchsorted(cum, target)), len(counts) - 1)
+        low, high = self.lows[i], self.highs[i]
+        if not counts[i] or math.isinf(high):
+            return low
+        return low + (target - (cum[i] - counts[i])) / counts[i] * (high - low)
+
+
+class HistogramParser:
+    """ vdbench histogram.html解析
+
+    逐行读取，不一次载入整个文件。每个分布以标题行开始（标题中含operation名称时按operation区分），
+    之后为桶行；桶下限不递增时视为新的分布。格式不符的行忽略
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def parse(self) -> List[Tuple[str, Histogram]]:
+        """Returns: [(标题, 时延分布)]"""
+        blocks = []
+        title, hist = "", None
+        with open(self.path, mode="r", errors="replace") as file:
+            for line in file:
+                match = HISTOGRAM_BUCKET_PATTERN.match(line)
+                if not match:
+                    text = re.sub(r"<[^>]+>", "", line).strip()
+                    if re.search(r"[A-Za-z]{3,}", text) and not re.search(r"\b(min|max|count)\b", text, re.I):
+                        title, hist = text, None
+                    continue
+                low, high, count = match.groups()
+                high = math.inf if high.lower() == "max" else float(high)
+                if hist is None or float(low) <= hist.lows[-1]:
+                    hist = Histogram()
+                    blocks.append((title, hist))
+                hist.add(float(low), high, int(count))
+        return blocks
+
+    @staticmethod
+    def operation(title: str) -> Optional[str]:
+        """标题中的operation名称"""
+        words = re.findall(r"[a-z]+", title.lower())
+        return next((op for op in HISTOGRAM_OPERATIONS if op in words), None)
@@ -49,6 +49,11 @@ class BaseCase:
         self.element = config_element
         self.parameters = CaseParameter(static_parameters, custom_case_parameters)
         self._status = CaseStatus.WAITING
+        # 所属并行用例组（scenes.xml中的<p>）编号及组内lane编号，顺序执行的用例为None
+        self.parallel_group = None
+        self.parallel_lane = None
+        # 各主机的vdbench hd数量，由 `update_hd_number` 按用例计算，不保存在共享的客户端对象上
+        self.hd_numbers = {}
 
         self.logger = logger
         self.result = CaseResult.UNKNOWN
@@ -89,6 +94,14 @@ class BaseCase:
     def register_indicator(self):
         return None
 
+    def stage_dataset(self) -> bool:
+        """ 预先准备本用例的数据集
+
+        在上一个用例读写结束后、用例间休眠前执行，不得依赖 `pre_condition` 的执行结果。
+        用例不支持时返回False，数据在用例执行时准备
+        """
+        return False
+
     def update_hd_number(self):
         """更新当前用例使用hd-number
         hd 是 host daemon 的缩写，也就是用例配置的用于测试的主机守护进程。
@@ -102,12 +115,14 @@ class BaseCase:
         hd_param_name = hd_param_name.lower()
         self.logger.debug(f"Updating hd-number by '{hd_param_name}'")
 
+        hd_numbers = {}
         for client in self.anchor_paths.keys():
             try:
                 hd_number = client.get_parameter(hd_param_name)
             except KeyError:
                 hd_number = 1
-            client.hd_number = int(hd_number)
+            hd_numbers[client] = int(hd_number)
+        self.hd_numbers = hd_numbers
 
     def cache_runtime_data(self, key, value):
         """保存执行数据"""
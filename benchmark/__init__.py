@@ -0,0 +1,8 @@
+# -*- coding: UTF-8 -*-
+"""SES自身耗时基准测试
+
+使用合成的vdbench日志、iostat日志与报告文件，离线测量测评过程中的关键处理函数耗时，结果保存为JSON，
+可与历史结果对比以发现性能退化。执行方式：
+
+    python -m storage_evaluation_system_zzj.benchmark -o benchmark.json [--compare baseline.json]
+"""
@@ -0,0 +1,246 @@
+# -*- coding: UTF-8 -*-
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Callable, Dict, List
+
+from storage_evaluation_system_zzj import __version__, suite
+from storage_evaluation_system_zzj.action.host import HostAction
+from storage_evaluation_system_zzj.action.vdbench import LinuxVdbenchIO, VdbenchIO, VdbenchReporter, VdbenchState
+from storage_evaluation_system_zzj.action.vdbench_log import IntervalStore
+from storage_evaluation_system_zzj.benchmark import fixtures
+from storage_evaluation_system_zzj.constants import CaseResult
+from storage_evaluation_system_zzj.report import Report, ReportUtil
+from storage_evaluation_system_zzj.util import find_op_time_index, get_resource_path
+
+
+@dataclass
+class Benchmark:
+    """ 基准测试项
+
+    fixture(work_dir, **params)在每组参数下执行一次，生成合成数据；
+    target(fixture_data, work_dir)返回每轮计时执行的函数（每轮重新准备会被修改的输入）
+    """
+    name: str
+    target: Callable
+    params: List[dict]
+    fixture: Callable = None
+    rounds: int = 5
+
+
+BENCHMARKS: List[Benchmark] = []
+
+
+def benchmark(name: str, params: List[dict], fixture: Callable = None, rounds: int = 5):
+    def decorator(func):
+        BENCHMARKS.append(Benchmark(name, func, params, fixture, rounds))
+        return func
+
+    return decorator
+
+
+DURATION_PARAMS = [dict(duration=d) for d in fixtures.DURATIONS]
+HOST_PARAMS = [dict(hosts=h) for h in fixtures.HOSTS]
+MATRIX_PARAMS = [dict(duration=d, hosts=h) for d in fixtures.DURATIONS for h in fixtures.HOSTS]
+
+
+def _vdbench(output_dir: str, hosts: int = 1) -> VdbenchIO:
+    """通过构造函数创建VdbenchIO（合成测试套的用例），状态为已完成执行，输出目录为output_dir"""
+    case = fixtures.SyntheticSuite(output_dir, hosts=hosts).cases[0]
+    # 与VdbenchIO(case).action_impl一致，由执行环境（合成主机）创建Linux实现
+    vdbench = LinuxVdbenchIO(case, client=case.client_group[0])
+    vdbench.output_dir = output_dir
+    vdbench.executable_path = "vdbench"
+    vdbench.status = VdbenchState.COMPLETE
+    return vdbench
+
+
+def _logfile_fixture(work_dir, duration, **kwargs):
+    path = os.path.join(work_dir, "logfile.html")
+    fixtures.make_logfile(path, fixtures.DURATIONS[duration])
+    return path
+
+
+def _flatfile_fixture(work_dir, duration, **kwargs):
+    fixtures.make_flatfile(os.path.join(work_dir, "flatfile.html"), fixtures.DURATIONS[duration])
+    fixtures.make_parmscan(work_dir)
+    return work_dir
+
+
+def _store_fixture(work_dir, duration, **kwargs):
+    store = IntervalStore()
+    with open(_logfile_fixture(work_dir, duration)) as file:
+        for line in file:
+            store.feed(line)
+    return store
+
+
+@benchmark("create_vdbench_config", HOST_PARAMS)
+def bench_create_vdbench_config(data, work_dir, hosts):
+    template = get_resource_path("io_model_param_file/vdbench/multi_thread_large_io_rw_as_mix.txt")
+    config_file = os.path.join(work_dir, "config.txt")
+    shutil.copyfile(template, config_file)
+    vdbench = _vdbench(work_dir, hosts)
+    mount_paths = {client: ["/mnt/ses"] for client in vdbench.case.client_group}
+    return lambda: vdbench.create_vdbench_config(mount_paths, config_file, 32, 10, 8, 1)
+
+
+def _iostat_fixture(work_dir, duration, hosts):
+    paths = []
+    for i in range(hosts):
+        path = os.path.join(work_dir, f"iostat_{i}.log")
+        fixtures.make_iostat(path, fixtures.DURATIONS[duration])
+        paths.append(path)
+    return paths
+
+
+@benchmark("parse_iostat_file", MATRIX_PARAMS, fixture=_iostat_fixture, rounds=3)
+def bench_parse_iostat_file(paths, work_dir, **kwargs):
+    return lambda: [HostAction.parse_iostat_file(path) for path in paths]
+
+
+@benchmark("IntervalStore.feed", DURATION_PARAMS, fixture=_logfile_fixture)
+def bench_interval_store(path, work_dir, **kwargs):
+    def run():
+        store = IntervalStore()
+        with open(path) as file:
+            for line in file:
+                store.feed(line)
+        return store
+
+    return run
+
+
+@benchmark("parse_zero", [dict(duration=d, continuous=c) for d in fixtures.DURATIONS for c in (None, 3)],
+           fixture=_store_fixture)
+def bench_parse_zero(store, work_dir, continuous, **kwargs):
+    vdbench = _vdbench(work_dir)
+    start = store.stage_start_row("elapsed=")
+    return lambda: vdbench.parse_zero(store, start, continuous=continuous)
+
+
+@benchmark("VdbenchReporter.create_csv_file", DURATION_PARAMS, fixture=_flatfile_fixture)
+def bench_create_csv_file(output_dir, work_dir, **kwargs):
+    reporter = VdbenchReporter(_vdbench(output_dir))
+    return reporter.create_csv_file
+
+
+@benchmark("VdbenchReporter.create_common_chart", DURATION_PARAMS, fixture=_flatfile_fixture, rounds=3)
+def bench_create_common_chart(output_dir, work_dir, **kwargs):
+    reporter = VdbenchReporter(_vdbench(output_dir))
+    csv_file, _ = reporter.create_csv_file()
+    return lambda: reporter.create_common_chart(csv_file)
+
+
+@benchmark("find_op_time_index", DURATION_PARAMS)
+def bench_find_op_time_index(data, work_dir, duration):
+    seconds = fixtures.DURATIONS[duration]
+    timeline = fixtures.make_timeline(seconds)
+    start = fixtures.START_TIME.timestamp()
+    op_timeline = [start + seconds * i / 5 for i in range(5)]
+    return lambda: find_op_time_index(timeline, op_timeline)
+
+
+@benchmark("Report.handle_case_report", HOST_PARAMS)
+def bench_handle_case_report(data, work_dir, hosts):
+    case_ids = [f"CASE_{i:03d}" for i in range(50)]
+    report = Report(fixtures.SyntheticSuite(work_dir, case_ids))
+    records = [dict(步骤=f"step {i}", 结果="Pass") for i in range(10)]
+    content = ReportUtil.create_table([dict(主机=f"192.168.0.{i}", 带宽=i * 100.0) for i in range(hosts)])
+    return lambda: report.handle_case_report(case_ids[-1], CaseResult.PASS, time.time(), messages=["ok"],
+                                             records=records, content=content)
+
+
+def measure(prepare: Callable[[], Callable], rounds: int) -> Dict[str, float]:
+    """多轮计时，每轮先调用prepare准备输入（不计时），再计时执行其返回的函数"""
+    prepare()()  # 预热
+    timings = []
+    for _ in range(rounds):
+        func = prepare()
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return dict(min=min(timings),
+                max=max(timings),
+                mean=statistics.mean(timings),
+                median=statistics.median(timings),
+                stddev=statistics.stdev(timings) if len(timings) > 1 else 0.0,
+                rounds=rounds)
+
+
+def run(names: List[str] = None, quick=False, rounds: int = None) -> List[dict]:
+    results = []
+    for bench in BENCHMARKS:
+        if names and bench.name not in names:
+            continue
+        for params in bench.params:
+            if quick and (params.get("duration", "10m") != "10m" or params.get("hosts", 1) != 1):
+                continue
+            work_dir = tempfile.mkdtemp(prefix="ses_bench_")
+            suite.global_output_dir = work_dir
+            os.makedirs(ReportUtil.get_image_dir(), exist_ok=True)
+            try:
+                data = bench.fixture(work_dir, **params) if bench.fixture else None
+                stats = measure(lambda: bench.target(data, work_dir, **params), rounds or bench.rounds)
+            finally:
+                shutil.rmtree(work_dir, ignore_errors=True)
+            param_str = ",".join(f"{k}={v}" for k, v in params.items())
+            print(f"{bench.name}[{param_str}]: mean={stats['mean'] * 1000:.2f}ms min={stats['min'] * 1000:.2f}ms")
+            results.append(dict(name=f"{bench.name}[{param_str}]", group=bench.name, params=params, stats=stats))
+    return results
+
+
+def compare(results: List[dict], baseline_file: str, max_regression: float) -> List[str]:
+    """与基线结果对比，返回平均耗时增长超过max_regression（比例）的测试项"""
+    with open(baseline_file, encoding="utf-8") as file:
+        baseline = {b["name"]: b["stats"] for b in json.load(file)["benchmarks"]}
+    regressions = []
+    for result in results:
+        old = baseline.get(result["name"])
+        if not old or not old["mean"]:
+            continue
+        change = result["stats"]["mean"] / old["mean"] - 1
+        if change > max_regression:
+            regressions.append(f"{result['name']}: {old['mean'] * 1000:.2f}ms -> "
+                               f"{result['stats']['mean'] * 1000:.2f}ms (+{change:.0%})")
+    return regressions
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(description="Benchmark storage-evaluation-system hot paths")
+    parser.add_argument("-o", "--output", default="benchmark.json", help="Output json file")
+    parser.add_argument("-k", "--name", action="append", help="Only run benchmarks with this name")
+    parser.add_argument("--quick", action="store_true", help="Only run the smallest size (10m, 1 host)")
+    parser.add_argument("--rounds", type=int, help="Override rounds of every benchmark")
+    parser.add_argument("--compare", help="Baseline json file to compare with")
+    parser.add_argument("--max-regression", type=float, default=0.2,
+                        help="Fail if mean time grows more than this ratio compared with the baseline")
+    options = parser.parse_args(args)
+
+    results = run(options.name, options.quick, options.rounds)
+    output = dict(version=__version__,
+                  datetime=datetime.now().isoformat(),
+                  machine_info=dict(python=platform.python_version(), platform=platform.platform(),
+                                    processor=platform.processor(), cpu_count=os.cpu_count()),
+                  benchmarks=results)
+    with open(options.output, "w", encoding="utf-8") as file:
+        json.dump(output, file, indent=2, ensure_ascii=False)
+    print(f"Results saved: {options.output}")
+
+    if options.compare:
+        regressions = compare(results, options.compare, options.max_regression)
+        if regressions:
+            print("Regressions detected:\n  " + "\n  ".join(regressions))
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
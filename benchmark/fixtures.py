@@ -0,0 +1,159 @@
+# -*- coding: UTF-8 -*-
+"""基准测试用合成数据"""
+import os
+import posixpath
+import random
+import subprocess
+import xml.etree.ElementTree as ET
+from datetime import datetime, timedelta
+from typing import List
+
+from storage_evaluation_system_zzj.basecase import BaseCase
+from storage_evaluation_system_zzj.client.client import ClientGroup, Response
+from storage_evaluation_system_zzj.constants import CacheDataKey
+
+# 运行时长（秒）
+DURATIONS = {"10m": 10 * 60, "1h": 60 * 60, "6h": 6 * 60 * 60}
+# 主机数
+HOSTS = (1, 8, 64)
+# 合成日志开始时间，6小时数据会跨天
+START_TIME = datetime(2024, 1, 1, 20, 0, 0)
+
+_LOG_HEADER = (
+    "Jan 01, 2024 ..Interval.. .ReqstdOps... ...cpu%...  read ....read..... ....write.... ..mb/sec... mb/sec "
+    ".xfer.. ...mkdir.... ...rmdir.... ...create... ....open.... ...close.... ...delete...\n"
+    "                            rate   resp total  sys   pct   rate   resp   rate   resp  read write  total    size "
+    " rate   resp  rate   resp  rate   resp  rate   resp  rate   resp  rate   resp\n"
+)
+_FLAT_HEADER = "tod Run Interval reqrate Rate Resp MB/sec Read_rate Read_resp MB_read Write_rate Write_resp MB_write\n"
+
+
+class SyntheticClient:
+    """合成主机客户端：命令在本地执行，作为VdbenchIO、HostAction等对象的执行环境"""
+
+    def __init__(self, ip: str):
+        self.ip = ip
+        self.role = f"host_{ip}"
+        self.tag = "host"
+        self.parameters = {"anchor_path": "/mnt/ses/anchor"}
+
+    def __str__(self):
+        return self.ip
+
+    def get_parameter(self, name):
+        return self.parameters[name]
+
+    @staticmethod
+    def join_path(*args):
+        return posixpath.join(*args)
+
+    @staticmethod
+    def exec_command(command, timeout: int = None, **kwargs) -> Response:
+        proc = subprocess.run(command, shell=True, capture_output=True, text=True, timeout=timeout)
+        return Response(proc.returncode, proc.stdout.strip(), stderr=proc.stderr.strip())
+
+
+class SyntheticSuite:
+    """合成测试套：提供用例、报告构造所需的测试套属性，用例与报告均通过真实构造函数创建"""
+
+    def __init__(self, output_dir: str, case_ids: List[str] = ("BENCH_001",), hosts: int = 1):
+        self.name = "BENCHMARK"
+        self.output_dir = output_dir
+        self.custom_actions_path = None
+        self.custom_config = ET.fromstring("<config><environment/></config>")
+        self.client_group = ClientGroup(SyntheticClient(f"192.168.0.{i}") for i in range(hosts))
+        self.valid_skips = []
+        self.cache = {CacheDataKey.STORAGE_CAPACITY.value: 100 * 1024 ** 3}
+        self.cases = [BaseCase(self, ET.Element("case", id=cid, name=cid, category="reliability"), {}, {}, True)
+                      for cid in case_ids]
+
+    def get_executor_clients(self, target) -> list:
+        return list(self.client_group)
+
+    def get_cache_data(self, key, case_id=None):
+        return self.cache[key.value]
+
+    @staticmethod
+    def get_default_parameter(name):
+        return None
+
+    @staticmethod
+    def get_required_parameter(name):
+        return "-"
+
+
+def _tod(seconds: int) -> str:
+    return (START_TIME + timedelta(seconds=seconds)).strftime("%H:%M:%S.%f")[:-3]
+
+
+def _zero(seconds: int) -> bool:
+    """每30分钟跌零一次，持续5秒"""
+    return seconds % 1800 in range(900, 905)
+
+
+def make_logfile(path: str, seconds: int):
+    """vdbench logfile.html：数据预制阶段30秒，之后正式读写seconds秒，末尾为avg行"""
+    rnd = random.Random(seconds)
+    with open(path, "w") as file:
+        file.write("<title>Vdbench logfile.html</title><pre>\n")
+        file.write(f"{_tod(0)} Starting RD=format; I/O rate: Uncontrolled MAX; For loops: None\n")
+        file.write(_LOG_HEADER)
+        for i in range(1, 31):
+            file.write(_log_line(_tod(i), str(i), rnd, write_only=True))
+        file.write(f"{_tod(31)} Starting RD=rd1; I/O rate: Uncontrolled MAX; elapsed={seconds}; For loops: None\n")
+        file.write(_LOG_HEADER)
+        for i in range(1, seconds + 1):
+            file.write(_log_line(_tod(31 + i), str(i), rnd, zero=_zero(i)))
+        file.write(_log_line(_tod(32 + seconds), f"avg_61-{seconds}", rnd))
+        file.write(f"{_tod(33 + seconds)} Vdbench execution completed successfully\n")
+
+
+def _log_line(tod: str, label: str, rnd: random.Random, zero=False, write_only=False) -> str:
+    read = 0.0 if zero or write_only else rnd.uniform(4000, 6000)
+    write = 0.0 if zero else rnd.uniform(4000, 6000)
+    values = [read + write, rnd.uniform(0.1, 2), 50.0, 10.0, 50.0, read, rnd.uniform(0.1, 2), write,
+              rnd.uniform(0.1, 2), read / 16, write / 16, (read + write) / 16, 65536.0] + [0.0] * 12
+    return f"{tod} {label:>11} " + " ".join(f"{v:8.3f}" for v in values) + "\n"
+
+
+def make_flatfile(path: str, seconds: int):
+    """vdbench flatfile.html：数据预制30行 + 正式读写seconds行 + avg行"""
+    rnd = random.Random(seconds)
+    with open(path, "w") as file:
+        file.write("* vdbench flatfile\n*\n")
+        file.write(_FLAT_HEADER)
+        for i in range(1, 31):
+            file.write(_flat_line(_tod(i), "format_for_rd1", str(i), rnd))
+        for i in range(1, seconds + 1):
+            file.write(_flat_line(_tod(31 + i), "rd1", str(i), rnd, zero=_zero(i)))
+        file.write(_flat_line(_tod(32 + seconds), "rd1", f"avg_61-{seconds}", rnd))
+
+
+def _flat_line(tod: str, run: str, interval: str, rnd: random.Random, zero=False) -> str:
+    read = 0.0 if zero else rnd.uniform(4000, 6000)
+    write = 0.0 if zero else rnd.uniform(4000, 6000)
+    values = [0.0, read + write, rnd.uniform(0.1, 2), (read + write) / 16, read, rnd.uniform(0.1, 2), read / 16,
+              write, rnd.uniform(0.1, 2), write / 16]
+    return f"{tod} {run} {interval} " + " ".join(f"{v:.3f}" for v in values) + "\n"
+
+
+def make_parmscan(output_dir: str):
+    with open(os.path.join(output_dir, "parmscan.html"), "w") as file:
+        file.write("keyw: fwd=fwd0,operations=(read,write)\n")
+
+
+def make_iostat(path: str, seconds: int, interval: int = 5, devices: int = 4):
+    """``iostat -d -m <interval>`` 日志"""
+    rnd = random.Random(seconds)
+    with open(path, "w", encoding="utf-8") as file:
+        file.write("Linux 5.10.0 (host) \t01/01/2024 \t_x86_64_\t(64 CPU)\n\n")
+        for _ in range(seconds // interval):
+            file.write("Device             tps    MB_read/s    MB_wrtn/s    MB_read    MB_wrtn\n")
+            for d in range(devices):
+                file.write(f"sd{chr(97 + d)} {rnd.uniform(100, 900):12.2f} {rnd.uniform(0, 500):12.2f} "
+                           f"{rnd.uniform(0, 500):12.2f} {rnd.randint(0, 2500):10d} {rnd.randint(0, 2500):10d}\n")
+            file.write("\n")
+
+
+def make_timeline(seconds: int) -> List[datetime]:
+    return [START_TIME + timedelta(seconds=i) for i in range(seconds)]
@@ -0,0 +1,148 @@
+# -*- coding: UTF-8 -*-
+import json
+import os
+import socket
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from storage_evaluation_system_zzj import constants
+from storage_evaluation_system_zzj.exception import AgentUnavailable
+from storage_evaluation_system_zzj.logger import logger
+
+AGENT_SCRIPT = os.path.join(os.path.dirname(os.path.dirname(__file__)), "resource", "agent", "ses_agent.py")
+
+
+class RemoteAgent:
+    """主机代理客户端
+
+    每次执行仅上传一次代理脚本，通过一个长期占用的SSH会话通道启动，以JSON行协议（请求/响应）调用，
+    文件、进程类操作在主机上的代理进程内完成，无需每次调用都创建shell管道。
+
+    代理不可用（主机无python3、启动失败、通道断开、响应超时）时抛出 ``AgentUnavailable``，调用方应回退到shell命令。
+    单次调用在代理内出错时同样抛出 ``AgentUnavailable``，但不影响后续调用
+    """
+
+    def __init__(self, client):
+        self.client = client
+        self.logger = logger
+        self._channel = None
+        self._pool = None
+        self._buffer = b""
+        self._request_id = 0
+        self._lock = threading.Lock()
+        self._broken = False
+
+    @property
+    def available(self) -> bool:
+        return not self._broken
+
+    def start(self):
+        """上传并启动代理进程"""
+        python = None
+        for candidate in ("python3", "python"):
+            resp = self.client.exec_command(f"{candidate} -c 'import sys; assert sys.version_info >= (3, 5)'",
+                                            verbose=False)
+            if resp.status_code == 0:
+                python = candidate
+                break
+        if not python:
+            raise AgentUnavailable(f"{self.client}: python3 not found")
+
+        # 上传到仅当前用户可访问的临时目录（mktemp -d 权限为700），不执行公共目录下他人可预先创建的文件
+        # 代理启动前不可调用依赖代理的方法（如client.exists）
+        resp = self.client.exec_command("mktemp -d /tmp/ses_agent.XXXXXXXX", verbose=False)
+        remote_dir = resp.stdout.strip() if resp.status_code == 0 else ""
+        if not remote_dir.startswith("/tmp/ses_agent."):
+            raise AgentUnavailable(f"{self.client}: creating agent directory failed")
+        remote_script = f"{remote_dir}/ses_agent.py"
+        try:
+            self.client.put(AGENT_SCRIPT, remote_script)
+            self._pool = self.client.channel_pool
+            self._channel = self._pool.acquire(timeout=self.client.banner_timeout)
+            self._channel.exec_command(f"{python} -u {remote_script}")
+            if self.call("ping") != "pong":
+                raise AgentUnavailable(f"{self.client}: unexpected agent response")
+        finally:
+            # 代理进程启动时已读取脚本，无需保留
+            self.client.exec_command(f"rm -rf {remote_dir}", verbose=False)
+        self.logger.debug(f"{self.client} agent started")
+
+    def call(self, method: str, **params) -> Any:
+        """调用代理方法"""
+        response = self._request(dict(method=method, params=params))
+        if "error" in response:
+            raise AgentUnavailable(f"Agent call {method} failed: {response['error']}")
+        return response.get("result")
+
+    def batch(self, calls: List[Tuple[str, Dict[str, Any]]]) -> List[Any]:
+        """批量调用代理方法，一次往返完成
+
+        Args:
+            calls: [(方法名, 参数字典), ...]
+
+        Returns: 与calls顺序一致的结果列表，单个调用出错时对应位置为 ``AgentUnavailable`` 异常对象
+        """
+        responses = self._request([dict(method=method, params=params) for method, params in calls])
+        results = []
+        for (method, _), response in zip(calls, responses):
+            if "error" in response:
+                results.append(AgentUnavailable(f"Agent call {method} failed: {response['error']}"))
+            else:
+                results.append(response.get("result"))
+        return results
+
+    def close(self):
+        with self._lock:
+            self._broken = True
+            if self._channel:
+                self._pool.release(self._channel)
+                self._channel = None
+
+    def _request(self, payload):
+        with self._lock:
+            if self._broken or not self._channel:
+                raise AgentUnavailable(f"{self.client}: agent is not running")
+            if isinstance(payload, list):
+                for request in payload:
+                    request["id"] = self._next_id()
+            else:
+                payload["id"] = self._next_id()
+            try:
+                self._channel.sendall((json.dumps(payload) + "\n").encode())
+                return json.loads(self._readline(constants.REMOTE_AGENT_TIMEOUT))
+            except (socket.error, OSError, ValueError) as e:
+                self._broken = True
+                self._pool.release(self._channel)
+                self._channel = None
+                raise AgentUnavailable(f"{self.client}: agent connection lost: {e!r}")
+
+    def _next_id(self) -> int:
+        self._request_id += 1
+        return self._request_id
+
+    def _readline(self, timeout: float) -> str:
+        deadline = time.time() + timeout
+        while b"\n" not in self._buffer:
+            remaining = deadline - time.time()
+            if remaining <= 0:
+                raise socket.timeout("Waiting for agent response timeout")
+            self._channel.settimeout(remaining)
+            data = self._channel.recv(32768)
+            if not data:
+                raise socket.error("Agent channel closed")
+            self._buffer += data
+        line, self._buffer = self._buffer.split(b"\n", 1)
+        return line.decode()
+
+
+def start_agent(client) -> Optional[RemoteAgent]:
+    """启动主机代理，失败时返回None"""
+    agent = RemoteAgent(client)
+    try:
+        agent.start()
+    except Exception as e:
+        logger.debug(f"{client} agent unavailable, falling back to shell commands: {e!r}")
+        agent.close()
+        return None
+    return agent
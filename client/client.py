@@ -1,8 +1,11 @@
 import random
 import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
 import xml.etree.ElementTree as ET
-from typing import Dict, Any
+from typing import Dict, Any, Callable, List, Union
 
+from storage_evaluation_system_zzj import constants
 from storage_evaluation_system_zzj.exception import ConfigError
 from storage_evaluation_system_zzj.logger import logger
 
@@ -118,6 +121,73 @@ class Client:
         return self.parameters[name]
 
 
+class FanoutResult:
+    """单个客户端上的并发执行结果"""
+
+    def __init__(self, client: Client, value: Any = None, error: BaseException = None):
+        self.client = client
+        self.value = value
+        self.error = error
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+    def __repr__(self):
+        if self.ok:
+            return f"<FanoutResult {self.client} value={self.value}>"
+        return f"<FanoutResult {self.client} error={self.error!r}>"
+
+
+class ClientGroup(list):
+    """客户端集合
+
+    在普通列表的基础上提供并发执行能力，使同一操作在所有客户端上同时进行，
+    每个阶段的耗时不再随客户端数量线性增长
+    """
+
+    def run_all(self, action: Union[str, Callable], *args, max_workers: int = None, raise_error=False,
+                **kwargs) -> List[FanoutResult]:
+        """在所有客户端上并发执行同一操作
+
+        Args:
+            action: 字符串时作为命令通过`exec_command`下发；可调用对象时以`action(client, *args, **kwargs)`方式调用
+            max_workers: 最大并发数，默认为 constants.CLIENT_FANOUT_WORKERS
+            raise_error: 是否在所有客户端执行完成后抛出第一个异常
+            *args, **kwargs: 传递给命令或可调用对象的参数
+
+        Returns: 与客户端顺序一致的执行结果列表
+        """
+        if isinstance(action, str):
+            command = action
+
+            def action(client, *_args, **_kwargs):
+                return client.exec_command(command, *_args, **_kwargs)
+
+        def call(client):
+            try:
+                return FanoutResult(client, value=action(client, *args, **kwargs))
+            except Exception as e:
+                logger.debug(f"{client} fan-out action failed: {e!r}")
+                return FanoutResult(client, error=e)
+
+        clients = list(self)
+        if len(clients) <= 1:
+            results = [call(client) for client in clients]
+        else:
+            max_workers = min(max_workers or constants.CLIENT_FANOUT_WORKERS, len(clients))
+            # 工作线程沿用调用方线程名，便于日志归属
+            with ThreadPoolExecutor(max_workers=max_workers,
+                                    thread_name_prefix=threading.current_thread().name) as executor:
+                results = list(executor.map(call, clients))
+
+        if raise_error:
+            for result in results:
+                if not result.ok:
+                    raise result.error
+        return results
+
+
 class ClientBuilder:
     """客户端工厂"""
 
@@ -1,17 +1,24 @@
 # -*- coding: UTF-8 -*-
 import abc
+import codecs
 import json
 import logging
 import ntpath
+import os
 import posixpath
 import re
+import select
 import socket
+import threading
 import time
-from typing import Union
+import uuid
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Deque, Dict, Iterator, Optional, Tuple, Union
 import warnings
 
 from storage_evaluation_system_zzj import constants
-from storage_evaluation_system_zzj.exception import ConfigError, NumberTypeParamValueError
+from storage_evaluation_system_zzj.exception import AgentUnavailable, ConfigError, NumberTypeParamValueError
 
 warnings.filterwarnings(action='ignore', module='.*paramiko.*')
 
@@ -20,12 +27,176 @@ import xml.etree.ElementTree as ET
 import traceback
 import paramiko
 from paramiko.channel import Channel
+from paramiko.sftp_client import SFTPClient
 from paramiko.ssh_exception import AuthenticationException, SSHException
+from paramiko.transport import Transport
 
+from storage_evaluation_system_zzj.client.agent import RemoteAgent, start_agent
 from storage_evaluation_system_zzj.client.client import Client, ClientBuilder
 
 logging.getLogger("paramiko.transport").setLevel(logging.ERROR)
 
+# 终端控制字符
+ANSI_ESCAPE_PATTERN = re.compile(r'\x1B(?:[@-Z\\-_]|\[[0-?]*[ -/]*[@-~])|\x0f')
+# 不完整转义序列的最大保留长度
+ANSI_ESCAPE_MAX_LEN = 64
+
+
+class ChannelPool:
+    """SSH会话通道池
+
+    paramiko的exec通道执行一条命令后即失效，无法复用，因此通道池在后台预先打开会话（预热通道），
+    下发命令时直接取用，使会话建立的往返时延不再位于命令执行的关键路径上。
+    同一连接上同时占用的会话数（空闲+使用中）不超过max_sessions，超出时等待已有会话释放，避免触发sshd的MaxSessions限制。
+
+    统计项：
+        hits: 直接取用预热通道的次数
+        opens: 打开会话的总次数（含预热）
+        waits: 因会话数达到上限而等待的次数
+    """
+
+    def __init__(self, transport: Transport, max_sessions: int, warm_size: int, open_timeout: float = None):
+        self.transport = transport
+        self.max_sessions = max(1, max_sessions)
+        self.warm_size = max(0, min(warm_size, self.max_sessions))
+        self.open_timeout = open_timeout
+        self.hits = 0
+        self.opens = 0
+        self.waits = 0
+        self._idle: Deque[Channel] = deque()
+        # 已占用的会话数（空闲+使用中+打开中）
+        self._occupied = 0
+        self._filling = False
+        self._closed = False
+        self._cond = threading.Condition()
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        with self._cond:
+            idle = len(self._idle)
+            return dict(hits=self.hits, opens=self.opens, waits=self.waits,
+                        idle=idle, in_use=self._occupied - idle)
+
+    def acquire(self, timeout: float = None) -> Channel:
+        """获取一个未执行过命令的会话通道，使用完成后需调用release归还
+
+        Args:
+            timeout: 等待空闲会话名额的超时时间（秒），None表示一直等待
+
+        Returns: 会话通道
+        """
+        deadline = None if timeout is None else time.time() + timeout
+        waited = False
+        with self._cond:
+            while True:
+                if self._closed:
+                    raise SSHException("Channel pool has been closed")
+                chan = self._pop_idle()
+                if chan:
+                    self.hits += 1
+                    break
+                if self._occupied < self.max_sessions:
+                    self._occupied += 1
+                    self.opens += 1
+                    break
+                if not waited:
+                    waited = True
+                    self.waits += 1
+                remaining = None if deadline is None else deadline - time.time()
+                if remaining is not None and remaining <= 0:
+                    raise socket.timeout(f"Waiting for a free ssh session timeout, max_sessions={self.max_sessions}")
+                self._cond.wait(remaining)
+
+        if not chan:
+            try:
+                chan = self.transport.open_session(timeout=self.open_timeout)
+            except Exception:
+                self._release_slot()
+                raise
+        self._fill_async()
+        return chan
+
+    def release(self, channel: Channel):
+        """关闭已使用的通道，释放会话名额"""
+        try:
+            channel.close()
+        finally:
+            self._release_slot()
+        self._fill_async()
+
+    def close(self):
+        """关闭通道池及其中的空闲通道"""
+        with self._cond:
+            self._closed = True
+            idle_channels = list(self._idle)
+            self._idle.clear()
+            self._occupied -= len(idle_channels)
+            self._cond.notify_all()
+        for chan in idle_channels:
+            chan.close()
+
+    def _pop_idle(self):
+        """取出一个可用的空闲通道（调用方需持有锁），已失效的通道直接丢弃"""
+        while self._idle:
+            chan = self._idle.popleft()
+            if not chan.closed and self.transport.is_active():
+                return chan
+            self._occupied -= 1
+        return None
+
+    def _release_slot(self):
+        with self._cond:
+            self._occupied -= 1
+            self._cond.notify_all()
+
+    def _fill_async(self):
+        """后台补充预热通道"""
+        with self._cond:
+            if self._filling or self._closed or len(self._idle) >= self.warm_size:
+                return
+            self._filling = True
+        threading.Thread(target=self._fill, name="SSHChannelPool", daemon=True).start()
+
+    def _fill(self):
+        try:
+            while True:
+                with self._cond:
+                    if (self._closed or len(self._idle) >= self.warm_size
+                            or self._occupied >= self.max_sessions or not self.transport.is_active()):
+                        return
+                    self._occupied += 1
+                    self.opens += 1
+                try:
+                    chan = self.transport.open_session(timeout=self.open_timeout)
+                except Exception:
+                    self._release_slot()
+                    return
+                with self._cond:
+                    if self._closed:
+                        self._occupied -= 1
+                        chan.close()
+                        return
+                    self._idle.append(chan)
+                    self._cond.notify_all()
+        finally:
+            with self._cond:
+                self._filling = False
+
+
+class PooledSFTPClient(SFTPClient):
+    """占用会话通道池名额的SFTP会话，关闭时释放名额"""
+
+    def __init__(self, channel: Channel, pool: ChannelPool):
+        super().__init__(channel)
+        self._pool = pool
+        self._released = False
+
+    def close(self):
+        super().close()
+        if not self._released:
+            self._released = True
+            self._pool.release(self.get_channel())
+
 
 class SSHClient(Client):
     """负载客户端"""
@@ -35,12 +206,18 @@ class SSHClient(Client):
     banner_timeout = 30
     prompt = None
     sep: str = None
+    # 交互式命令是否支持以哨兵行返回退出码（需要POSIX shell）
+    sentinel_supported = False
 
     def __init__(self, env_config: ET.Element):
         self.login_expect = self.default_expect
         self._interact_chan = None
+        self._interact_lock = threading.RLock()
+        self._channel_pool: ChannelPool = None
+        self._channel_pool_lock = threading.Lock()
+        self._sftp: SFTPClient = None
+        self._sftp_lock = threading.RLock()
         self.is_aarch64 = False
-        self.hd_number = 1
         super(SSHClient, self).__init__(env_config)
         self.check_parameters()
 
@@ -164,26 +341,85 @@ class SSHClient(Client):
         return response
 
     def _exec_command(self, command, timeout: int = None, get_pty=False, environment=None):
-        chan = self.connector.get_transport().open_session(timeout=self.banner_timeout)
-        if get_pty:
-            chan.get_pty()
-        chan.settimeout(timeout)
-        if environment:
-            chan.update_environment(environment)
-        chan.exec_command(command)
+        pool = self.channel_pool
+        chan = pool.acquire(timeout=timeout)
         try:
-            ret_code = self._recv_exit_status(chan, timeout=timeout)
-        except Exception:
-            self.logger.debug(f"[ERROR] {self.ip} << Executing command timeout: {command}")
-            raise socket.timeout(f"{self.ip}: Receiving ssh response timeout")
-
-        chan.makefile_stdin("wb", -1)
-        stdout = chan.makefile("r", -1)
-        stderr = chan.makefile_stderr("r", -1)
-        out = stdout.read().strip()
-        err = stderr.read().strip()
+            if get_pty:
+                chan.get_pty()
+            chan.settimeout(timeout)
+            if environment:
+                chan.update_environment(environment)
+            chan.exec_command(command)
+            try:
+                ret_code = self._recv_exit_status(chan, timeout=timeout)
+            except Exception:
+                self.logger.debug(f"[ERROR] {self.ip} << Executing command timeout: {command}")
+                raise socket.timeout(f"{self.ip}: Receiving ssh response timeout")
+
+            chan.makefile_stdin("wb", -1)
+            stdout = chan.makefile("r", -1)
+            stderr = chan.makefile_stderr("r", -1)
+            out = stdout.read().strip()
+            err = stderr.read().strip()
+        finally:
+            pool.release(chan)
         return out, err, ret_code
 
+    def exec_stream(self, command, timeout: int = None, lines: bool = True, chunk_size: int = None,
+                    verbose: bool = True) -> "SSHStream":
+        """执行shell命令，以流的方式逐行（或逐块）返回输出
+
+        输出不会整体缓存在内存中。调用方读取的速度决定从通道读取的速度（通道窗口写满后远端进程阻塞，即背压）。
+        调用方可随时停止迭代或调用 ``close``，此时关闭通道，远端进程随之结束
+
+        Args:
+            command: 命令
+            timeout: 命令执行的总超时时间（秒），默认default_timeout，-1表示不超时
+            lines: True时逐行返回（去除换行符的字符串），False时逐块返回（bytes）
+            chunk_size: 单次从通道读取的字节数
+            verbose: 是否打印命令
+
+        Returns: 可迭代的流对象
+        """
+        if timeout is None:
+            timeout = self.default_timeout
+        elif timeout == -1:
+            self.logger.debug(f"timeout has been disabled for command: {command}")
+            timeout = None
+
+        if verbose:
+            self.logger.debug(f"{self.ip} >> Send cmd(stream):{command}")
+        pool = self.channel_pool
+        chan = pool.acquire(timeout=timeout)
+        try:
+            chan.exec_command(command)
+        except Exception:
+            pool.release(chan)
+            raise
+        return SSHStream(self, chan, pool, timeout=timeout, lines=lines,
+                         chunk_size=chunk_size or constants.SSH_STREAM_CHUNK_SIZE)
+
+    @property
+    def channel_pool(self) -> ChannelPool:
+        """当前连接的会话通道池，连接重建后随之重建"""
+        transport = self.connector.get_transport()
+        with self._channel_pool_lock:
+            if self._channel_pool is None or self._channel_pool.transport is not transport:
+                if self._channel_pool:
+                    self._channel_pool.close()
+                # 预留一个会话给交互式shell
+                max_sessions = int(self.parameters.get("ssh_max_sessions", constants.SSH_MAX_SESSIONS)) - 1
+                warm_size = int(self.parameters.get("ssh_warm_channels", constants.SSH_WARM_CHANNELS))
+                self._channel_pool = ChannelPool(transport, max_sessions, warm_size, open_timeout=self.banner_timeout)
+            return self._channel_pool
+
+    @property
+    def channel_pool_stats(self) -> Dict[str, int]:
+        """会话通道池统计信息"""
+        if self._channel_pool is None:
+            return dict(hits=0, opens=0, waits=0, idle=0, in_use=0)
+        return self._channel_pool.stats
+
     @classmethod
     def _recv_exit_status(cls, channel: Channel, timeout):
         """等待命令执行完成，返回退出码
@@ -224,47 +460,55 @@ class SSHClient(Client):
 
         if verbose is True:
             log_fn(f"{self.ip} >> Send cmd:{command}, expect:{expect}")
-        try:
-            r_str, match_str = self._interact_command(command, expect=expect, timeout=timeout, verbose=verbose)
-
-            ret_code = 0
-            # 获取最后一条命令的退出码
-            if check_code and bool(match_str) and match_str.strip()[-1] in "#>$":
-                try:
-                    _out, _match_str = self._interact_command("echo $?", expect=expect, timeout=10, verbose=False)
-                    _outs = _out.splitlines()
-                    if len(_outs) >= 2:
-                        if _outs[-2].isdigit():
-                            ret_code = int(_outs[-2])
-                        # Windows命令退出码判断
-                        elif 'False' in _outs[-2]:
-                            ret_code = -1
-                except Exception:
-                    self.logger.warning("Expected timeout of obtaining the invoke shell exit code, expect: %s"
-                                        % match_str)
-                    pass
-            stdout = r_str
-            # 处理掉命令发送字符
-            if r_str.strip().startswith(command):
-                stdout = r_str.replace(command, "", 1).strip()
-            response = SSHResponse(ret_code, stdout, expect=expect, prompt=self.default_expect, match_str=match_str)
-        except socket.error as e:
-            # 如果retry=True，且不为recv超时(socket.timeout)时，进行重试
-            if retry and not isinstance(e, socket.timeout):
-                self.logger.debug("Connection not active, re-connecting")
-                if self.connector:
-                    self.connector.close()
-                self._interact_chan = None
-                self._connector = self.connect()
-                return self.interact_command(command, expect=expect, timeout=timeout,
-                                             check_code=check_code, retry=False)
-            else:
-                raise e
+        # 交互式shell通道每个客户端只有一个，并行用例共用客户端时需串行使用
+        with self._interact_lock:
+            try:
+                sentinel = None
+                if check_code and self.sentinel_supported and expect == self.default_expect:
+                    sentinel = self._make_sentinel()
+                r_str, match_str = self._interact_command(command, expect=expect, timeout=timeout, verbose=verbose,
+                                                          sentinel=sentinel)
+
+                ret_code = 0
+                # 获取最后一条命令的退出码
+                if sentinel:
+                    r_str, ret_code = self._pop_sentinel(r_str, sentinel)
+                elif check_code and bool(match_str) and match_str.strip()[-1] in "#>$":
+                    try:
+                        _out, _match_str = self._interact_command("echo $?", expect=expect, timeout=10, verbose=False)
+                        _outs = _out.splitlines()
+                        if len(_outs) >= 2:
+                            if _outs[-2].isdigit():
+                                ret_code = int(_outs[-2])
+                            # Windows命令退出码判断
+                            elif 'False' in _outs[-2]:
+                                ret_code = -1
+                    except Exception:
+                        self.logger.warning("Expected timeout of obtaining the invoke shell exit code, expect: %s"
+                                            % match_str)
+                        pass
+                stdout = r_str
+                # 处理掉命令发送字符
+                if r_str.strip().startswith(command):
+                    stdout = r_str.replace(command, "", 1).strip()
+                response = SSHResponse(ret_code, stdout, expect=expect, prompt=self.default_expect, match_str=match_str)
+            except socket.error as e:
+                # 如果retry=True，且不为recv超时(socket.timeout)时，进行重试
+                if retry and not isinstance(e, socket.timeout):
+                    self.logger.debug("Connection not active, re-connecting")
+                    if self.connector:
+                        self.connector.close()
+                    self._interact_chan = None
+                    self._connector = self.connect()
+                    return self.interact_command(command, expect=expect, timeout=timeout,
+                                                 check_code=check_code, retry=False)
+                else:
+                    raise e
         if verbose:
             log_fn(f"{self.ip} << {response}")
         return response
 
-    def _interact_command(self, command, expect=None, timeout: int = None, verbose=True):
+    def _interact_command(self, command, expect=None, timeout: int = None, verbose=True, sentinel: str = None):
         # 初次建立channel
         if not self._interact_chan:
             self._interact_chan = self.connector.invoke_shell(width=200, height=200)
@@ -276,7 +520,11 @@ class SSHClient(Client):
                 self.prompt = prompt
                 self.logger.debug(f"{self} prompt={prompt}")
 
-        self._interact_chan.send('%s\r' % command)
+        if sentinel:
+            # 命令后紧跟一行输出退出码的哨兵命令，与命令一同发送，命令结束后无需再次交互获取退出码
+            self._interact_chan.send('%s\rprintf \'\\n%s%%d\\n\' "$?"\r' % (command, sentinel))
+        else:
+            self._interact_chan.send('%s\r' % command)
         _is_result_check = False
         if command == 'echo $?':
             _is_result_check = True
@@ -285,33 +533,88 @@ class SSHClient(Client):
                                                  expect,
                                                  timeout,
                                                  is_result_check=_is_result_check,
-                                                 verbose=verbose)
+                                                 verbose=verbose,
+                                                 sentinel=sentinel)
 
         return r_str, match_str
 
-    def _handle_terminal(self, channel: Channel, expect: str, timeout: int, is_result_check=False, verbose=True):
-        """ 处理终端响应信息 """
-        pattern = re.compile(r'\x1B(?:[@-Z\\-_]|\[[0-?]*[ -/]*[@-~])|\x0f')
-        # start_time = time.time()
-        self._interact_chan.settimeout(timeout)
+    @staticmethod
+    def _make_sentinel() -> str:
+        """生成唯一的哨兵前缀，哨兵行格式为 `<前缀><退出码>`"""
+        return f"__SES_RC_{uuid.uuid4().hex[:12]}:"
+
+    @staticmethod
+    def _pop_sentinel(r_str: str, sentinel: str):
+        """从终端输出中提取哨兵行中的退出码，并移除哨兵命令及哨兵行
+
+        Returns: (去除哨兵后的输出, 退出码)
+        """
+        match = re.search(re.escape(sentinel) + r"(\d+)", r_str)
+        ret_code = int(match.group(1)) if match else 0
+        lines = [line for line in r_str.splitlines(keepends=True) if sentinel not in line]
+        return "".join(lines), ret_code
+
+    def _handle_terminal(self, channel: Channel, expect: str, timeout: int, is_result_check=False, verbose=True,
+                         sentinel: str = None):
+        """ 处理终端响应信息
+
+        阻塞等待通道可读（无轮询休眠），仅对新收到的内容做控制字符清理，并只在最后一行范围内匹配预期结束符。
+        指定sentinel时，需先收到哨兵行（`<sentinel><退出码>`），再匹配其后的预期结束符
+
+        Args:
+            channel: 交互通道
+            expect: 预期结束符（正则）
+            timeout: 命令执行完成的超时时间（秒），None表示不超时
+            is_result_check: 是否为`echo $?`退出码查询
+            verbose: 是否打印接收内容
+            sentinel: 哨兵前缀
+        """
         if verbose and timeout != self.default_timeout:
-            self.logger.debug("interactive channel set timeout %d" % timeout)
-        r_str = ""
+            self.logger.debug("interactive channel set timeout %s" % timeout)
+        deadline = None if timeout is None else time.time() + timeout
+        decoder = codecs.getincrementaldecoder("utf-8")()
+        sentinel_pattern = re.compile(re.escape(sentinel) + r"\d+") if sentinel else None
+        # 哨兵行结束位置，此后的内容才用于匹配预期结束符
+        sentinel_end = None if sentinel else 0
         r_str_sub = ""
+        pending = ""  # 尚不完整的转义序列
+        match_str = None
         try:
-            # 捕获recv超时异常
             while True:
+                if deadline is not None:
+                    remaining = deadline - time.time()
+                    if remaining <= 0:
+                        raise socket.timeout(f"{self.ip}: Waiting for interactive response timeout")
+                    channel.settimeout(remaining)
+                else:
+                    channel.settimeout(None)
                 _r_bytes = channel.recv(32768)
-                match = None
-                if _r_bytes:
-                    _r_str = bytes2str(_r_bytes)
-                    r_str += _r_str
-                    r_str_sub = pattern.sub('', r_str)
-                    # 未指定预期响应结束符，按self.prompt处理
-                    if self.prompt and expect == self.default_expect:
-                        match = r_str_sub.endswith(self.prompt)
-                    else:
-                        match = re.search(expect, r_str_sub)
+                if not _r_bytes:
+                    raise socket.error(f"{self.ip}: Interactive channel closed")
+
+                try:
+                    _r_str = decoder.decode(_r_bytes)
+                except UnicodeDecodeError:
+                    # 非utf-8编码输出（如Windows中文环境），后续内容按gbk解码
+                    decoder = codecs.getincrementaldecoder("gbk")(errors="replace")
+                    _r_str = decoder.decode(_r_bytes)
+                # 扫描起点：新内容之前最后一行的行首，保证跨数据块的结束符仍能匹配
+                scan_from = r_str_sub.rfind("\n") + 1
+                chunk, pending = self._strip_ansi(pending + _r_str)
+                r_str_sub += chunk
+
+                if sentinel_end is None:
+                    sentinel_match = sentinel_pattern.search(r_str_sub, scan_from)
+                    if not sentinel_match:
+                        continue
+                    sentinel_end = sentinel_match.end()
+                scan_from = max(scan_from, sentinel_end)
+
+                # 未指定预期响应结束符，按self.prompt处理
+                if self.prompt and expect == self.default_expect:
+                    match = r_str_sub.endswith(self.prompt) and len(r_str_sub) - len(self.prompt) >= sentinel_end
+                else:
+                    match = re.search(expect, r_str_sub[scan_from:])
 
                 if match:
                     if isinstance(match, re.Match):
@@ -323,40 +626,145 @@ class SSHClient(Client):
                         pass
                     else:
                         break
-                time.sleep(0.5)
         finally:
+            r_str_sub += ANSI_ESCAPE_PATTERN.sub('', pending)
             # 换行去重
             r_str_sub = re.compile(r'\n{2,}').sub(r'\n', r_str_sub)
             if verbose:
                 self.logger.debug("[RECV] {}".format(r_str_sub.encode('utf-8')))
         return r_str_sub, match_str
 
+    @staticmethod
+    def _strip_ansi(text: str):
+        """清理终端控制字符
+
+        Returns: (清理后的内容, 末尾尚不完整的转义序列)
+        """
+        index = text.rfind("\x1b")
+        if index != -1 and len(text) - index < ANSI_ESCAPE_MAX_LEN:
+            tail = text[index:]
+            if not ANSI_ESCAPE_PATTERN.match(tail):
+                return ANSI_ESCAPE_PATTERN.sub('', text[:index]), tail
+        return ANSI_ESCAPE_PATTERN.sub('', text), ""
+
     def pkill(self, name):
         """终止指定进程"""
         raise NotImplementedError
 
+    def open_sftp(self) -> SFTPClient:
+        """在会话通道池中打开一个新的SFTP会话，使用完成后需调用close"""
+        pool = self.channel_pool
+        chan = pool.acquire(timeout=self.banner_timeout)
+        try:
+            chan.invoke_subsystem("sftp")
+            return PooledSFTPClient(chan, pool)
+        except Exception:
+            pool.release(chan)
+            raise
+
+    @property
+    def sftp(self) -> SFTPClient:
+        """缓存的SFTP会话，连接重建或会话失效后重新打开。多线程共用时需持有 ``_sftp_lock``"""
+        with self._sftp_lock:
+            chan = self._sftp.get_channel() if self._sftp else None
+            if (not chan or chan.closed or chan.get_transport() is not self.connector.get_transport()):
+                if self._sftp:
+                    self._sftp.close()
+                self._sftp = self.open_sftp()
+            return self._sftp
+
     def put(self, local_path, remote_path, callback=None, confirm=True):
         """ 上传文件
 
         此方法仅适用于单个文件上传，本地和远端路径只能是文件路径，不可适用文件夹路径
         """
         self.logger.debug(f"Uploading file: local path={local_path}, remote path={remote_path}")
-        sftp_client = self.connector.open_sftp()
-        sftp_client.put(local_path, remote_path, callback=callback, confirm=confirm)
-        if sftp_client:
-            sftp_client.close()
+        with self._sftp_lock:
+            self.sftp.put(local_path, remote_path, callback=callback, confirm=confirm)
 
     def get(self, remote_path, local_path, callback=None):
         """ 下载文件
 
-        此方法仅适用于单个文件下载，本地和远端路径只能是文件路径，不可使用文件夹路径
+        此方法仅适用于单个文件下载，本地和远端路径只能是文件路径，不可使用文件夹路径。
+        读请求以流水线方式发出；大文件（constants.SFTP_PARALLEL_THRESHOLD）分段并发下载，每段使用独立的SFTP会话
         """
         self.logger.debug(f"Downloading file: remote path={remote_path}, local path={local_path}")
-        sftp_client = self.connector.open_sftp()
-        sftp_client.get(remote_path, local_path, callback=callback)
-        if sftp_client:
+        with self._sftp_lock:
+            size = self.sftp.stat(remote_path).st_size
+            if size < constants.SFTP_PARALLEL_THRESHOLD or constants.SFTP_PARALLEL_CHUNKS <= 1:
+                self.sftp.get(remote_path, local_path, callback=callback)
+                return
+
+        # 预先分配本地文件，各段按偏移量写入
+        with open(local_path, "wb") as file:
+            file.truncate(size)
+        chunks = constants.SFTP_PARALLEL_CHUNKS
+        chunk_size = -(-size // chunks)
+        ranges = [(offset, min(chunk_size, size - offset)) for offset in range(0, size, chunk_size)]
+        progress = dict(done=0)
+        progress_lock = threading.Lock()
+
+        def on_progress(nbytes):
+            if callback:
+                with progress_lock:
+                    progress["done"] += nbytes
+                    callback(progress["done"], size)
+
+        thread_name = threading.current_thread().name
+        with ThreadPoolExecutor(max_workers=len(ranges), thread_name_prefix=thread_name) as executor:
+            futures = [executor.submit(self._get_range, remote_path, local_path, offset, length, on_progress)
+                       for offset, length in ranges]
+            for future in futures:
+                future.result()
+
+    def _get_range(self, remote_path, local_path, offset: int, length: int, on_progress=None):
+        """使用独立的SFTP会话下载文件的一段"""
+        window = constants.SFTP_PIPELINE_WINDOW
+        block = 1024 * 1024
+        sftp_client = self.open_sftp()
+        try:
+            with sftp_client.open(remote_path, "rb") as remote_file, open(local_path, "r+b") as local_file:
+                local_file.seek(offset)
+                end = offset + length
+                for window_start in range(offset, end, window):
+                    window_end = min(window_start + window, end)
+                    blocks = [(pos, min(block, window_end - pos)) for pos in range(window_start, window_end, block)]
+                    # readv一次性发出窗口内的所有读请求，按顺序返回数据
+                    for data in remote_file.readv(blocks):
+                        local_file.write(data)
+                        if on_progress:
+                            on_progress(len(data))
+        finally:
             sftp_client.close()
 
+    def read_from(self, path, offset: int = 0, max_bytes: int = None, head_size: int = 0) -> Tuple[int, bytes, bytes]:
+        """ 从文件指定偏移量开始读取内容（通过SFTP，不创建shell管道），用于跟踪追加写入的日志文件
+
+        Args:
+            path: 文件路径
+            offset: 开始读取的字节偏移量
+            max_bytes: 单次最多读取的字节数，为None时读取到文件末尾
+            head_size: 同时返回文件开头的字节数，用于判断文件是否已被重新创建
+
+        Raises:
+            FileNotFoundError: 文件不存在
+
+        Returns: (文件当前大小, 文件开头head_size字节, 读取的内容)
+        """
+        with self._sftp_lock:
+            with self.sftp.open(path, "rb") as file:
+                size = file.stat().st_size
+                head = file.read(head_size) if head_size else b""
+                length = max(0, size - offset)
+                if max_bytes is not None:
+                    length = min(length, max_bytes)
+                if not length:
+                    return size, head, b""
+                file.seek(offset)
+                if length > constants.SSH_STREAM_CHUNK_SIZE:
+                    file.prefetch(offset + length)
+                return size, head, file.read(length)
+
     def command_exists(self, command: str) -> bool:
         """指令是否存在"""
         raise NotImplementedError
@@ -371,10 +779,122 @@ class SSHClient(Client):
         raise NotImplementedError
 
     def close(self):
+        if getattr(self, "_agent", None):
+            self._agent.close()
+            self._agent = None
+        if getattr(self, "_sftp", None):
+            self._sftp.close()
+            self._sftp = None
+        if getattr(self, "_channel_pool", None):
+            self._channel_pool.close()
         if self.connector:
             self.connector.close()
 
 
+class SSHStream:
+    """流式命令输出
+
+    通过迭代获取输出，迭代结束后可通过 ``status_code`` 获取退出码，``stderr`` 获取错误输出（仅保留末尾部分）。
+    支持with语句，退出时关闭通道
+    """
+
+    def __init__(self, client: SSHClient, channel: Channel, pool: ChannelPool, timeout: float = None,
+                 lines: bool = True, chunk_size: int = constants.SSH_STREAM_CHUNK_SIZE):
+        self.client = client
+        self.channel = channel
+        self.lines = lines
+        self.chunk_size = chunk_size
+        self._pool = pool
+        self._deadline = None if timeout is None else time.time() + timeout
+        self._stderr = bytearray()
+        self._closed = False
+        self._iterator = self._iter_lines() if lines else self._iter_chunks()
+
+    def __iter__(self) -> Iterator[Union[str, bytes]]:
+        return self._iterator
+
+    def __next__(self):
+        return next(self._iterator)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    @property
+    def status_code(self) -> Optional[int]:
+        """退出码，命令未结束（或提前关闭）时为None"""
+        if self.channel.exit_status_ready():
+            return self.channel.recv_exit_status()
+        return None
+
+    @property
+    def stderr(self) -> str:
+        return bytes2str(bytes(self._stderr)).strip()
+
+    def read_all(self) -> str:
+        """读取剩余的全部输出"""
+        if self.lines:
+            return "\n".join(self)
+        return bytes2str(b"".join(self))
+
+    def close(self):
+        """关闭通道（提前结束时远端进程随之结束）"""
+        if not self._closed:
+            self._closed = True
+            self._iterator.close()
+            self._pool.release(self.channel)
+
+    def _keep_stderr(self, data: bytes):
+        """仅保留stderr末尾部分，避免占用过多内存"""
+        self._stderr += data
+        overflow = len(self._stderr) - constants.SSH_STREAM_STDERR_LIMIT
+        if overflow > 0:
+            del self._stderr[:overflow]
+
+    def _iter_chunks(self) -> Iterator[bytes]:
+        chan = self.channel
+        try:
+            while True:
+                if chan.recv_stderr_ready():
+                    self._keep_stderr(chan.recv_stderr(self.chunk_size))
+                    continue
+                if chan.recv_ready():
+                    data = chan.recv(self.chunk_size)
+                    if data:
+                        yield data
+                    continue
+                if chan.eof_received or chan.closed:
+                    # 输出结束后退出码可能稍晚到达
+                    chan.status_event.wait(timeout=self.client.banner_timeout)
+                    break
+
+                # stdout/stderr任一可读时唤醒
+                remaining = None
+                if self._deadline is not None:
+                    remaining = self._deadline - time.time()
+                    if remaining <= 0:
+                        raise socket.timeout(f"{self.client.ip}: Receiving ssh stream timeout")
+                select.select([chan], [], [], remaining)
+        finally:
+            if not self._closed:
+                self._closed = True
+                self._pool.release(chan)
+
+    def _iter_lines(self) -> Iterator[str]:
+        pending = b""
+        for data in self._iter_chunks():
+            pending += data
+            if b"\n" not in data:
+                continue
+            *lines, pending = pending.split(b"\n")
+            for line in lines:
+                yield bytes2str(line).rstrip("\r")
+        if pending:
+            yield bytes2str(pending).rstrip("\r")
+
+
 class SSHClientBuilder(ClientBuilder):
 
     def create_client(self) -> SSHClient:
@@ -445,11 +965,45 @@ def bytes2str(bytes_obj: bytes, encoding=None, catch_exception=True):
 
 class LinuxClient(SSHClient):
     sep = "/"
+    sentinel_supported = True
 
     def __init__(self, *args, **kwargs):
+        self._agent: Optional[RemoteAgent] = None
+        self._agent_started = False
+        self._agent_lock = threading.Lock()
         super().__init__(*args, **kwargs)
         self.is_aarch64 = self._is_aarch64()
 
+    @property
+    def agent(self) -> Optional[RemoteAgent]:
+        """主机代理，首次使用时启动；未启用或不可用时为None"""
+        with self._agent_lock:
+            if not self._agent_started:
+                self._agent_started = True
+                enabled = str(self.parameters.get("use_agent", constants.REMOTE_AGENT_ENABLED)).lower() == "true"
+                if enabled:
+                    self._agent = start_agent(self)
+            if self._agent and not self._agent.available:
+                self._agent = None
+            return self._agent
+
+    def agent_call(self, method: str, **params):
+        """调用主机代理，代理不可用时抛出 ``AgentUnavailable``"""
+        agent = self.agent
+        if not agent:
+            raise AgentUnavailable(f"{self}: agent disabled")
+        return agent.call(method, **params)
+
+    def agent_batch(self, calls: list) -> Optional[list]:
+        """批量调用主机代理，代理不可用时返回None。参见 ``RemoteAgent.batch``"""
+        agent = self.agent
+        if not agent:
+            return None
+        try:
+            return agent.batch(calls)
+        except AgentUnavailable:
+            return None
+
     @staticmethod
     def join_path(*args):
         return posixpath.join(*args)
@@ -494,9 +1048,13 @@ class LinuxClient(SSHClient):
             path += "/"
         return self.exec_command(f"test -d {path} && echo 'Dir exists' || mkdir -p {path}")
 
-    def remove(self, path):
-        """创建目录"""
-        return self.exec_command(f"rm -rf {path}")
+    def remove(self, path, timeout: int = None):
+        """删除文件/目录
+
+        Args:
+            timeout: 命令超时时间，-1为不超时（删除大量文件时）
+        """
+        return self.exec_command(f"rm -rf {path}", timeout=timeout)
 
     def exists(self, path, target=None, is_dir=False) -> bool:
         """ 判断文件/文件夹是否存在
@@ -513,6 +1071,10 @@ class LinuxClient(SSHClient):
             if path[-1] != "/":
                 path += "/"
             path += target
+        try:
+            return self.agent_call("exists", path=path, is_dir=is_dir)
+        except AgentUnavailable:
+            pass
         resp = self.exec_command(f"test {option} {path}")
         return resp.status_code == 0
 
@@ -524,6 +1086,11 @@ class LinuxClient(SSHClient):
     def kill_process(self, pid=None, keywords=None):
         """停止进程"""
         if pid:
+            try:
+                self.agent_call("kill_process", pid=int(pid))
+                return
+            except (AgentUnavailable, ValueError):
+                pass
             self.exec_command(f"if ps -p {pid} > /dev/null;then kill -9 {pid};fi")
         elif keywords:
             for pid in self.get_pids(keywords):
@@ -533,10 +1100,18 @@ class LinuxClient(SSHClient):
 
     def is_pid_exists(self, pid) -> bool:
         """检查进程是否存在"""
+        try:
+            return self.agent_call("is_pid_exists", pid=int(pid))
+        except (AgentUnavailable, ValueError, TypeError):
+            pass
         return self.exec_command(f"ps -p {pid} -o pid,cmd").status_code == 0
 
     def get_pids(self, keywords: Union[str, list]) -> list:
         """根据关键字获取pid"""
+        try:
+            return self.agent_call("get_pids", keywords=keywords)
+        except AgentUnavailable:
+            pass
         if isinstance(keywords, str):
             grep_str = f"grep '{keywords}'"
         else:
@@ -658,6 +1233,10 @@ class WindowsClient(SSHClient):
         res = self.exec_command(f"Get-Process -Id {pid}")
         return res.status_code == -1
 
-    def remove(self, path):
-        """删除文件/目录"""
-        self.exec_command(f"Remove-Item '{path}' -Force")
+    def remove(self, path, timeout: int = None):
+        """删除文件/目录
+
+        Args:
+            timeout: 命令超时时间，-1为不超时（删除大量文件时）
+        """
+        return self.exec_command(f"Remove-Item '{path}' -Recurse -Force", timeout=timeout)
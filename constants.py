@@ -7,6 +7,8 @@ from enum import Enum, IntEnum, unique
 REPORT_DIR_PREFIX = "SESReport"
 # 校验文件名
 VALIDATION_FILENAME = "validation"
+# 场景执行记录文件（输出目录下），用于断点续跑
+JOURNAL_FILE = "ses_journal.json"
 
 CASES_PATTERN_PATH = "patterns/cases.xml"
 SCENES_PATTERN_PATH = "patterns/scenes.xml"
@@ -24,8 +26,24 @@ CONFIGURABLE_HD_CASE_LIST = [
     "NOT_PERF_CASES",
 ]
 
-# 用例间休眠
+# 用例间休眠（无法获取IO负载时使用固定休眠）
 CASE_RUN_INTERVAL = 60  # 300
+# 用例间静默检测：客户端（及存储接口）的IO带宽与队列深度持续低于阈值一段时间后开始下一个用例
+COOLDOWN_QUIESCENCE_ENABLED = True
+# 用例间最短、最长等待时间（秒）
+COOLDOWN_MIN = 30
+COOLDOWN_MAX = 600
+# 带宽与队列深度持续低于阈值的时间（秒）
+COOLDOWN_QUIET_TIME = 30
+# 单个客户端（或存储）的带宽阈值（MB/s）与队列深度阈值
+COOLDOWN_MAX_MBPS = 5
+COOLDOWN_MAX_QUEUE = 1
+# IO负载采样间隔（秒）
+COOLDOWN_POLL_INTERVAL = 10
+# 当前用例读写结束后，是否在后台预先准备下一个用例的数据集（与报告生成、用例间等待同时进行，准备完成后才开始静默判断）
+DATASET_PRESTAGE = True
+# 并行用例组（scenes.xml中的<p>）：各lane的数据集目录为anchor_path下的此前缀加lane编号
+PARALLEL_ANCHOR_DIR = "ses_lane"
 
 # 参与测评存储的最小容量(KB）：
 MIN_STORAGE_CAPACITY = 200 * 1024 * 1024 * 1024
@@ -37,6 +55,43 @@ TOOL_BASE_DIR_UNIX = "/opt/ses"
 TOOL_BASE_DIR_WIN = "C:\\Program Files\\ses"
 TOOL_VALIDATE_DICT = {"vdbench": ToolInfo("VDB_DIR", "vdb", "vdbench")}
 
+# SSH会话复用
+# 单个SSH连接允许同时打开的最大会话数（与sshd配置项MaxSessions对应，默认10）
+SSH_MAX_SESSIONS = 10
+# 每个连接预先打开（预热）的空闲会话数
+SSH_WARM_CHANNELS = 2
+# 流式读取命令输出时单次读取的字节数
+SSH_STREAM_CHUNK_SIZE = 32 * 1024
+# 流式读取命令输出时保留的stderr末尾字节数
+SSH_STREAM_STDERR_LIMIT = 64 * 1024
+# SFTP下载：超过此大小（字节）的文件分段并发下载
+SFTP_PARALLEL_THRESHOLD = 64 * 1024 * 1024
+# SFTP下载：单个文件的最大并发段数
+SFTP_PARALLEL_CHUNKS = 4
+# SFTP下载：流水线读取窗口（字节），每个窗口内的读请求一次性发出
+SFTP_PIPELINE_WINDOW = 16 * 1024 * 1024
+# 是否启用主机代理（Linux主机上的常驻Python进程，处理文件、进程类操作），不可用时自动回退到shell命令
+REMOTE_AGENT_ENABLED = True
+# 主机代理单次调用的响应超时时间（秒）
+REMOTE_AGENT_TIMEOUT = 60
+# 多主机并发执行同一操作时的最大线程数
+CLIENT_FANOUT_WORKERS = 32
+
+# 报告修改后延迟写入文件的时间（秒），期间的多次修改合并为一次写入
+REPORT_FLUSH_INTERVAL = 5
+# 报告渲染（绘图、表格）进程数，为0时在用例线程中同步渲染
+REPORT_WORKERS = 1
+# 性能图每个子图的最大数据点数，超出时降采样（保留峰谷、跌零与标记点），为0时不降采样
+CHART_MAX_POINTS = 2000
+# 报告打包：不打包的文件（相对输出目录的路径或文件名，fnmatch模式），如 "*/test/*.html"
+REPORT_PACKAGE_EXCLUDE = []
+# 报告打包：先gzip压缩再打包的文件（fnmatch模式），如 "*_iostat_*.log"
+REPORT_PACKAGE_GZIP = []
+# 报告打包：已压缩的文件类型，打包时直接存储不再压缩
+REPORT_PACKAGE_STORED_SUFFIXES = (".gz", ".zip", ".png", ".jpg", ".jpeg")
+# 报告打包：并行gzip压缩线程数
+REPORT_PACKAGE_WORKERS = 4
+
 # sysstat工具获取本地磁盘读写间隔（秒）
 IOSTAT_INTERVAL = 5
 
@@ -46,6 +101,12 @@ VDBENCH_FSD_GROUP_SIZE = 4706 * 1024
 VDBENCH_FSD_GROUP_SIZE_PHOTO_ALBUM = 3606 *1024
 VDBENCH_DEPTH = 4
 VDBENCH_MON_FILE = "ses_vdb.mon"
+# vdbench主从通信端口（-p），并行用例组中各lane使用此端口加lane编号
+VDBENCH_PORT = 5570
+# 数据集清单文件（保存在anchor根目录下），清单一致的用例跳过数据预制
+VDBENCH_MANIFEST_FILE = "ses_dataset.json"
+# 复用数据集前抽样检查目录结构的fsd个数
+VDBENCH_MANIFEST_SAMPLES = 3
 VDBENCH_STABLE_TIME = 150  # 300
 VDBENCH_ELAPSED_PRE = 5
 VDBENCH_ELAPSED = 300 # 6 * 60 * 60 #600
@@ -56,6 +117,28 @@ VDBENCH_PROC_END_TIMEOUT = 60  # 600s
 
 
 VDBENCH_WARMUP = 60
+# 性能稳态检测：是否以检测到的稳定区间替代固定warmup去除，平均值按稳定区间计算（仅性能用例）
+STEADY_STATE_ENABLED = True
+# 性能稳态检测：滑动窗口大小（区间数）
+STEADY_WINDOW = 60
+# 性能稳态检测：窗口内OPS变异系数上限
+STEADY_MAX_RATE_COV = 0.05
+# 性能稳态检测：窗口内时延变异系数上限
+STEADY_MAX_RESP_COV = 0.10
+# 性能稳态检测：估计平均OPS置信区间的分批数（批均值法）
+STEADY_BATCHES = 10
+# 性能稳态检测：平均OPS置信区间足够窄时是否提前结束性能用例（向vdbench监控文件写入结束标志）
+STEADY_EARLY_STOP = False
+# 提前结束：稳定区间最短时长（秒）
+STEADY_MIN_DURATION = 300
+# 提前结束：平均OPS 95%置信区间半宽与平均值之比上限
+STEADY_CI_TARGET = 0.01
+# 时延分布桶边界（毫秒），写入vdbench配置histogram参数。为None时使用vdbench默认桶
+VDBENCH_HISTOGRAM_BUCKETS = None
+# 时延分位数（%）
+LATENCY_PERCENTILES = (50, 90, 99, 99.9)
+# 时延热力图时间分段长度（秒）
+LATENCY_HEATMAP_WINDOW = 60
 # 3天
 VDBENCH_EXEC_TIMEOUT = 3 * 24 * 60 * 60
 VDBENCH_LARGE_FILE = (3, 4, 1024 * 1024)
@@ -112,10 +195,40 @@ DEVICE_INFO_TYPE = [
     "HARDWARE",
     "COMPUTE_NODES",
 ]
-SCENE_TYPES = ["AI", "AI_PERF_DFX", "AI_EXP", "PHOTO_ALBUM"]
+SCENE_TYPES = ["AI", "AI_PERF_DFX", "AI_EXP", "PHOTO_ALBUM", "AI_TUNE"]
 
 # 性能用例时延最大值（毫秒）
 MAX_IO_RESP = 10
+# 性能用例尾部时延最大值（毫秒）：vdbench时延分布（histogram）中全部请求的SLO_TAIL_PERCENTILE分位数
+MAX_IO_TAIL_RESP = 20
+# 尾部时延分位数（%）
+SLO_TAIL_PERCENTILE = 95
+
+# SLO下最大OPS搜索（SLO_SEARCH）
+# 单次探测的最长读写时长（秒）
+SLO_PROBE_ELAPSED = 600
+# 稳定区间达到此时长（秒）即结束本次探测
+SLO_PROBE_STEADY_TIME = 120
+# 最大探测次数
+SLO_MAX_PROBES = 8
+# 搜索区间宽度低于最大OPS的此比例时结束；实际OPS低于fwdrate的(1 - SLO_TOLERANCE)视为未达到限速
+SLO_TOLERANCE = 0.05
+
+# 时延-吞吐曲线（PERF_CURVE）
+# 各级fwdrate占最大OPS的百分比
+CURVE_LEVELS = (10, 20, 30, 40, 50, 60, 70, 80, 90, 100)
+# 每级fwdrate的读写时长（秒）
+CURVE_STEP_ELAPSED = 180
+
+# 线程数自动调优（TUNE_THREADS）
+# 单次探测的最长读写时长（秒）
+TUNE_PROBE_ELAPSED = 600
+# 稳定区间达到此时长（秒）即结束本次探测
+TUNE_PROBE_STEADY_TIME = 120
+# 最大探测次数（线程数逐次翻倍）
+TUNE_MAX_PROBES = 8
+# OPS提升低于此比例视为已达平台期
+TUNE_MIN_GAIN = 0.05
 # 时延不达标是否直接跳过后续所有用例
 IS_IO_RESP_CRITICAL = False
 # 性能波动容忍值，不达标用例无效
@@ -59,3 +59,8 @@ class CasePreConditionError(Exception):
 class CaseFailedError(Exception):
     """用例执行失败"""
     __module__ = "ses"
+
+
+class AgentUnavailable(SESError):
+    """主机代理不可用，需回退到shell命令"""
+    __module__ = "ses"
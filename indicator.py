@@ -52,6 +52,55 @@ class Resp(__Indicator):
         self._value = round(resp,3) # 保留3位小数
 
 
+class RespP50(__Indicator):
+    name = "P50响应时间(ms)"
+
+    def __init__(self, resp: float):
+        self._value = round(resp, 3)
+
+
+class RespP90(__Indicator):
+    name = "P90响应时间(ms)"
+
+    def __init__(self, resp: float):
+        self._value = round(resp, 3)
+
+
+class RespP99(__Indicator):
+    name = "P99响应时间(ms)"
+
+    def __init__(self, resp: float):
+        self._value = round(resp, 3)
+
+
+class RespP999(__Indicator):
+    name = "P99.9响应时间(ms)"
+
+    def __init__(self, resp: float):
+        self._value = round(resp, 3)
+
+
+class KneeOps(__Indicator):
+    name = "拐点OPS(OPS)"
+
+    def __init__(self, ops: float):
+        self._value = round(ops)
+
+
+class KneeResp(__Indicator):
+    name = "拐点响应时间(ms)"
+
+    def __init__(self, resp: float):
+        self._value = round(resp, 3)
+
+
+class SloOps(__Indicator):
+    name = "SLO下最大OPS(OPS)"
+
+    def __init__(self, ops: float):
+        self._value = round(ops)
+
+
 class Continuity(__Indicator):
     name = "业务连续性"
 
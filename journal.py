@@ -0,0 +1,110 @@
+# -*- coding: UTF-8 -*-
+import json
+import os
+import threading
+import time
+from typing import Dict, Optional
+
+from storage_evaluation_system_zzj import constants
+from storage_evaluation_system_zzj.constants import CaseResult
+from storage_evaluation_system_zzj.logger import logger
+
+# 执行记录格式版本，结构变化时递增，旧版本记录不可用于续跑
+JOURNAL_VERSION = 1
+
+
+def _to_json(value):
+    """numpy数值等不能直接序列化的对象"""
+    if hasattr(value, "item"):
+        return value.item()
+    return str(value)
+
+
+class RunJournal:
+    """ 场景执行记录（断点续跑）
+
+    每个用例结束后写入输出目录下的 constants.JOURNAL_FILE：用例结果、运行时缓存数据（如性能基线）、
+    自动调优更新的参数、用例使用的数据集指纹。报告文件本身在用例结束时写入，续跑时在原报告上继续填写。
+    以 ``--resume`` 执行时，已通过的用例不再执行，缓存数据与参数从记录中恢复
+    """
+
+    def __init__(self, output_dir: str, scene: str):
+        self.path = os.path.join(output_dir, constants.JOURNAL_FILE)
+        self.scene = scene
+        self.start_sec = time.time()
+        # {用例id: {"result", "name", "start_time", "end_time", "messages", "dataset"}}
+        self.cases: Dict[str, dict] = {}
+        self.cache: dict = {}
+        self.parameters: Dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def load(cls, output_dir: str, scene: str) -> Optional["RunJournal"]:
+        """读取已有执行记录，不存在、无效或场景不一致时返回None"""
+        journal = cls(output_dir, scene)
+        try:
+            with open(journal.path, encoding="utf-8") as file:
+                data = json.load(file)
+            if data.get("version") != JOURNAL_VERSION:
+                logger.warning(f"Run journal version mismatch: {journal.path}")
+                return None
+            if data.get("scene") != scene:
+                logger.warning(f"Run journal belongs to scene [{data.get('scene')}], not [{scene}]")
+                return None
+            journal.start_sec = float(data["start_sec"])
+            journal.cases = dict(data["cases"])
+            journal.cache = dict(data["cache"])
+            journal.parameters = dict(data.get("parameters", {}))
+        except FileNotFoundError:
+            return None
+        except (ValueError, KeyError, TypeError, AttributeError) as e:
+            logger.warning(f"Invalid run journal {journal.path}: {e!r}")
+            return None
+        return journal
+
+    @property
+    def completed(self) -> list:
+        """已通过的用例id"""
+        return [cid for cid, case in self.cases.items() if case.get("result") == CaseResult.PASS.value]
+
+    def is_completed(self, cid: str) -> bool:
+        return self.cases.get(cid, {}).get("result") == CaseResult.PASS.value
+
+    def record_case(self, case, start_time: float, cache: dict, parameters: Dict[str, str]):
+        """ 记录用例结果并写入文件
+
+        Args:
+            case: 已结束的用例
+            start_time: 用例开始时间
+            cache: 当前的运行时缓存数据
+            parameters: 执行过程中更新的用户参数
+        """
+        entry = dict(result=CaseResult(case.result).value,
+                     name=case.cname,
+                     start_time=start_time,
+                     end_time=time.time(),
+                     messages=[str(m) for m in case.result_messages])
+        manifest = getattr(getattr(case, "vdbench", None), "manifest", None)
+        if manifest is not None:
+            entry["dataset"] = manifest.digest
+        with self._lock:
+            self.cases[case.cid] = entry
+            self.cache = cache
+            self.parameters = dict(parameters)
+            self._write()
+
+    def _write(self):
+        """先写临时文件再替换，记录文件始终完整"""
+        data = dict(version=JOURNAL_VERSION,
+                    scene=self.scene,
+                    start_sec=self.start_sec,
+                    cases=self.cases,
+                    cache=self.cache,
+                    parameters=self.parameters)
+        tmp_path = f"{self.path}.tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as file:
+                json.dump(data, file, indent=2, ensure_ascii=False, default=_to_json)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            logger.warning(f"Saving run journal failed: {e!r}")
@@ -31,7 +31,9 @@ def main():
     else:
         output_dir = os.path.join(os.getcwd(), "output")
 
-    shutil.rmtree(output_dir, ignore_errors=True)
+    # 续跑时保留已有输出（执行记录、报告、日志）
+    if not options.resume:
+        shutil.rmtree(output_dir, ignore_errors=True)
     os.makedirs(output_dir, exist_ok=True)
 
     set_logging(output_dir)
@@ -42,7 +44,8 @@ def main():
                   scenario,
                   output_dir,
                   memory=options.memory,
-                  ignore_toolcheck_error=options.ignore_toolcheck_error)
+                  ignore_toolcheck_error=options.ignore_toolcheck_error,
+                  resume=options.resume)
     try:
         # 运行测试
         suite.run()
@@ -112,6 +115,12 @@ def parse_options(args=None):
         help="Ignore tool validation error if there are clients that don't need dependent tools."
              "\nOr testcases in target suite don't need certain tool"
     )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Resume an interrupted run in the same output directory."
+             "\nPassed cases are skipped, their cached data is reloaded and the existing report is continued"
+    )
     options, _ = parser.parse_known_args(args=args)
 
     if len(_) > 0:
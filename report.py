@@ -1,7 +1,13 @@
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
 from dataclasses import dataclass
 import datetime
+import fnmatch
+import gzip
 import logging
+import multiprocessing
 import os
+import pickle
 import re
 import shutil
 import tarfile
@@ -12,6 +18,7 @@ from types import SimpleNamespace
 from typing import Dict, List, Callable, Union, Optional
 import uuid
 import xml.etree.ElementTree as ET
+import zipfile
 
 from bs4 import BeautifulSoup
 import matplotlib
@@ -107,9 +114,100 @@ class TitledContent:
         return ele
 
 
+def _init_report_worker(output_dir):
+    """报告渲染进程初始化：设置图片保存目录"""
+    from storage_evaluation_system_zzj import suite
+    suite.global_output_dir = output_dir
+
+
+# pyplot非线程安全，并行用例在当前进程同步渲染时需串行绘图
+_PLOT_LOCK = threading.Lock()
+
+
+def _render(func: Callable, *args, **kwargs) -> Optional[str]:
+    """执行报告渲染函数，返回html文本（进程间传递文本而非BeautifulSoup对象）"""
+    with _PLOT_LOCK:
+        result = func(*args, **kwargs)
+    return None if result is None else str(result)
+
+
+class ReportWorker:
+    """ 报告渲染进程池
+
+    pandas/matplotlib绘图等耗时的报告渲染在独立进程中执行，不占用用例线程，也不与SSH线程竞争GIL。
+    渲染函数及参数需可pickle（模块级函数、文件路径、可pickle的对象等），渲染结果为html文本。
+    进程池不可用（constants.REPORT_WORKERS为0、无法创建进程、参数不可pickle、进程异常退出）时在当前线程同步渲染
+    """
+
+    def __init__(self, output_dir, max_workers: int = constants.REPORT_WORKERS):
+        self._executor: ProcessPoolExecutor = None
+        self._futures: List[Future] = []
+        self._lock = threading.Lock()
+        if max_workers > 0:
+            try:
+                self._executor = ProcessPoolExecutor(max_workers=max_workers,
+                                                     mp_context=multiprocessing.get_context("spawn"),
+                                                     initializer=_init_report_worker,
+                                                     initargs=(output_dir,))
+            except Exception as e:
+                logger.debug(f"Report worker unavailable, rendering synchronously: {e!r}")
+
+    def submit(self, func: Callable, *args, **kwargs) -> Future:
+        """提交渲染任务，返回结果为html文本（或None）的Future"""
+        future = Future()
+        with self._lock:
+            self._futures.append(future)
+
+        executor = self._executor
+        if executor is not None:
+            try:
+                pickle.dumps((func, args, kwargs))
+                inner = executor.submit(_render, func, *args, **kwargs)
+            except Exception as e:
+                logger.debug(f"Report job can not be sent to worker, rendering synchronously: {e!r}")
+            else:
+                inner.add_done_callback(lambda f: self._on_done(f, future, func, args, kwargs))
+                return future
+
+        self._run_sync(future, func, args, kwargs)
+        return future
+
+    def wait(self):
+        """等待所有渲染任务完成，并关闭进程池"""
+        with self._lock:
+            futures = list(self._futures)
+        wait(futures)
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+    def _on_done(self, inner: Future, future: Future, func, args, kwargs):
+        error = inner.exception()
+        if isinstance(error, BrokenProcessPool):
+            logger.debug("Report worker terminated abnormally, rendering synchronously")
+            self._executor = None
+            self._run_sync(future, func, args, kwargs)
+        elif error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(inner.result())
+
+    @staticmethod
+    def _run_sync(future: Future, func, args, kwargs):
+        try:
+            future.set_result(_render(func, *args, **kwargs))
+        except Exception as e:
+            future.set_exception(e)
+
+
 class Report:
 
-    def __init__(self, suite):
+    def __init__(self, suite, resume=False):
+        """
+        Args:
+            suite: 测试套
+            resume: 是否续跑。为True且报告文件已存在时，在原报告上继续填写
+        """
         self.suite = suite
         self.scene_name = suite.name
         self.cases = suite.cases
@@ -120,20 +218,34 @@ class Report:
         image_dir = ReportUtil.get_image_dir()
         os.makedirs(image_dir, exist_ok=True)
         self.start_sec: float = None
-        self.build()
-        self._lock = threading.Lock()
+        # 内存中的报告文档，修改后延迟写入文件。读写均需持有_lock
+        self._soup: BeautifulSoup = None
+        self._dirty = False
+        self._flush_timer: threading.Timer = None
+        self._lock = threading.RLock()
+        self.worker = ReportWorker(self.output_dir)
+        if not (resume and self.load()):
+            self.build()
 
     @property
     def html_object(self):
-        return BeautifulSoup(open(self.path, encoding='UTF-8'), features="html.parser")
+        """内存中的报告文档（所有修改共用同一对象）"""
+        return self._soup
+
+    def render(self, func: Callable, *args, **kwargs) -> Future:
+        """ 在报告渲染进程中异步生成报告内容，结果可直接作为 ``handle_case_report`` 的content
+
+        Args:
+            func: 渲染函数，返回BeautifulSoup对象或None。函数及参数需可pickle，否则同步执行
+        """
+        return self.worker.submit(func, *args, **kwargs)
 
     def build(self):
         """创建框架"""
         title = f"{self.scene_name}场景存储测评报告"
         template_path = util.get_resource_path('report/Template.html')
-        with open(self.path, 'w', encoding='UTF-8') as inf:
-            with open(template_path, 'r', encoding='UTF-8') as tf:
-                inf.write(tf.read())
+        with open(template_path, 'r', encoding='UTF-8') as tf:
+            self._soup = BeautifulSoup(tf.read(), features="html.parser")
 
         # 标题
         soup = self.html_object
@@ -148,6 +260,50 @@ class Report:
 
         self.build_toc_and_sum_table(soup, content_div)
         self._update_html(soup)
+        self.flush()
+
+    def load(self) -> bool:
+        """ 续跑：读取已有报告，清除未通过用例的报告内容（将重新执行）
+
+        Returns: 是否读取成功。报告不存在或与当前用例不一致时返回False，需重新创建
+        """
+        if not os.path.exists(self.path):
+            return False
+        with open(self.path, 'r', encoding='UTF-8') as file:
+            soup = BeautifulSoup(file.read(), features="html.parser")
+        missing = [case.cid for case in self.cases if soup.find(attrs={"id": case.cid}) is None]
+        if missing:
+            logger.warning(f"Existing report does not match the cases ({','.join(missing)}), creating a new one")
+            return False
+
+        self._soup = soup
+        self.start_sec = self.suite.journal.start_sec
+        # 中断时未完成渲染的内容
+        for placeholder in soup.find_all(id=re.compile(r"^pending_")):
+            placeholder.decompose()
+        for case in self.cases:
+            if not self.suite.journal.is_completed(case.cid):
+                self.reset_case(case.cid)
+        self._update_html(soup)
+        self.flush()
+        logger.info(f"Continuing report: {self.path}")
+        return True
+
+    def reset_case(self, case_id: str):
+        """清除用例报告内容、总览表中的指标与左侧栏结果标记"""
+        with self._lock:
+            soup = self.html_object
+            case_ele = self.find_element_by_id(case_id, html_object=soup)
+            for clazz in ("case-summary", "case-content"):
+                case_ele.find("div", attrs={"class": clazz}).clear()
+            row = self.find_element_by_id(f"indicator_{case_id}", html_object=soup)
+            if row is not None:
+                for td in row.find_all("td")[3:]:
+                    td.decompose()
+            sidebar_li = self.find_element_by_id(f"sidebar_{case_id}", html_object=soup)
+            if sidebar_li is not None and sidebar_li.has_attr("class"):
+                del sidebar_li["class"]
+            self._update_html(soup)
 
     def build_summary(self, title) -> str:
 
@@ -252,11 +408,12 @@ class Report:
 
     def insert_casestep_content(self, case_id, content: BeautifulSoup):
         """插入用例报告内容"""
-        soup = self.html_object
-        case_ele = self.find_element_by_id(case_id, html_object=soup)
-        content_ele = case_ele.find("div", attrs={"class": "case-content"})
-        content_ele.append(content)
-        self._update_html(soup)
+        with self._lock:
+            soup = self.html_object
+            case_ele = self.find_element_by_id(case_id, html_object=soup)
+            content_ele = case_ele.find("div", attrs={"class": "case-content"})
+            content_ele.append(content)
+            self._update_html(soup)
 
     def handle_case_report(self,
                            case_id: str,
@@ -264,7 +421,7 @@ class Report:
                            start_time: int,
                            messages=[],
                            records=[],
-                           content: BeautifulSoup = None,
+                           content: Union[BeautifulSoup, Future] = None,
                            ):
         """用例报告
 
@@ -274,7 +431,7 @@ class Report:
             start_time: 开始时间
             records: 用例步骤信息
             messages: 用例结果补充信息
-            content: 用例报告
+            content: 用例报告，或 ``render`` 返回的异步渲染结果
         """
 
         def _handle_case_report():
@@ -311,7 +468,11 @@ class Report:
             content_ele = case_ele.find("div", attrs={"class": "case-content"})
             if records:
                 content_ele.append(ReportUtil.create_record_table(records))
-            if content:
+            if isinstance(content, Future):
+                # 异步渲染的内容先占位，渲染完成后替换
+                content_ele.append(ReportUtil.str2element(f'<div id="pending_{case_id}"></div>'))
+                content.add_done_callback(lambda f: self._insert_rendered_content(case_id, f))
+            elif content:
                 content_ele.append(content)
 
             # 目录渲染
@@ -323,77 +484,98 @@ class Report:
 
         with self._lock:  # 避免同时修改报告
             _handle_case_report()
+        # 用例结束时立即写入
+        self.flush()
+
+    def _insert_rendered_content(self, case_id: str, future: Future):
+        """异步渲染完成后替换用例报告中的占位元素"""
+        try:
+            html = future.result()
+        except Exception:
+            html = None
+            logger.error(f"Report: rendering content of case [{case_id}] error")
+            logger.debug(f"Render report failed. Traceback: {traceback.format_exc()}")
+
+        with self._lock:
+            placeholder = self.find_element_by_id(f"pending_{case_id}")
+            if placeholder is None:
+                return
+            if html:
+                placeholder.replace_with(ReportUtil.str2element(html))
+            else:
+                placeholder.decompose()
+            self._update_html(self._soup)
 
     def insert_summary_table(self, case_id: str, indicators: tuple = None):
         if not indicators:
             return
 
-        soup = self.html_object
-        case_summary = self.find_element_by_id(f"indicator_{case_id}", html_object=soup)
-
-        summary = ""
-        if isinstance(indicators, list):
-            case_common = ""
-            for item in case_summary.find_all("td")[1:]:
-                case_common += f"{item}"
-            for case_indicator in indicators:
-                summary = ""
-                for indicator in case_indicator[1]:
+        with self._lock:
+            soup = self.html_object
+            case_summary = self.find_element_by_id(f"indicator_{case_id}", html_object=soup)
+
+            summary = ""
+            if isinstance(indicators, list):
+                case_common = ""
+                for item in case_summary.find_all("td")[1:]:
+                    case_common += f"{item}"
+                for case_indicator in indicators:
+                    summary = ""
+                    for indicator in case_indicator[1]:
+                        summary += f"<td>{indicator.name}: {indicator.value}</td>"
+                    case_name = f"<td>{case_indicator[0]}</td>"
+                    case_summary.insert_before(ReportUtil.str2element(f"<tr>{case_name}{case_common}{summary}</tr>"))
+                case_summary.decompose()
+            else:
+                if not isinstance(indicators, tuple):
+                    indicators = (indicators,)
+                for indicator in indicators:
                     summary += f"<td>{indicator.name}: {indicator.value}</td>"
-                case_name = f"<td>{case_indicator[0]}</td>"
-                case_summary.insert_before(ReportUtil.str2element(f"<tr>{case_name}{case_common}{summary}</tr>"))
-            case_summary.decompose()
-        else:
-            if not isinstance(indicators, tuple):
-                indicators = (indicators,)
-            for indicator in indicators:
-                summary += f"<td>{indicator.name}: {indicator.value}</td>"
-            case_summary.append(ReportUtil.str2element(summary))
-        self._update_html(soup)
+                case_summary.append(ReportUtil.str2element(summary))
+            self._update_html(soup)
 
     def add_energy_consumption(self, value: float):
         """添加能耗值"""
-        soup = self.html_object
-        summary_table = self.find_element_by_id("summary-table", html_object=soup)
-        summary_table.append(ReportUtil.str2element(f'<tr id=indicator_energy_consumption>'
-                                                    f'<td>基础能效</td>'
-                                                    f'<td>能效</td>'
-                                                    f'<td>否</td>'
-                                                    f'<td>功率(W): {value}</td>'
-                                                    f'</tr>'))
-        self._update_html(soup)
+        with self._lock:
+            soup = self.html_object
+            summary_table = self.find_element_by_id("summary-table", html_object=soup)
+            summary_table.append(ReportUtil.str2element(f'<tr id=indicator_energy_consumption>'
+                                                        f'<td>基础能效</td>'
+                                                        f'<td>能效</td>'
+                                                        f'<td>否</td>'
+                                                        f'<td>功率(W): {value}</td>'
+                                                        f'</tr>'))
+            self._update_html(soup)
 
     def finish(self):
         """根据套餐名结束测试报告回填结果"""
         logger.info("Preparing report package")
         self._handle_user_config_file()
+        # 等待所有报告内容渲染完成
+        self.worker.wait()
 
-        soup = self.html_object
-        end_time_ele = self.find_element_by_id("test-end-time", html_object=soup)
-        end_sec = int(time.time())
-        end_time = util.timestr(end_sec)
-        end_time_ele.string.replace_with(end_time)
-
-        elapsed_ele = self.find_element_by_id("test-elapsed", html_object=soup)
-        elapsed = datetime.timedelta(seconds=int(end_sec - self.start_sec))
-        elapsed_ele.string.replace_with(str(elapsed))
-        self._update_html(soup)
+        with self._lock:
+            soup = self.html_object
+            end_time_ele = self.find_element_by_id("test-end-time", html_object=soup)
+            end_sec = int(time.time())
+            end_time = util.timestr(end_sec)
+            end_time_ele.string.replace_with(end_time)
+
+            elapsed_ele = self.find_element_by_id("test-elapsed", html_object=soup)
+            elapsed = datetime.timedelta(seconds=int(end_sec - self.start_sec))
+            elapsed_ele.string.replace_with(str(elapsed))
+            self._update_html(soup)
+        self.flush()
 
-        # 所有文件复制到打包目录下
+        # 所有文件以硬链接方式放入打包目录下，不复制文件内容
         dir_name = "{}_{}_{}".format(constants.REPORT_DIR_PREFIX,
                                      self.scene_name,
                                      util.timestr(fmt=TimeFormat.COMPACT))
-        tmp_zip_dir = os.path.join(os.path.dirname(self.output_dir), dir_name)
-        shutil.rmtree(tmp_zip_dir, ignore_errors=True)
-        shutil.copytree(self.output_dir, tmp_zip_dir)
         zip_dir = os.path.join(self.output_dir, dir_name)
-        shutil.move(tmp_zip_dir, zip_dir)  # 将目录移动到output下
-        self.__encrypt(zip_dir)
         try:
-            shutil.make_archive(zip_dir,
-                                'zip',
-                                root_dir=self.output_dir,
-                                base_dir=dir_name)
+            self._stage_package(zip_dir)
+            self.__encrypt(zip_dir)
+            self._write_package(zip_dir, dir_name)
         except Exception:
             logger.debug(traceback.format_exc())
             logger.info(f"Report directory: {zip_dir}")
@@ -409,6 +591,75 @@ class Report:
         else:
             logger.warning(f"Generating report package error: {zip_dir}")
 
+    def _stage_package(self, zip_dir):
+        """ 构建打包目录
+
+        输出目录下的文件以硬链接方式放入打包目录（不支持硬链接时复制），匹配 ``REPORT_PACKAGE_EXCLUDE`` 的文件不打包，
+        匹配 ``REPORT_PACKAGE_GZIP`` 的文件在线程池中并行gzip压缩后放入
+        """
+        shutil.rmtree(zip_dir, ignore_errors=True)
+        with ThreadPoolExecutor(max_workers=constants.REPORT_PACKAGE_WORKERS) as pool:
+            futures = []
+            for root, dirs, files in os.walk(self.output_dir):
+                rel_root = os.path.relpath(root, self.output_dir)
+                if rel_root == os.curdir:
+                    rel_root = ""
+                    dirs[:] = [d for d in dirs if os.path.join(root, d) != zip_dir]
+                dirs[:] = [d for d in dirs
+                           if not self._match_package_pattern(os.path.join(rel_root, d),
+                                                              constants.REPORT_PACKAGE_EXCLUDE)]
+                target_root = os.path.join(zip_dir, rel_root)
+                os.makedirs(target_root, exist_ok=True)
+                for name in files:
+                    rel_path = os.path.join(rel_root, name)
+                    if not rel_root and name == f"{os.path.basename(zip_dir)}.zip":
+                        continue
+                    if self._match_package_pattern(rel_path, constants.REPORT_PACKAGE_EXCLUDE):
+                        continue
+                    src, dst = os.path.join(root, name), os.path.join(target_root, name)
+                    if self._match_package_pattern(rel_path, constants.REPORT_PACKAGE_GZIP):
+                        futures.append(pool.submit(self._gzip_file, src, f"{dst}.gz"))
+                    else:
+                        self._link_file(src, dst)
+            for future in futures:
+                future.result()
+
+    @staticmethod
+    def _match_package_pattern(rel_path: str, patterns) -> bool:
+        rel_path = rel_path.replace(os.sep, "/")
+        return any(fnmatch.fnmatch(rel_path, p) or fnmatch.fnmatch(os.path.basename(rel_path), p)
+                   for p in patterns)
+
+    @staticmethod
+    def _link_file(src, dst):
+        try:
+            os.link(src, dst)
+        except OSError:
+            shutil.copy2(src, dst)
+
+    @staticmethod
+    def _gzip_file(src, dst):
+        with open(src, "rb") as f_in, gzip.open(dst, "wb", compresslevel=6) as f_out:
+            shutil.copyfileobj(f_in, f_out, 1024 * 1024)
+
+    def _write_package(self, zip_dir, dir_name):
+        """ 打包目录流式写入zip文件（先写临时文件，完成后替换）
+
+        已压缩的文件（``REPORT_PACKAGE_STORED_SUFFIXES``）直接存储，不再重复压缩
+        """
+        zip_path = f"{zip_dir}.zip"
+        tmp_path = f"{zip_path}.tmp"
+        with zipfile.ZipFile(tmp_path, "w", compression=zipfile.ZIP_DEFLATED, allowZip64=True) as zf:
+            for root, dirs, files in os.walk(zip_dir):
+                dirs.sort()
+                arc_root = os.path.normpath(os.path.join(dir_name, os.path.relpath(root, zip_dir)))
+                zf.write(root, arc_root)
+                for name in sorted(files):
+                    stored = name.lower().endswith(constants.REPORT_PACKAGE_STORED_SUFFIXES)
+                    zf.write(os.path.join(root, name), os.path.join(arc_root, name),
+                             compress_type=zipfile.ZIP_STORED if stored else zipfile.ZIP_DEFLATED)
+        os.replace(tmp_path, zip_path)
+
     @staticmethod
     def compress_folder(folder_path, output_path):
         with tarfile.open(output_path, 'w:gz') as tar:
@@ -446,8 +697,27 @@ class Report:
                                              xml_declaration=True)
 
     def _update_html(self, soup):
-        with open(self.path, 'w', encoding='UTF-8') as f:
-            f.write(str(soup))
+        """标记报告已修改，延迟（constants.REPORT_FLUSH_INTERVAL）写入文件，期间的多次修改合并为一次写入"""
+        with self._lock:
+            self._dirty = True
+            if self._flush_timer is None:
+                self._flush_timer = threading.Timer(constants.REPORT_FLUSH_INTERVAL, self.flush)
+                self._flush_timer.daemon = True
+                self._flush_timer.start()
+
+    def flush(self):
+        """立即将报告写入文件。先写临时文件再替换，报告文件始终完整"""
+        with self._lock:
+            if self._flush_timer is not None:
+                self._flush_timer.cancel()
+                self._flush_timer = None
+            if not self._dirty:
+                return
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, 'w', encoding='UTF-8') as f:
+                f.write(str(self._soup))
+            os.replace(tmp_path, self.path)
+            self._dirty = False
 
     def __encrypt(self, zip_dir):
         """报告加密"""
@@ -674,6 +944,8 @@ class ReportUtil:
                ]
             ncols: 子图列数
 
+        子图处理函数使用完整数据计算统计值、峰谷值，仅绘制时降采样（见 ``init_ax``），绘图耗时与运行时长无关
+
         Returns: 已生成并保存的图片名称
 
         """
@@ -686,19 +958,18 @@ class ReportUtil:
         if not ax_handler:
             ax_handler = ReportUtil.handle_basic_ax
 
+        def handle(ax, label):
+            ax_handler(x, data[label["name"]], ax, label, **kwargs)
+
         for index, axs in enumerate(axes_array):
             # 单行时axes为一维数组，多行时为二维
             if isinstance(axs, Axes):
-                label = labels[index]
-                sub_data = data[label["name"]]
-                ax_handler(x, sub_data, axs, label, **kwargs)
+                handle(axs, labels[index])
             else:
                 for ax in axs:
                     if ax_count >= len(labels):  # 处理奇数子图情况
                         break
-                    label = labels[ax_count]
-                    sub_data = data[label["name"]]
-                    ax_handler(x, sub_data, ax, label, **kwargs)
+                    handle(ax, labels[ax_count])
                     ax_count += 1
 
         if len(labels) % 2 == 1:  # 若子图为奇数，移除最后的空白图
@@ -709,8 +980,70 @@ class ReportUtil:
         return fig_name
 
     @staticmethod
-    def init_ax(x, data: DataFrame, ax_obj: Axes, label: dict):
-        """通用ax处理"""
+    def downsample(x: list, data: Series, target: int = None, keep=None) -> tuple:
+        """ 保留形状的min/max分桶降采样，仅用于绘图（统计值须使用完整数据计算）
+
+        数据分为 target/2 个桶，每个桶保留最小值与最大值点；首尾点、跌零区间的边界点，以及
+        keep 中的点（如故障标记点）总是保留
+
+        Args:
+            x: x轴数据
+            data: 单个坐标轴数据
+            target: 目标点数，默认constants.CHART_MAX_POINTS
+            keep: 必须保留的点的索引，可为嵌套列表
+
+        Returns: (降采样后的x轴数据, 降采样后的数据（索引从0开始）, 保留点的原索引)。
+            未降采样时保留点的原索引为None，原索引可由 ``remap_indexes`` 映射到降采样后的位置
+        """
+        target = constants.CHART_MAX_POINTS if target is None else target
+        n = len(data)
+        if not target or n <= target:
+            return x, data, None
+
+        values = np.nan_to_num(np.asarray(data, dtype=float))
+        size = -(-n // max(1, target // 2))
+        buckets = -(-n // size)
+        blocks = np.pad(values, (0, buckets * size - n), mode="edge").reshape(buckets, size)
+        offsets = np.arange(buckets) * size
+        # 跌零区间的开始、结束点
+        edges = np.flatnonzero(np.diff((values == 0).astype(np.int8)))
+        keep = [np.argmin(blocks, axis=1) + offsets,
+                np.argmax(blocks, axis=1) + offsets,
+                [0, n - 1], edges, edges + 1,
+                [i for i in ReportUtil._flatten_indexes(keep) if i < n]]
+        indexes = np.unique(np.clip(np.concatenate([np.asarray(k, dtype=np.int64) for k in keep]), 0, n - 1))
+
+        new_x = list(np.asarray(x, dtype=object)[indexes])
+        return new_x, data.iloc[indexes].reset_index(drop=True), indexes
+
+    @staticmethod
+    def remap_indexes(indexes, value):
+        """将原数据索引（可为嵌套列表）映射到降采样后的位置，indexes为 ``downsample`` 返回的保留点原索引"""
+        if indexes is None:
+            return value
+        if isinstance(value, (list, tuple)):
+            return type(value)(ReportUtil.remap_indexes(indexes, v) for v in value)
+        if isinstance(value, (int, np.integer)):
+            return int(np.searchsorted(indexes, value))
+        return value
+
+    @staticmethod
+    def _flatten_indexes(value) -> List[int]:
+        if isinstance(value, (list, tuple)):
+            return [i for v in value for i in ReportUtil._flatten_indexes(v)]
+        if isinstance(value, (int, np.integer)):
+            return [int(value)]
+        return []
+
+    @staticmethod
+    def init_ax(x, data: DataFrame, ax_obj: Axes, label: dict, keep=None) -> tuple:
+        """ 通用ax处理
+
+        Args:
+            keep: 降采样时必须保留的点的索引（如补充点）
+
+        Returns: 用于绘图的降采样数据，见 ``downsample``
+        """
         label_name = label["name"]
         ax_obj.tick_params(axis='x', labelrotation=45, labelsize=9)
         ax_obj.set_ylim(0.8 * min(data), 1.2 * max(data))
@@ -721,7 +1054,9 @@ class ReportUtil:
         ax_obj.set_title(f"{label_name} Chart", fontsize=8, fontweight='bold')
         # 背景颜色
         ax_obj.patch.set_facecolor('silver')
+        x, data, indexes = ReportUtil.downsample(x, data, keep=keep)
         ax_obj.fill_between(x, y1=data, color=ReportUtil.THEME_COLOR, alpha=0.5)
+        return x, data, indexes
 
     @staticmethod
     def handle_basic_ax(x: list,
@@ -740,7 +1075,7 @@ class ReportUtil:
             label: 见 ``create_subplots`` labels
 
         """
-        ReportUtil.init_ax(x, data, ax_obj, label)
+        x, data, _ = ReportUtil.init_ax(x, data, ax_obj, label)
 
         label_name = label["name"]
         ax_obj.plot(x, data, label=label_name, color=ReportUtil.THEME_COLOR)
@@ -806,9 +1141,7 @@ class ReportUtil:
                 mark_end = mark_range[1]
             mark_start = mark_range[0]
 
-        ReportUtil.init_ax(x, data, ax_obj, label)
-
-        # 找峰谷值
+        # 找峰谷值（使用完整数据）
         peaks_i, _ = find_peaks(data, distance=5)
         valley_i, _ = find_peaks(-data, distance=5)
 
@@ -837,14 +1170,15 @@ class ReportUtil:
 
         df = DataFrame(ratios, columns=["start", "end", "ratio"])
         df = df[abs(df["ratio"]) > threshold]
+        plot_x, plot_data, indexes = ReportUtil.init_ax(x, data, ax_obj, label, keep=added_dots)
         label_name = label["name"]
-        xarray = np.array(x)
-        ax_obj.plot(xarray, data, label=label_name, color=ReportUtil.THEME_COLOR)
+        xarray = np.array(plot_x)
+        ax_obj.plot(xarray, plot_data, label=label_name, color=ReportUtil.THEME_COLOR)
 
-        # ReportUtil.paint_fluctuation(data, df, ax_obj, mark_start, mark_end, xarray)
+        # ReportUtil.paint_fluctuation(data, df, ax_obj, mark_start, mark_end, np.array(x))
         # 添加补充点
         if added_dots:
-            ReportUtil.add_dots(ax_obj, xarray, data, added_dots, added_label)
+            ReportUtil.add_dots(ax_obj, xarray, plot_data, ReportUtil.remap_indexes(indexes, added_dots), added_label)
 
         plt.close()
 
@@ -908,15 +1242,15 @@ class ReportUtil:
         """
         增加操作点
         """
-        ReportUtil.init_ax(x, data, ax_obj, label)
+        if added_dots and not isinstance(added_dots, list):
+            added_dots = [added_dots]
+        x, data, indexes = ReportUtil.init_ax(x, data, ax_obj, label, keep=added_dots)
 
         label_name = label["name"]
         xarray = np.array(x)
         ax_obj.plot(xarray, data, label=label_name, color=ReportUtil.THEME_COLOR)
         if added_dots:
-            if not isinstance(added_dots, list):
-                added_dots = [added_dots]
-            ReportUtil.add_dots(ax_obj, xarray, data, added_dots, added_label)
+            ReportUtil.add_dots(ax_obj, xarray, data, ReportUtil.remap_indexes(indexes, added_dots), added_label)
 
         plt.close()
 
@@ -948,13 +1282,13 @@ class ReportUtil:
             added_label: 补充点图标
         """
 
-        ReportUtil.init_ax(x, data, ax_obj, label)
+        plot_x, plot_data, indexes = ReportUtil.init_ax(x, data, ax_obj, label, keep=added_dots)
 
         label_name = label["name"]
-        xarray = np.array(x)
-        ax_obj.plot(xarray, data, label=label_name, color=ReportUtil.THEME_COLOR)
+        xarray = np.array(plot_x)
+        ax_obj.plot(xarray, plot_data, label=label_name, color=ReportUtil.THEME_COLOR)
 
-        # 计算每个阶段的稳定平均值
+        # 计算每个阶段的稳定平均值（使用完整数据）
         for (range_index, line_color) in zip(range_indexes, ReportUtil.DIFF_LINE_COLORS):
             start_index, end_index = range_index[0], range_index[1]
             data_range = data.loc[start_index:end_index]
@@ -963,7 +1297,7 @@ class ReportUtil:
 
         # 添加补充点
         if added_dots:
-            ReportUtil.add_dots(ax_obj, xarray, data, added_dots, added_label)
+            ReportUtil.add_dots(ax_obj, xarray, plot_data, ReportUtil.remap_indexes(indexes, added_dots), added_label)
         plt.close()
 
     @staticmethod
@@ -984,9 +1318,45 @@ class ReportUtil:
         
         return filename
 
+    @staticmethod
+    def build_curve_html_object(records: List[dict], knee_index: int, x_col="OPS", y_col="时延(ms)",
+                                title="时延-吞吐曲线"):
+        """ 绘制曲线数据表与曲线图，并标记拐点
+
+        Args:
+            records: 各点数据，按x轴顺序排列
+            knee_index: 拐点在records中的索引
+            x_col: x轴数据列
+            y_col: y轴数据列
+            title: 标题
+
+        Returns: 绘制的html对象
+        """
+        soup = BeautifulSoup(f"<div></div>", 'html.parser')
+        target = soup.find("div")
+        target.append(TitledContent(title, ReportUtil.create_table(records)).to_soup())
+
+        x = [r[x_col] for r in records]
+        y = [r[y_col] for r in records]
+        fig, ax = plt.subplots(figsize=(10, 5), constrained_layout=True)
+        ax.plot(x, y, marker="o", color=ReportUtil.THEME_COLOR, label=y_col)
+        ax.scatter([x[knee_index]], [y[knee_index]], color="#FF0000", s=80, zorder=3, label="Knee")
+        ax.annotate(f"({x[knee_index]}, {y[knee_index]})", (x[knee_index], y[knee_index]),
+                    textcoords="offset points", xytext=(-20, 10), fontsize=9)
+        ax.set_xlabel(x_col)
+        ax.set_ylabel(y_col)
+        ax.grid(linestyle='--', color="#d9d9d9")
+        ax.legend()
+        fig_name = ReportUtil.save_fig(fig)
+        plt.close(fig)
+        target.append(ReportUtil.create_img_element(fig_name, title))
+        return soup
+
     @staticmethod
     def build_perf_test_html_object(csv_file=None, avg_csv_file=None, csv_handler: Callable = None,
-                                    avg_csv_handler: Callable = None, chart_title="性能数据图"):
+                                    avg_csv_handler: Callable = None, chart_title="性能数据图",
+                                    steady_records: List[dict] = None, latency_records: List[dict] = None,
+                                    latency_heatmap: dict = None):
         """绘制html对象
 
         Args:
@@ -997,19 +1367,33 @@ class ReportUtil:
             avg_csv_handler: 性能数据平均值处理方法，
                 为None时使用默认方法。为自定义方法时，接收avg_csv_file，返回已保存的图片名称
             chart_title: 图标标题
+            steady_records: 稳定区间信息，为None时不展示
+            latency_records: 时延分位数，为None时不展示
+            latency_heatmap: 时延热力图数据（见 ``VdbenchReporter.latency_heatmap``），为None时不展示
 
         Returns: 绘制的html对象
         """
         soup = BeautifulSoup(f"<div></div>", 'html.parser')
         target = soup.find("div")
 
+        # 稳定区间表格
+        if steady_records:
+            table = ReportUtil.create_table(steady_records)
+            target.append(TitledContent("稳定区间", table, "性能指标（OPS、带宽、时延）按稳定区间计算").to_soup())
+
         # avg表格
         if avg_csv_file is not None and avg_csv_handler is not None:
             try:
                 df_avg = avg_csv_handler(avg_csv_file)
                 if df_avg is not None:
                     table = ReportUtil.create_table(df_avg.to_dict('records'), header_pos="v")
-                    target.append(TitledContent("平均性能数据", table).to_soup())
+                    if steady_records:
+                        # 指标按稳定区间计算，vdbench的avg行为除warmup外的全程平均，两者不同
+                        target.append(TitledContent("全程平均性能数据", table,
+                                                    "vdbench avg行：除warmup（-w）外的全部区间，"
+                                                    "不同于按稳定区间计算的性能指标").to_soup())
+                    else:
+                        target.append(TitledContent("平均性能数据", table).to_soup())
             except Exception:
                 logger.error("Report: parsing avg performance data error")
                 logger.debug(f"Build html object failed. File: {avg_csv_file}\n Traceback:{traceback.format_exc()}")
@@ -1024,8 +1408,70 @@ class ReportUtil:
             except Exception:
                 logger.error("Report: parsing performance data error")
                 logger.debug(f"Build html object failed. File: {csv_file}\n Traceback:{traceback.format_exc()}")
+
+        # 时延分位数表格
+        if latency_records:
+            table = ReportUtil.create_table(latency_records)
+            target.append(TitledContent("时延分位数", table, "按vdbench时延分布（histogram）在桶内线性插值计算").to_soup())
+
+        # 时延热力图
+        if latency_heatmap:
+            try:
+                picture_name = ReportUtil.create_heatmap(**latency_heatmap)
+                target.append(ReportUtil.create_img_element(picture_name, "时延热力图"))
+            except Exception:
+                logger.error("Report: drawing latency heatmap error")
+                logger.debug(f"Build html object failed. Traceback:{traceback.format_exc()}")
         return soup
 
+    @staticmethod
+    def build_parallel_timeline_html_object(series: Dict[str, dict], title="并行用例时间线"):
+        """ 绘制并行用例的合并时间线图（OPS、时延），用于观察用例间的相互影响
+
+        Args:
+            series: {用例id: {"time": 时间, "rate": OPS, "resp": 时延}}
+            title: 标题
+
+        Returns: 绘制的html对象
+        """
+        fig, axes = plt.subplots(2, 1, figsize=(12, 7), sharex=True, constrained_layout=True)
+        for cid, data in series.items():
+            axes[0].plot(data["time"], data["rate"], linewidth=0.8, label=cid)
+            axes[1].plot(data["time"], data["resp"], linewidth=0.8, label=cid)
+        for ax, ylabel in zip(axes, ("ops", "resp (ms)")):
+            ax.set_ylabel(ylabel)
+            ax.grid(linestyle='--', color="#d9d9d9")
+            ax.legend(loc="upper right", fontsize=8)
+        fig.autofmt_xdate()
+        fig_name = ReportUtil.save_fig(fig)
+        plt.close(fig)
+        return ReportUtil.create_img_element(fig_name, title)
+
+    @staticmethod
+    def create_heatmap(times: List[str], edges: List[float], matrix: List[List[float]]) -> str:
+        """ 绘制时延热力图
+
+        Args:
+            times: 各时间段开始时间
+            edges: 时延桶边界（毫秒）
+            matrix: [桶][时间段]的区间比例
+
+        Returns: 图片名称
+        """
+        fig, ax = plt.subplots(figsize=(12, 5), constrained_layout=True)
+        mesh = ax.pcolormesh(np.arange(len(times) + 1), edges, np.asarray(matrix), cmap="YlOrRd", shading="flat")
+        if edges[0] > 0:
+            ax.set_yscale("log")
+        step = max(1, len(times) // 10)
+        ax.set_xticks(np.arange(0, len(times), step) + 0.5)
+        ax.set_xticklabels(times[::step], rotation=30, fontsize=8)
+        ax.set_xlabel("Time")
+        ax.set_ylabel("resp (ms)")
+        fig.colorbar(mesh, ax=ax, label="Interval share")
+        fig_name = ReportUtil.save_fig(fig)
+        plt.close(fig)
+        return fig_name
+
     @staticmethod
     def create_device_table(custom_config, suite):
         """创建设备信息表格
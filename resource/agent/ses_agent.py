@@ -0,0 +1,205 @@
+# -*- coding: UTF-8 -*-
+"""SES主机代理
+
+由SES上传至主机并通过SSH通道启动，从标准输入逐行读取JSON请求，处理后向标准输出逐行写入JSON响应。
+标准输入关闭（SSH通道关闭）后退出。仅依赖Python3标准库。
+
+请求格式：{"id": 1, "method": "exists", "params": {...}}，或由多个请求组成的列表（批量请求）
+响应格式：{"id": 1, "result": ...} 或 {"id": 1, "error": "..."}，批量请求按顺序返回响应列表
+"""
+import json
+import os
+import signal
+import sys
+
+BLOCK_SIZE = 1024 * 1024
+
+# 追加写文件的已扫描位置：{(path, target): (inode, offset, found)}
+_contains_state = {}
+# 追加写文件的行数统计：{path: (inode, offset, count)}
+_lc_state = {}
+
+
+def ping():
+    return "pong"
+
+
+def exists(path, is_dir=False):
+    return os.path.isdir(path) if is_dir else os.path.exists(path)
+
+
+def is_pid_exists(pid):
+    try:
+        os.kill(int(pid), 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def kill_process(pid):
+    if is_pid_exists(pid):
+        try:
+            os.kill(int(pid), signal.SIGKILL)
+        except ProcessLookupError:
+            pass
+    return True
+
+
+def _read_cmdline(pid):
+    try:
+        with open("/proc/%s/cmdline" % pid, "rb") as file:
+            cmdline = file.read().replace(b"\0", b" ").decode(errors="replace").strip()
+        if not cmdline:
+            with open("/proc/%s/comm" % pid, "rb") as file:
+                cmdline = "[%s]" % file.read().decode(errors="replace").strip()
+        return cmdline
+    except OSError:
+        return None
+
+
+def get_pids(keywords):
+    """与 `ps aux | grep k1 | grep k2 | grep -v grep` 相同的筛选逻辑（按进程命令行匹配）"""
+    if isinstance(keywords, str):
+        keywords = [keywords]
+    result = []
+    for name in os.listdir("/proc"):
+        if not name.isdigit() or int(name) == os.getpid():
+            continue
+        cmdline = _read_cmdline(name)
+        if not cmdline or "grep" in cmdline:
+            continue
+        if all(k in cmdline for k in keywords):
+            result.append(int(name))
+    return sorted(result)
+
+
+def _inode(path):
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None, 0
+    return stat.st_ino, stat.st_size
+
+
+def file_contains(path, target):
+    """文件是否包含目标字符串。日志文件为追加写入，记录已扫描位置，之后只扫描新增内容"""
+    inode, size = _inode(path)
+    if inode is None:
+        return False
+    needle = target.encode()
+    key = (path, target)
+    last_inode, offset, found = _contains_state.get(key, (None, 0, False))
+    if last_inode != inode or size < offset:
+        offset, found = 0, False
+    if found:
+        return True
+
+    with open(path, "rb") as file:
+        # 回退目标长度，避免遗漏跨越两次扫描边界的内容
+        file.seek(max(0, offset - len(needle) + 1))
+        tail = b""
+        while True:
+            block = file.read(BLOCK_SIZE)
+            if not block:
+                break
+            data = tail + block
+            if needle in data:
+                found = True
+                break
+            tail = data[-len(needle) + 1:] if len(needle) > 1 else b""
+        offset = file.tell()
+    _contains_state[key] = (inode, offset, found)
+    return found
+
+
+def get_last_line(path, trim=True):
+    """文件最后一行（trim为True时忽略空白行）"""
+    with open(path, "rb") as file:
+        file.seek(0, os.SEEK_END)
+        end = file.tell()
+        data = b""
+        pos = end
+        while pos > 0:
+            step = min(BLOCK_SIZE, pos)
+            pos -= step
+            file.seek(pos)
+            data = file.read(step) + data
+            lines = data.splitlines()
+            # 第一行可能不完整，只有读到文件开头时才可使用
+            candidates = lines if pos == 0 else lines[1:]
+            for line in reversed(candidates):
+                if not trim or line.strip():
+                    return line.decode(errors="replace").strip()
+    return ""
+
+
+def get_file_lc(path):
+    """非空行数（与 `grep -cv ^$` 一致）。记录已统计位置，之后只统计新增内容"""
+    inode, size = _inode(path)
+    if inode is None:
+        raise OSError("No such file: %s" % path)
+    last_inode, offset, count = _lc_state.get(path, (None, 0, 0))
+    if last_inode != inode or size < offset:
+        offset, count = 0, 0
+
+    with open(path, "rb") as file:
+        file.seek(offset)
+        tail = b""
+        while True:
+            block = file.read(BLOCK_SIZE)
+            if not block:
+                break
+            lines = (tail + block).split(b"\n")
+            tail = lines.pop()
+            count += sum(1 for line in lines if line)
+            offset += len(block)
+    # 末尾不完整的行不计入已统计位置
+    offset -= len(tail)
+    _lc_state[path] = (inode, offset, count)
+    return count + (1 if tail else 0)
+
+
+METHODS = {
+    "ping": ping,
+    "exists": exists,
+    "is_pid_exists": is_pid_exists,
+    "kill_process": kill_process,
+    "get_pids": get_pids,
+    "file_contains": file_contains,
+    "get_last_line": get_last_line,
+    "get_file_lc": get_file_lc,
+}
+
+
+def handle(request):
+    response = {"id": request.get("id")}
+    try:
+        method = METHODS[request["method"]]
+        response["result"] = method(**request.get("params", {}))
+    except Exception as e:
+        response["error"] = "%s: %s" % (e.__class__.__name__, e)
+    return response
+
+
+def main():
+    for line in sys.stdin:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            request = json.loads(line)
+        except ValueError as e:
+            response = {"id": None, "error": "Invalid request: %s" % e}
+        else:
+            if isinstance(request, list):
+                response = [handle(r) for r in request]
+            else:
+                response = handle(request)
+        sys.stdout.write(json.dumps(response) + "\n")
+        sys.stdout.flush()
+
+
+if __name__ == "__main__":
+    main()
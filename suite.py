@@ -1,4 +1,6 @@
 # -*- coding: UTF-8 -*-
+from concurrent.futures import Future
+import copy
 import importlib
 from importlib import util
 import inspect
@@ -9,20 +11,23 @@ import threading
 import time
 import traceback
 from types import SimpleNamespace
-from typing import List, Dict
+from typing import List, Dict, Optional
 import xml.etree.ElementTree as ET
 
 from storage_evaluation_system_zzj import util, constants
+from storage_evaluation_system_zzj.action.host import HostAction
+from storage_evaluation_system_zzj.action.storage import StorageAction
 from storage_evaluation_system_zzj.basecase import BaseCase
-from storage_evaluation_system_zzj.client.client import Client
+from storage_evaluation_system_zzj.client.client import Client, ClientGroup
 from storage_evaluation_system_zzj.client.ssh_client import SSHClientBuilder, SSHClient
 from storage_evaluation_system_zzj.constants import *
 from storage_evaluation_system_zzj.exception import SESError, ConfigError, EnvironmentValidationError, \
     SceneParameterNotFound, NumberTypeParamValueError
 from storage_evaluation_system_zzj.logger import logger, exception_wrapper
 from storage_evaluation_system_zzj.parameter import DefaultParameter
-from storage_evaluation_system_zzj.report import Report
-from storage_evaluation_system_zzj.util import convert_capacity
+from storage_evaluation_system_zzj.journal import RunJournal
+from storage_evaluation_system_zzj.report import Report, ReportUtil
+from storage_evaluation_system_zzj.util import convert_capacity, IoLoad
 
 global_output_dir = ""
 
@@ -34,13 +39,14 @@ class Suite:
                  scenario: str,
                  output_dir: str,
                  memory: str = None,
-                 ignore_toolcheck_error=False):
+                 ignore_toolcheck_error=False,
+                 resume=False):
         self.logger = logger
         self.custom_config: ET = custom_config
         self.name = scenario   
         self.status = SuiteStatus.PREPARING
         self.storage_memory: str = memory
-        self.client_group: List[Client] = []
+        self.client_group: ClientGroup = ClientGroup()
         self.master_host: Client
         self.cases: List[BaseCase] = []
         self.cases_by_major_id: Dict = {}
@@ -52,6 +58,12 @@ class Suite:
         self.run_energy_csmpt = False
         # 执行过程中保存的用例性能数据等
         self.cache = {}
+        self._cache_lock = threading.RLock()
+        # 断点续跑
+        self.resume = resume
+        self.journal: RunJournal = None
+        # 执行过程中更新的用户参数（如自动调优结果）
+        self.updated_parameters: Dict[str, str] = {}
 
         global global_output_dir
         global_output_dir = self.output_dir = output_dir
@@ -65,7 +77,8 @@ class Suite:
         self.valid_skips = []
         self.skip_report_message = None
         self.all_skipped = False
-        self._running_case_runner = None
+        self._running_case_runners: List[CaseRunner] = []
+        self._runners_lock = threading.Lock()
 
     def validate(self):
         """配置校验"""
@@ -223,6 +236,7 @@ class Suite:
                     type_case = cases[0]
                     self.cases_by_major_id[type_case.major_id] = cases
                 self.cases.extend(cases)
+                return cases
             except Exception as e:
                 self.logger.error(f"Loading case [{cid}] error: {e}")
                 self.logger.debug(traceback.format_exc())
@@ -257,10 +271,12 @@ class Suite:
                 # 根据用例的 tag 来判断是否并行执行用例。
                 # 这个tag通过前面的util.nsstrip(case_pattern_ele) 来解析出来的。
                 if case_set.tag == "p":
-                    # 并行用例
-                    # <p> 标签内的用例可能被标记为并行执行。
-                    for case in case_set:
-                        _extend_cases(case, is_required)
+                    # 并行用例：<p> 标签内的每个用例（含其全部子用例）为一个lane，各lane同时执行
+                    group = len(suite_major_cids)
+                    for lane, case in enumerate(case_set):
+                        for c in _extend_cases(case, is_required):
+                            c.parallel_group = group
+                            c.parallel_lane = lane
                 elif case_set.tag == "case":
                     _extend_cases(case_set, is_required)
 
@@ -442,39 +458,251 @@ class Suite:
         self.load_client()
         self.update_custom_parameters()  # 先加载Client后校验自定义参数
         self.load_cases()
+        self.journal = self.load_journal()
         self.monitor()
-        self.report = Report(self)
+        self.report = Report(self, resume=bool(self.journal.completed))
         # 根据场景判断是否需要输入基线能耗
-        if self.name in ["AI_EXP"]:
+        if self.name in ["AI_EXP"] and not self.has_cache_data(CacheDataKey.AVG_OPS_BENCHMARK):
             self.request_base_iorate()
         
-        for index, case in enumerate(self.cases):
-            runner = CaseRunner(self, case)
-            self._running_case_runner = runner
-            runner.start()
-            runner.join()
-
-            # 最后一个用例
-            if index >= len(self.cases) - 1:
-                continue
-
-            if case.result != CaseResult.PASS:
+        index = 0
+        while index < len(self.cases):
+            case = self.cases[index]
+            if case.parallel_group is None:
+                group = [case]
+            else:
+                group = [c for c in self.cases[index:] if c.parallel_group == case.parallel_group]
+            # 续跑：跳过已通过的用例
+            pending = [c for c in group if not self.journal.is_completed(c.cid)]
+            if not pending:
+                index += len(group)
                 continue
 
-            # 后面的用例全部被跳过
-            pending_cids = [c.cid for c in self.cases[index + 1:]]
-            if set(pending_cids).issubset(set(self.valid_skips)):
+            if case.parallel_group is None:
+                runner = CaseRunner(self, case)
+                self._running_case_runners = [runner]
+                runner.start()
+                stager = self._start_dataset_stager(runner, index)
+                runner.join()
+            else:
+                stager = None
+                self.run_parallel_group(pending)
+            index += len(group)
+
+            # 最后一个用例、用例未通过、后面的用例全部被跳过时不需要用例间等待
+            pending_cids = [c.cid for c in self.cases[index:]]
+            if (index >= len(self.cases) or any(c.result != CaseResult.PASS for c in group) or
+                    set(pending_cids).issubset(set(self.valid_skips))):
+                if stager:
+                    stager.join()
                 continue
 
-            mins = constants.CASE_RUN_INTERVAL // 60
-            self.logger.info(f"Start the next case after {mins} mins")
-            time.sleep(constants.CASE_RUN_INTERVAL)
+            # 后台数据预制与用例间等待同时进行
+            self.cooldown(self.cases[index], stager)
 
         self.status = SuiteStatus.COMPLETED
         self.logger.info(f"Scene [{self.name}] Test completed")
         self.logger.info(f"Report: {self.report.path}")
+        self.log_channel_pool_stats()
         self.report.finish()
 
+    def cooldown(self, next_case: BaseCase, stager: "DatasetStager" = None):
+        """ 用例间等待，等待时长记录在下一个用例的执行记录中
+
+        下一个用例的后台数据预制（stager）与等待同时进行，预制完成后才开始静默判断（预制本身产生IO）：
+        客户端iostat（及存储接口）的带宽、队列深度持续constants.COOLDOWN_QUIET_TIME低于阈值后结束。
+        总等待时长不少于COOLDOWN_MIN，预制完成后的等待不超过COOLDOWN_MAX。
+        未启用或无法获取任何IO负载时，总等待时长为constants.CASE_RUN_INTERVAL（且不早于预制完成）
+        """
+        start = time.time()
+        if stager:
+            self.logger.info(f"Waiting for the background dataset preparation of case [{next_case.cid}]")
+            stager.join()
+        staging = int(time.time() - start)
+
+        if constants.COOLDOWN_QUIESCENCE_ENABLED:
+            reason = self._wait_for_quiescence(next_case, start)
+        else:
+            mins = constants.CASE_RUN_INTERVAL // 60
+            self.logger.info(f"Start the next case after {mins} mins")
+            time.sleep(max(0, constants.CASE_RUN_INTERVAL - (time.time() - start)))
+            reason = "固定等待"
+        elapsed = int(time.time() - start)
+        self.logger.info(f"Cooldown finished after {elapsed}s")
+        message = f"用例间等待{elapsed}秒（{reason}）"
+        if stager:
+            message += f"，其中等待后台数据预制{staging}秒"
+        next_case.save_step_result(message, RecordResult.PASS, fail_case=False)
+
+    def _wait_for_quiescence(self, next_case: BaseCase, start: float) -> str:
+        """ 等待IO负载静默
+
+        Args:
+            next_case: 下一个用例
+            start: 用例间等待的开始时间，用于判断最短等待时长
+
+        Returns: 结束原因
+        """
+        self.logger.info(f"Waiting for storage quiescence before the next case "
+                         f"(min={constants.COOLDOWN_MIN}s, max={constants.COOLDOWN_MAX}s)")
+        quiet_start = time.time()
+        quiet_since = None
+        storage = StorageAction(next_case)
+        hosts = ClientGroup(self.get_executor_clients(ClientTarget.ALL_HOST))
+        while time.time() - quiet_start < constants.COOLDOWN_MAX:
+            loads = self._sample_io_loads(hosts, storage)
+            if loads is None:
+                self.logger.warning("IO load not available, using fixed case interval")
+                time.sleep(max(0, constants.CASE_RUN_INTERVAL - (time.time() - start)))
+                return "无法获取IO负载，固定等待"
+            busy = {name: load for name, load in loads.items()
+                    if load.mbps > constants.COOLDOWN_MAX_MBPS or load.queue > constants.COOLDOWN_MAX_QUEUE}
+            now = time.time()
+            if busy:
+                self.logger.debug(f"IO not quiet: {busy}")
+                quiet_since = None
+            elif quiet_since is None:
+                quiet_since = now
+            if (quiet_since is not None and now - quiet_since >= constants.COOLDOWN_QUIET_TIME
+                    and now - start >= constants.COOLDOWN_MIN):
+                return "IO负载已静默"
+        return "达到最长等待时间"
+
+    def _sample_io_loads(self, hosts: ClientGroup, storage: StorageAction) -> Optional[Dict[str, IoLoad]]:
+        """采样各客户端及存储的IO负载，采样时长为constants.COOLDOWN_POLL_INTERVAL，全部无法获取时返回None"""
+        interval = constants.COOLDOWN_POLL_INTERVAL
+
+        def sample(client):
+            host = HostAction(None, client=client, custom_actions_path=self.custom_actions_path).action_impl
+            return host.sample_io_load(interval)
+
+        loads = {str(r.client): r.value for r in hosts.run_all(sample) if r.ok}
+        try:
+            loads["storage"] = storage.get_io_load()
+        except NotImplementedError:
+            pass
+        except Exception as e:
+            self.logger.debug(f"Querying storage IO load failed: {e!r}")
+        if not loads:
+            return None
+        if len(loads) == 1 and "storage" in loads:
+            # 仅有存储接口数据时，按采样间隔轮询
+            time.sleep(interval)
+        return loads
+
+    def _start_dataset_stager(self, runner: "CaseRunner", index: int) -> Optional["DatasetStager"]:
+        """ 当前用例读写结束后，在后台预先准备下一个用例的数据集
+
+        依赖规则：必须等待当前用例post_condition完成（IO已停止）且用例通过，下一个用例不会被跳过
+        """
+        if not constants.DATASET_PRESTAGE or index >= len(self.cases) - 1:
+            return None
+        next_case = self.cases[index + 1]
+        # 并行用例组的数据集在各lane中准备
+        if next_case.parallel_group is not None:
+            return None
+        while not runner.io_done.wait(timeout=1):
+            if not runner.is_alive():
+                return None
+        if runner.case_result != CaseResult.PASS or self.will_skip(next_case):
+            return None
+        stager = DatasetStager(next_case)
+        stager.start()
+        return stager
+
+    def run_parallel_group(self, cases: List[BaseCase]):
+        """ 并行执行用例组
+
+        每个lane在独立线程中顺序执行其用例；lane之间使用独立的输出目录、数据集目录与vdbench端口。
+        所有lane结束后，在组内各用例报告中插入合并时间线图
+        """
+        lanes: Dict[int, List[BaseCase]] = {}
+        for case in cases:
+            lanes.setdefault(case.parallel_lane, []).append(case)
+        self.logger.info(f"Running cases in parallel: {', '.join(c.cid for c in cases)}")
+
+        self._running_case_runners = []
+        threads = [threading.Thread(target=self._run_lane, args=(lane_cases,), name=f"Lane{lane}")
+                   for lane, lane_cases in lanes.items()]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self._report_parallel_timeline(cases)
+
+    def _run_lane(self, cases: List[BaseCase]):
+        for case in cases:
+            runner = CaseRunner(self, case)
+            with self._runners_lock:
+                self._running_case_runners.append(runner)
+            runner.start()
+            runner.join()
+
+    def _report_parallel_timeline(self, cases: List[BaseCase]):
+        """并行用例的OPS、时延合并时间线图"""
+        series = {}
+        for case in cases:
+            vdbench = getattr(case, "vdbench", None)
+            if case.result == CaseResult.SKIPPED or vdbench is None:
+                continue
+            try:
+                data = vdbench.timeline()
+            except Exception:
+                self.logger.debug(traceback.format_exc())
+                continue
+            if data:
+                series[case.cid] = data
+        if len(series) < 2:
+            return
+
+        try:
+            html = self.report.render(ReportUtil.build_parallel_timeline_html_object, series).result()
+        except Exception:
+            self.logger.error("Report: drawing parallel timeline error")
+            self.logger.debug(traceback.format_exc())
+            return
+        if html:
+            for cid in series:
+                self.report.insert_casestep_content(cid, ReportUtil.str2element(html))
+
+    def will_skip(self, case: BaseCase) -> bool:
+        """用例执行时是否会被跳过"""
+        return (self.all_skipped or any(c in case.cid for c in self.valid_skips) or
+                self.journal.is_completed(case.cid))
+
+    def load_journal(self) -> RunJournal:
+        """ 续跑时读取执行记录：恢复缓存数据与更新的参数，已通过的用例标记为完成；否则创建新的执行记录"""
+        if self.resume:
+            journal = RunJournal.load(self.output_dir, self.name)
+            if journal is None:
+                self.logger.warning("No valid run journal found, running all cases")
+            else:
+                with self._cache_lock:
+                    self.cache.update(journal.cache)
+                for name, value in journal.parameters.items():
+                    self.update_custom_parameter(name, value)
+                for case in self.cases:
+                    if journal.is_completed(case.cid):
+                        case.result = CaseResult.PASS
+                        case._status = CaseStatus.COMPLETED
+                completed = journal.completed
+                self.logger.info(f"Resuming scene [{self.name}], skipping {len(completed)} passed case(s): "
+                                 f"{','.join(completed)}")
+                return journal
+        return RunJournal(self.output_dir, self.name)
+
+    def checkpoint(self, case: BaseCase, start_time: float):
+        """用例结束后写入执行记录"""
+        with self._cache_lock:
+            cache = copy.deepcopy(self.cache)
+        self.journal.record_case(case, start_time, cache, self.updated_parameters)
+
+    def log_channel_pool_stats(self):
+        """输出各主机SSH会话通道池统计信息"""
+        for client in self.client_group:
+            if isinstance(client, SSHClient):
+                self.logger.debug(f"{client} ssh channel pool stats: {client.channel_pool_stats}")
+
     def request_base_iorate(self):
         """ 请求输入基线iorate """
         msg = "Please enter the baseline performance OPS of case PERF_002"
@@ -533,7 +761,38 @@ class Suite:
         self.logger.info(f"Fill in monitor-file to stop the test at any time ({self._monitor_file})")
 
     def stop_cases(self):
-        self._running_case_runner.stop()
+        with self._runners_lock:
+            runners = list(self._running_case_runners)
+        for runner in runners:
+            runner.stop()
+
+    def update_custom_parameter(self, name: str, value):
+        """ 更新用户自定义参数（如自动调优结果）
+
+        写入用户配置（报告中保存的user_config.xml），并更新尚未执行的用例中引用此参数（$$name）的参数值
+        """
+        value = str(value)
+        self.custom_suite_parameters[name] = value
+        self.updated_parameters[name] = value
+        elements = self.custom_config.findall(f".//parameter[@name='{name}']")
+        if not elements:
+            parent = self.custom_config.find("parameters")
+            if parent is None:
+                parent = ET.SubElement(self.custom_config.getroot(), "parameters")
+            elements = [ET.SubElement(parent, "parameter", name=name)]
+        for element in elements:
+            element.text = value
+
+        ref = f"$${name}"
+        for case in self.cases:
+            if case.status != CaseStatus.WAITING:
+                continue
+            case.parameters.custom_case_parameters[name] = value
+            for param in case.element.iter("parameter"):
+                pname = param.get("name")
+                if (param.text or "").strip() == ref and pname in case.parameters.static_parameters:
+                    case.parameters.static_parameters[pname] = value
+        self.logger.info(f"Custom parameter updated: {name}={value}")
 
     def get_required_parameter(self, param_name):
         """获取必要的通用参数/scene参数"""
@@ -566,43 +825,12 @@ class Suite:
           校验 TOOL_BASE_DIR_<OS>/`default_dir_name`目录下是否存在 `executable`
         """
         failure = []
-        for client in self.get_executor_clients(ClientTarget.ALL_HOST):
-            client: SSHClient
-            client_failure = []
-            if not client.command_exists("iostat"):
-                client_failure.append("sysstat")
-            else:
-                client.pkill("iostat")
-
-            for tool_name, info in constants.TOOL_VALIDATE_DICT.items():
-                tool_success = False
-                tool_path = client.get_env(info.env_name)
-                if tool_path and client.exists(client.join_path(tool_path, info.executable)):
-                    tool_success = True
-                else:
-                    if "windows" in client.__class__.__name__.lower():
-                        tool_base_dir = constants.TOOL_BASE_DIR_WIN
-                    else:
-                        tool_base_dir = constants.TOOL_BASE_DIR_UNIX
-
-                    tool_path = client.join_path(tool_base_dir, info.default_dir_name)
-                    filepath = client.join_path(tool_path, info.executable)
-                    if client.exists(filepath):
-                        tool_success = True
-
-                if not tool_success:
-                    client_failure.append(f"{tool_name}({tool_path})")
-
-                # 以master客户端的工具目录为准
-                if client.role == ClientTarget.MASTER_HOST:
-                    self.tools_dir[tool_name] = tool_path
-
-                # 根据进程名清理所有工具
-                client.kill_process(keywords=info.executable)
-
+        hosts = ClientGroup(self.get_executor_clients(ClientTarget.ALL_HOST))
+        for result in hosts.run_all(self._prepare_client_tools, raise_error=True):
+            client_failure = result.value
             if client_failure:
                 tool_str = ",".join(client_failure)
-                failure.append(f"role: {client.role}, requires tool: {tool_str}")
+                failure.append(f"role: {result.client.role}, requires tool: {tool_str}")
 
         if failure:
             fstr = ",".join(failure)
@@ -616,6 +844,41 @@ class Suite:
         else:
             self.logger.info("Tools validation success")
 
+    def _prepare_client_tools(self, client: SSHClient) -> List[str]:
+        """校验单个客户端上的工具并清理工具进程，返回缺失的工具列表"""
+        client_failure = []
+        if not client.command_exists("iostat"):
+            client_failure.append("sysstat")
+        else:
+            client.pkill("iostat")
+
+        for tool_name, info in constants.TOOL_VALIDATE_DICT.items():
+            tool_success = False
+            tool_path = client.get_env(info.env_name)
+            if tool_path and client.exists(client.join_path(tool_path, info.executable)):
+                tool_success = True
+            else:
+                if "windows" in client.__class__.__name__.lower():
+                    tool_base_dir = constants.TOOL_BASE_DIR_WIN
+                else:
+                    tool_base_dir = constants.TOOL_BASE_DIR_UNIX
+
+                tool_path = client.join_path(tool_base_dir, info.default_dir_name)
+                filepath = client.join_path(tool_path, info.executable)
+                if client.exists(filepath):
+                    tool_success = True
+
+            if not tool_success:
+                client_failure.append(f"{tool_name}({tool_path})")
+
+            # 以master客户端的工具目录为准
+            if client.role == ClientTarget.MASTER_HOST:
+                self.tools_dir[tool_name] = tool_path
+
+            # 根据进程名清理所有工具
+            client.kill_process(keywords=info.executable)
+        return client_failure
+
     def validate_storage_specification(self): 
         """校验存储规格"""
         spec = SimpleNamespace(total_disk_num=None, single_disk_capacity=None, total_node_num=None)
@@ -705,10 +968,8 @@ class Suite:
         if value is None:
             self.logger.debug(f"cache value must not be None: {key}")
 
-        if case_id not in self.cache:
-            self.cache[case_id] = {}
-
-        self.cache[case_id][key.value] = value
+        with self._cache_lock:
+            self.cache.setdefault(case_id, {})[key.value] = value
         self.logger.debug(f"Cached runtime data: case-id[{case_id}] {key}={value}")
 
     def cache_suite_runtime_data(self, key: CacheDataKey, value):
@@ -716,12 +977,17 @@ class Suite:
         if value is None:
             self.logger.debug(f"cache value must not be None: {key}")
 
-        if "suite" not in self.cache:
-            self.cache["suite"] = {}
-
-        self.cache["suite"][key.value] = value
+        with self._cache_lock:
+            self.cache.setdefault("suite", {})[key.value] = value
         self.logger.debug(f"Cached suite runtime data: {key}={value}")
 
+    def has_cache_data(self, key: CacheDataKey, case_id=None) -> bool:
+        try:
+            self.get_cache_data(key, case_id=case_id)
+        except KeyError:
+            return False
+        return True
+
     def get_cache_data(self, key: CacheDataKey, case_id=None):
         """获取保存的用例数据
 
@@ -736,22 +1002,23 @@ class Suite:
         if not isinstance(key, CacheDataKey):
             raise TypeError("get_cache_data: key must be type of CacheDataKey")
 
-        if case_id:
-            try:
-                ckv = self.cache[case_id]
-            except KeyError:
-                raise KeyError(f"case_id={case_id} not found in cache data")
+        with self._cache_lock:
+            if case_id:
+                try:
+                    ckv = self.cache[case_id]
+                except KeyError:
+                    raise KeyError(f"case_id={case_id} not found in cache data")
 
-            try:
-                return ckv[key.value]
-            except KeyError:
-                raise KeyError(f"key={key} not found in cache data of case {case_id}")
+                try:
+                    return ckv[key.value]
+                except KeyError:
+                    raise KeyError(f"key={key} not found in cache data of case {case_id}")
 
-        else:
-            for _, kv in self.cache.items():
-                if key.value in kv:  # 这里可能是suite/case
-                    return kv[key.value]
-            raise KeyError(f"key={key} not found in cache data")
+            else:
+                for _, kv in self.cache.items():
+                    if key.value in kv:  # 这里可能是suite/case
+                        return kv[key.value]
+                raise KeyError(f"key={key} not found in cache data")
 
     def skip_all(self, log_message, report_message=None):
         """跳过后续所有用例
@@ -819,6 +1086,8 @@ class CaseRunner(threading.Thread):
         self.suite = suite
         self.case = case
         self.logger = case.logger
+        # 用例读写已结束（post_condition完成）且结果已确定
+        self.io_done = threading.Event()
 
     @property
     def name(self):
@@ -873,6 +1142,7 @@ class CaseRunner(threading.Thread):
             self.case.fail(message="执行异常，请查看日志", exception=err)
         elif self.case.result not in [CaseResult.FAILED, CaseResult.SKIPPED]:
             self.case.result = CaseResult.PASS
+        self.io_done.set()
 
         self.handle_report(start_time)
         self._complete()
@@ -900,6 +1170,16 @@ class CaseRunner(threading.Thread):
                                              content=content
                                              )
         self.suite.report.insert_summary_table(self.case_id, indicators=indicators)
+        if isinstance(content, Future):
+            # 异步渲染的报告内容替换占位元素并写入文件后再写执行记录，
+            # 否则渲染完成前中断时，续跑会跳过该用例而其报告内容已丢失
+            def on_rendered(f):
+                self.suite.report.flush()
+                self.suite.checkpoint(self.case, start_time)
+
+            content.add_done_callback(on_rendered)
+        else:
+            self.suite.checkpoint(self.case, start_time)
 
     def skip(self, message=None):
         """标记用例为跳过"""
@@ -926,3 +1206,30 @@ class CaseRunner(threading.Thread):
                 if c in self.case_id:
                     self.skip(message=f"此用例在配置中被指定跳过")
                     break
+
+
+class DatasetStager(threading.Thread):
+    """后台预先准备用例数据集，失败时不影响用例执行（用例执行时重新准备）"""
+
+    def __init__(self, case: BaseCase):
+        super().__init__(daemon=True)
+        self.case = case
+        self.staged = False
+
+    @property
+    def name(self):
+        """for logger name"""
+        return self.case.cid
+
+    def run(self):
+        logger.info(f"Preparing dataset for case [{self.case.cid}] in background")
+        start = time.time()
+        try:
+            self.staged = self.case.stage_dataset()
+        except Exception:
+            logger.debug(traceback.format_exc())
+            logger.warning(f"Preparing dataset for case [{self.case.cid}] in background failed, "
+                           f"it will be prepared when the case starts")
+            return
+        if self.staged:
+            logger.info(f"Dataset for case [{self.case.cid}] prepared ({int(time.time() - start)}s)")
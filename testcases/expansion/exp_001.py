@@ -70,6 +70,7 @@ class EXP001(DFXBase):
     @add_record("下发并等待IO业务启动")
     def start_io(self):
         elapsed = self.get_vdbench_elapsed()
+        self.update_hd_number()
         self.vdbench = VdbenchIO(self).action_impl
         self.vdbench.run(
             vdbench_dir=self.get_parameter("vdbench_dir"),
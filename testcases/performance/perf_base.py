@@ -2,7 +2,7 @@
 from storage_evaluation_system_zzj import constants
 from storage_evaluation_system_zzj.action.vdbench import VdbenchIO
 from storage_evaluation_system_zzj.basecase import BaseCase
-from storage_evaluation_system_zzj.indicator import Bandwidth, Ops, Resp
+from storage_evaluation_system_zzj.indicator import Bandwidth, Ops, Resp, RespP50, RespP90, RespP99, RespP999
 from storage_evaluation_system_zzj.report import ReportUtil, TitledContent
 
 
@@ -16,27 +16,35 @@ class PERFBase(BaseCase):
         self.bw = None
         self.ops = None
         self.resp = None
+        self.latency = None
         self.csv_file_name = "flat.csv"
         self.avg_csv_file_name = "avg_flat.csv"
         self.anchor_paths = self.get_anchor_paths()
         self.update_hd_number()
 
-    def procedure(self):
-        self.vdbench.run(
+    def get_vdbench_parameters(self) -> dict:
+        return dict(
             vdbench_dir=self.get_parameter("vdbench_dir"),
             config_template_file=self.get_parameter("config_template_file"),
             anchor_paths=self.anchor_paths,
             threads_config=self.get_parameter("threads_config"),
             fsd_group_number=self.get_parameter("fsd_group_number", int),
             fsd_width=self.get_parameter("fsd_width", int),
-            elapsed=constants.VDBENCH_ELAPSED,
             multiple=self.get_parameter("multiple", int),
             dir_depth=self.get_parameter("dir_depth", ptype=int, default=1),
         )
+
+    def procedure(self):
+        self.vdbench.run(elapsed=constants.VDBENCH_ELAPSED, **self.get_vdbench_parameters())
         self.bw = self.vdbench.get_avg_bw()
         self.ops = self.vdbench.get_avg_ops()
         self.resp = self.vdbench.get_avg_resp()
 
+    def stage_dataset(self):
+        self.update_hd_number()
+        VdbenchIO(self).action_impl.stage_dataset(**self.get_vdbench_parameters())
+        return True
+
     def post_condition(self):
         # 清理vdbench
         if hasattr(self, "vdbench") and self.vdbench is not None:
@@ -45,14 +53,24 @@ class PERFBase(BaseCase):
     def make_report(self):
         self.reporter = self.vdbench.reporter
         csv_file, avg_csv_file = self.reporter.create_csv_file()
-        # 生成性能图
-        soup = ReportUtil.build_perf_test_html_object(
+        self.latency = self.reporter.latency_percentiles()
+        # 生成性能图（在报告渲染进程中执行）
+        return self.suite.report.render(
+            ReportUtil.build_perf_test_html_object,
             csv_file,
             avg_csv_file,
             self.reporter.create_common_chart,
             self.reporter.create_common_avg_table,
+            steady_records=self.reporter.steady_state.to_records() if self.reporter.steady_state else None,
+            latency_records=self.reporter.latency_records(self.latency),
+            latency_heatmap=self.reporter.latency_heatmap(),
         )
-        return soup
 
     def register_indicator(self):
-        return Bandwidth(self.bw), Ops(self.ops), Resp(self.resp)
+        return (Bandwidth(self.bw), Ops(self.ops), Resp(self.resp)) + self.latency_indicators()
+
+    def latency_indicators(self) -> tuple:
+        """全部请求的时延分位数指标，未解析到时延分布时为空"""
+        total = (self.latency or {}).get("total", {})
+        return tuple(cls(total[p]) for cls, p in ((RespP50, 50), (RespP90, 90), (RespP99, 99), (RespP999, 99.9))
+                     if total.get(p) is not None)
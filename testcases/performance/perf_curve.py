@@ -0,0 +1,86 @@
+# -*- coding: UTF-8 -*-
+import os
+
+from storage_evaluation_system_zzj import constants, util
+from storage_evaluation_system_zzj.action import vdbench_log
+from storage_evaluation_system_zzj.action.vdbench import VdbenchIO
+from storage_evaluation_system_zzj.constants import CacheDataKey
+from storage_evaluation_system_zzj.exception import CaseFailedError
+from storage_evaluation_system_zzj.indicator import KneeOps, KneeResp
+from storage_evaluation_system_zzj.report import ReportUtil
+from storage_evaluation_system_zzj.testcases.performance.perf_base import PERFBase
+
+
+class PERF_CURVE(PERFBase):
+    """ 时延-吞吐曲线
+
+    以最大OPS（优先使用性能用例的基线OPS，不存在时先执行一次fwdrate=max的读写）为基准，
+    按constants.CURVE_LEVELS逐级限速，在一次vdbench执行中完成所有级别（fwdrate列表），
+    每级持续constants.CURVE_STEP_ELAPSED秒。由各级平均OPS与时延得到曲线及拐点
+    """
+
+    def pre_condition(self):
+        super().pre_condition()
+        self.max_ops = None
+        self.points = []
+        self.knee_index = None
+
+    def procedure(self):
+        self.max_ops = self.get_max_ops()
+        rates = [max(1, int(self.max_ops * level / 100)) for level in constants.CURVE_LEVELS]
+        self.logger.info(f"Running fwdrate steps: {rates}")
+
+        self.step_output_dir = os.path.join(self.output_dir, "curve")
+        self.vdbench = VdbenchIO(self).action_impl
+        # 曲线各级限速不同，不能在性能稳定后提前结束
+        self.vdbench.run(elapsed=constants.CURVE_STEP_ELAPSED,
+                         fwdrate=f"({','.join(str(r) for r in rates)})",
+                         wait=False,
+                         **self.get_vdbench_parameters())
+        timeout = constants.VDBENCH_EXEC_TIMEOUT + len(rates) * constants.CURVE_STEP_ELAPSED
+        if not self.vdbench.wait_for_complete(timeout=timeout):
+            raise CaseFailedError("Vdbench fwdrate steps did not complete successfully")
+
+        # 每级fwdrate对应一行avg数据，位于日志末尾
+        avg_rows = self.vdbench.log_store().avg_rows
+        if len(avg_rows) < len(rates):
+            self.fail(f"vdbench平均值数量（{len(avg_rows)}）少于限速级别数量（{len(rates)}）", raise_exception=True)
+        for rate, (_, _, values) in zip(rates, avg_rows[-len(rates):]):
+            self.points.append(dict(fwdrate=rate,
+                                    ops=round(values[vdbench_log.COL_RATE - 2], 3),
+                                    bw=round(values[vdbench_log.COL_MBPS - 2], 3),
+                                    resp=round(values[vdbench_log.COL_RESP - 2], 3)))
+
+        self.knee_index = util.find_knee([p["ops"] for p in self.points], [p["resp"] for p in self.points])
+        knee = self.points[self.knee_index]
+        self.logger.info(f"Knee point: fwdrate={knee['fwdrate']}, ops={knee['ops']}, resp={knee['resp']}ms")
+        self.ops, self.bw, self.resp = knee["ops"], knee["bw"], knee["resp"]
+
+    def get_max_ops(self) -> float:
+        """最大OPS：性能用例基线OPS，不存在时执行一次不限速读写"""
+        try:
+            return self.get_cache_data(CacheDataKey.AVG_OPS_BENCHMARK)
+        except KeyError:
+            self.logger.info("OPS benchmark not found, running with fwdrate=max")
+        self.step_output_dir = os.path.join(self.output_dir, "max")
+        self.vdbench = VdbenchIO(self).action_impl
+        self.vdbench.run(elapsed=constants.VDBENCH_ELAPSED, **self.get_vdbench_parameters())
+        ops = self.vdbench.get_avg_ops()
+        if not ops:
+            self.fail("未获取到最大OPS", raise_exception=True)
+        return ops
+
+    def make_report(self):
+        if not self.points:
+            return None
+        records = [{"限速(OPS)": p["fwdrate"],
+                    "占最大OPS比例": f"{level}%",
+                    "OPS": p["ops"],
+                    "带宽(MB/s)": p["bw"],
+                    "时延(ms)": p["resp"],
+                    "拐点": "✔" if i == self.knee_index else ""}
+                   for i, (p, level) in enumerate(zip(self.points, constants.CURVE_LEVELS))]
+        return self.suite.report.render(ReportUtil.build_curve_html_object, records, self.knee_index)
+
+    def register_indicator(self):
+        return KneeOps(self.ops), KneeResp(self.resp)
@@ -28,5 +28,6 @@ class PHOTO_PERF(PERFBase):
             Ops(self.ops),
             SingleBandwidth(self.bw, total_node_num),
             Bandwidth(self.bw),
-            Resp(self.resp)
+            Resp(self.resp),
+            *self.latency_indicators()
         )
@@ -0,0 +1,93 @@
+# -*- coding: UTF-8 -*-
+import os
+
+from storage_evaluation_system_zzj import constants
+from storage_evaluation_system_zzj.action.vdbench import VdbenchIO
+from storage_evaluation_system_zzj.constants import CacheDataKey
+from storage_evaluation_system_zzj.indicator import Resp, SloOps
+from storage_evaluation_system_zzj.report import ReportUtil, TitledContent
+from storage_evaluation_system_zzj.testcases.performance.perf_base import PERFBase
+
+
+class SLO_SEARCH(PERFBase):
+    """ 时延SLO下的最大OPS搜索
+
+    以最大OPS（优先使用性能用例的基线OPS，不存在时以fwdrate=max探测）为上界，二分查找fwdrate。
+    每次探测在性能稳定（稳定区间达到constants.SLO_PROBE_STEADY_TIME）后结束，
+    平均时延不超过constants.MAX_IO_RESP、尾部时延（vdbench时延分布中全部请求的分位数）不超过constants.MAX_IO_TAIL_RESP
+    且实际OPS达到限速时视为满足SLO；未解析到时延分布时不判断尾部时延。
+    搜索区间宽度低于最大OPS的constants.SLO_TOLERANCE或达到最大探测次数时结束，取满足SLO的最高OPS。
+    数据集只在首次探测时预埋
+    """
+
+    def pre_condition(self):
+        super().pre_condition()
+        self.probes = []
+        self.best = None
+
+    def procedure(self):
+        try:
+            max_ops = self.get_cache_data(CacheDataKey.AVG_OPS_BENCHMARK)
+            rate = int(max_ops)
+        except KeyError:
+            self.logger.info("OPS benchmark not found, probing with fwdrate=max")
+            max_ops, rate = None, "max"
+
+        low, high = 0, None
+        for _ in range(constants.SLO_MAX_PROBES):
+            probe = self.probe(rate)
+            self.probes.append(probe)
+            if max_ops is None:
+                max_ops = probe["ops"]
+            if probe["passed"]:
+                self.best = probe
+                low = probe["ops"] if rate == "max" else rate
+            else:
+                high = probe["ops"] if rate == "max" else rate
+            if high is None or high - low <= max_ops * constants.SLO_TOLERANCE:
+                break
+            rate = max(1, int((low + high) / 2))
+
+        if not self.best:
+            self.fail(message=f"所有限速下时延均不满足SLO（平均时延≤{constants.MAX_IO_RESP}ms，"
+                              f"P{constants.SLO_TAIL_PERCENTILE}时延≤{constants.MAX_IO_TAIL_RESP}ms）",
+                      raise_exception=True)
+        self.logger.info(f"Max OPS under SLO: {self.best['ops']} (fwdrate={self.best['fwdrate']})")
+        self.ops, self.bw, self.resp = self.best["ops"], self.best["bw"], self.best["resp"]
+
+    def probe(self, fwdrate) -> dict:
+        """以指定fwdrate读写，性能稳定后结束，返回平均性能及是否满足SLO"""
+        self.logger.info(f"Probing fwdrate={fwdrate}")
+        self.step_output_dir = os.path.join(self.output_dir, f"fwdrate_{fwdrate}")
+        self.vdbench = VdbenchIO(self).action_impl
+        probe = self.vdbench.probe(constants.SLO_PROBE_ELAPSED, constants.SLO_PROBE_STEADY_TIME, fwdrate=fwdrate,
+                                   **self.get_vdbench_parameters())
+        probe["fwdrate"] = fwdrate
+        if probe["tail_resp"] is None:
+            self.logger.warning(f"Latency histogram not found, P{constants.SLO_TAIL_PERCENTILE} response time "
+                                f"is not checked for fwdrate={fwdrate}")
+        probe["passed"] = (probe["resp"] <= constants.MAX_IO_RESP and
+                           (probe["tail_resp"] is None or probe["tail_resp"] <= constants.MAX_IO_TAIL_RESP) and
+                           (fwdrate == "max" or probe["ops"] >= fwdrate * (1 - constants.SLO_TOLERANCE)))
+        self.logger.info(f"fwdrate={fwdrate}: ops={probe['ops']}, resp={probe['resp']}ms, "
+                         f"tail_resp={probe['tail_resp']}ms, passed={probe['passed']}")
+        return probe
+
+    def make_report(self):
+        records = [{"限速(OPS)": p["fwdrate"],
+                    "OPS": p["ops"],
+                    "带宽(MB/s)": p["bw"],
+                    "平均时延(ms)": p["resp"],
+                    f"P{constants.SLO_TAIL_PERCENTILE}时延(ms)": "-" if p["tail_resp"] is None else p["tail_resp"],
+                    "是否稳定": "是" if p["steady"] else "否",
+                    "满足SLO": "是" if p["passed"] else "否",
+                    "最佳": "✔" if p is self.best else ""} for p in self.probes]
+        if not records:
+            return None
+        return TitledContent("限速探测结果", ReportUtil.create_table(records),
+                             f"SLO：平均时延≤{constants.MAX_IO_RESP}ms，"
+                             f"P{constants.SLO_TAIL_PERCENTILE}时延≤{constants.MAX_IO_TAIL_RESP}ms"
+                             f"（按vdbench时延分布计算，“-”表示未获取到时延分布）").to_soup()
+
+    def register_indicator(self):
+        return SloOps(self.ops), Resp(self.resp)
@@ -0,0 +1,88 @@
+# -*- coding: UTF-8 -*-
+import os
+
+from storage_evaluation_system_zzj import constants
+from storage_evaluation_system_zzj.action.vdbench import VdbenchIO
+from storage_evaluation_system_zzj.report import ReportUtil, TitledContent
+from storage_evaluation_system_zzj.testcases.performance.perf_base import PERFBase
+
+
+class TUNE_THREADS(PERFBase):
+    """ 线程数自动调优
+
+    以 fsd_group_number * multiple（线程数取整单位）为起点，线程数逐次翻倍进行短时探测，
+    每次探测在性能稳定（稳定区间达到constants.TUNE_PROBE_STEADY_TIME）后结束。
+    OPS提升低于constants.TUNE_MIN_GAIN或时延超过constants.MAX_IO_RESP时停止探测，
+    取OPS达到最大值(1 - TUNE_MIN_GAIN)的最小线程数，写回用户配置参数（tune_param，如thread_n1）
+    """
+
+    def pre_condition(self):
+        super().pre_condition()
+        self.tune_param = self.get_parameter("tune_param")
+        self.probes = []
+        self.best = None
+
+    @property
+    def thread_step(self) -> int:
+        return self.get_parameter("fsd_group_number", int) * self.get_parameter("multiple", int)
+
+    def get_vdbench_parameters(self) -> dict:
+        params = super().get_vdbench_parameters()
+        params["threads_config"] = self.thread_step
+        return params
+
+    def procedure(self):
+        threads = self.thread_step
+        for _ in range(constants.TUNE_MAX_PROBES):
+            probe = self.probe(threads)
+            self.probes.append(probe)
+            if probe["resp"] > constants.MAX_IO_RESP:
+                self.logger.info(f"Response time {probe['resp']}ms exceeds {constants.MAX_IO_RESP}ms, stop tuning")
+                break
+            valid = self.valid_probes()
+            if len(valid) > 1 and valid[-1]["ops"] < max(p["ops"] for p in valid[:-1]) * (1 + constants.TUNE_MIN_GAIN):
+                self.logger.info(f"OPS reaches plateau at {threads} threads, stop tuning")
+                break
+            threads *= 2
+
+        valid = self.valid_probes()
+        if not valid:
+            self.fail(message=f"所有线程数下时延均超过{constants.MAX_IO_RESP}ms", raise_exception=True)
+        max_ops = max(p["ops"] for p in valid)
+        self.best = next(p for p in valid if p["ops"] >= max_ops * (1 - constants.TUNE_MIN_GAIN))
+        self.logger.info(f"Best threads_config: {self.best['threads']} (ops={self.best['ops']})")
+        if self.tune_param:
+            self.suite.update_custom_parameter(self.tune_param, self.best["threads"])
+            self.add_report_message(f"最佳线程数{self.best['threads']}已写入配置参数{self.tune_param}")
+        self.ops, self.bw, self.resp = self.best["ops"], self.best["bw"], self.best["resp"]
+
+    def valid_probes(self) -> list:
+        return [p for p in self.probes if p["resp"] <= constants.MAX_IO_RESP]
+
+    def probe(self, threads: int) -> dict:
+        """以指定线程数读写，性能稳定后结束，返回平均性能"""
+        self.logger.info(f"Probing threads_config={threads}")
+        self.step_output_dir = os.path.join(self.output_dir, f"threads_{threads}")
+        self.vdbench = VdbenchIO(self).action_impl
+        params = self.get_vdbench_parameters()
+        params["threads_config"] = threads
+        probe = self.vdbench.probe(constants.TUNE_PROBE_ELAPSED, constants.TUNE_PROBE_STEADY_TIME, **params)
+        probe["threads"] = threads
+        self.logger.info(f"threads_config={threads}: ops={probe['ops']}, bw={probe['bw']}MB/s, "
+                         f"resp={probe['resp']}ms")
+        return probe
+
+    def make_report(self):
+        records = [{"线程数": p["threads"],
+                    "OPS": p["ops"],
+                    "带宽(MB/s)": p["bw"],
+                    "时延(ms)": p["resp"],
+                    "是否稳定": "是" if p["steady"] else "否",
+                    "最佳": "✔" if p is self.best else ""} for p in self.probes]
+        if not records:
+            return None
+        return TitledContent("线程数探测结果", ReportUtil.create_table(records),
+                             f"OPS提升低于{constants.TUNE_MIN_GAIN:.0%}或时延超过{constants.MAX_IO_RESP}ms时停止探测").to_soup()
+
+    def register_indicator(self):
+        return None
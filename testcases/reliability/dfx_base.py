@@ -71,20 +71,27 @@ class DFXBase(BaseCase):
     def start_io(self):
         elapsed = self.get_vdbench_elapsed()
         self.vdbench = VdbenchIO(self).action_impl
-        self.vdbench.run(
+        self.vdbench.run(elapsed=elapsed, wait=False, **self.get_vdbench_parameters())
+
+        # 等待vdbench开始读写
+        if not self.vdbench.wait_for_stage_start():
+            self.fail(message="IO业务启动超时", raise_exception=True)
+
+    def get_vdbench_parameters(self) -> dict:
+        return dict(
             vdbench_dir=self.get_parameter("vdbench_dir"),
             config_template_file=self.get_parameter("config_template_file"),
             anchor_paths=self.get_parameter("anchor_paths", dict),
             threads_config=self.get_parameter("threads_config", int),
-            elapsed=elapsed,
             multiple=self.get_parameter("multiple", int),
             fsd_group_number=self.get_parameter("fsd_group_number", int),
             fsd_width=self.get_parameter("fsd_width", int),
-            wait=False)
+        )
 
-        # 等待vdbench开始读写
-        if not self.vdbench.wait_for_stage_start():
-            self.fail(message="IO业务启动超时", raise_exception=True)
+    def stage_dataset(self):
+        self.update_hd_number()
+        VdbenchIO(self).action_impl.stage_dataset(**self.get_vdbench_parameters())
+        return True
 
     def inject_fault(self):
         # 执行故障
@@ -12,7 +12,9 @@ import math
 import time
 import traceback
 from lxml.etree import Element
+import numpy as np
 from pandas import DataFrame
+import pandas as pd
 
 from storage_evaluation_system_zzj import constants
 from storage_evaluation_system_zzj.constants import CaseCategory, TimeFormat
@@ -63,6 +65,13 @@ class IostatData:
     mb_wrtn_ps: float = 0
 
 
+@dataclass
+class IoLoad:
+    """IO负载（用例间静默检测）"""
+    mbps: float = 0  # 读写带宽之和（MB/s）
+    queue: float = 0  # 平均队列深度之和
+
+
 def str2bool(value: str):
     if value.lower() == "true":
         return True
@@ -395,15 +404,42 @@ def find_op_time_index(timeline: List[datetime], op_timeline: Union[List[float],
     """
     if not isinstance(op_timeline, list):
         op_timeline = [op_timeline]
+    if not op_timeline:
+        return []
+
+    times = pd.DatetimeIndex(timeline).asi8
+    targets = pd.DatetimeIndex([datetime.fromtimestamp(int(tm)) for tm in op_timeline]).asi8
+    if len(times) > 1 and not np.all(np.diff(times) >= 0):
+        # 非递增时间线：逐点比较距离
+        return [int(np.argmin(np.abs(times - t))) for t in targets]
+
+    # 二分查找插入位置，取前后两点中距离较近者，距离相同时取前者
+    right = np.clip(np.searchsorted(times, targets, side="left"), 0, len(times) - 1)
+    left = np.clip(right - 1, 0, len(times) - 1)
+    closest = np.where(np.abs(targets - times[left]) <= np.abs(times[right] - targets), left, right)
+    # 时间点重复时取第一次出现的位置
+    return np.searchsorted(times, times[closest], side="left").tolist()
 
-    result = []
-    for tm in op_timeline:
-        op_tm = datetime.fromtimestamp(int(tm))
-        closest_element = min(timeline, key=lambda t: abs((t - op_tm)).total_seconds())
-        index = timeline.index(closest_element)
-        result.append(index)
 
-    return result
+def find_knee(x: List[float], y: List[float]) -> int:
+    """ 曲线拐点索引
+
+    x、y分别归一化到[0, 1]后，取距首尾两点连线最远的点（Kneedle）。点数少于3时返回最后一个点
+
+    Examples:
+        x = [100, 200, 300, 400, 500]
+        y = [1.0, 1.1, 1.3, 2.5, 8.0]
+        => 3
+    """
+    if len(x) < 3:
+        return len(x) - 1
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    xn = (x - x.min()) / (np.ptp(x) or 1)
+    yn = (y - y.min()) / (np.ptp(y) or 1)
+    dx, dy = xn[-1] - xn[0], yn[-1] - yn[0]
+    distance = np.abs(dy * (xn - xn[0]) - dx * (yn - yn[0])) / (np.hypot(dx, dy) or 1)
+    return int(np.argmax(distance))
 
 
 def timestr(time_value: Union[int, float] = None, fmt=TimeFormat.DEFAULT):